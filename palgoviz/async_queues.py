@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""
+Awaitable queues for asyncio, wrapping the generalized queues in queues.py.
+
+This is the asyncio counterpart of blocking_queues.py. Coroutines waiting to
+get or put park on futures, which are resolved as soon as they can proceed, so
+nothing polls. Like asyncio.Queue, an AsyncQueue must only be used from one
+event loop thread. Unlike asyncio.Queue, it can use any queues.Queue backend.
+"""
+
+__all__ = ['AsyncQueue']
+
+import asyncio
+import collections
+
+from palgoviz.blocking_queues import QueueClosedError
+
+
+class AsyncQueue:
+    """
+    An asyncio adapter for a queues.Queue, with waiting and closing.
+
+    If a capacity is given, put waits while the queue is full. get waits while
+    the queue is empty. Waiters are woken in the order they began waiting. The
+    nonwaiting get_nowait and put_nowait raise asyncio.QueueEmpty and
+    asyncio.QueueFull, like their asyncio.Queue counterparts.
+
+    Cancelling a coroutine waiting in get or put is safe: no item is lost, and
+    if the cancelled waiter had just been woken, the next waiter is woken in
+    its place.
+
+    Closing an AsyncQueue prevents further puts and wakes all waiters. Items
+    already in the queue may still be gotten. Once they are gone, get raises
+    QueueClosedError instead of waiting forever.
+
+    >>> from palgoviz.queues import FifoQueue
+    >>> async def demo():
+    ...     aq = AsyncQueue.wrap(FifoQueue.create(), capacity=2)
+    ...     consumer = asyncio.create_task(aq.get())
+    ...     await aq.put('ham')
+    ...     await aq.put('spam')
+    ...     await aq.put('eggs')
+    ...     aq.close()
+    ...     return [await consumer, await aq.get(), await aq.get()]
+    >>> asyncio.run(demo())
+    ['ham', 'spam', 'eggs']
+    """
+
+    __slots__ = ('_queue', '_capacity', '_closed', '_getters', '_putters')
+
+    @classmethod
+    def wrap(cls, queue, *, capacity=None):
+        """Wrap a queue to be used only through this AsyncQueue."""
+        return cls(queue, capacity=capacity)
+
+    def __init__(self, queue, *, capacity=None):
+        """
+        Create an AsyncQueue wrapping a queue, optionally bounded.
+
+        The caller should not access the wrapped queue directly afterwards.
+        """
+        if capacity is not None and capacity < 1:
+            raise ValueError('capacity must be positive (or None)')
+
+        self._queue = queue
+        self._capacity = capacity
+        self._closed = False
+        self._getters = collections.deque()
+        self._putters = collections.deque()
+
+    def __repr__(self):
+        """Representation for debugging. Shows the capacity and state."""
+        state = 'closed' if self.closed else 'open'
+        return (f'<{type(self).__name__} of {type(self._queue).__name__}, '
+                f'capacity={self.capacity!r}, {state}>')
+
+    def __bool__(self):
+        """Check if there are items."""
+        return bool(self._queue)
+
+    def __len__(self):
+        """Count the items."""
+        return len(self._queue)
+
+    @property
+    def capacity(self):
+        """The most items this queue holds at once, or None if unbounded."""
+        return self._capacity
+
+    @property
+    def closed(self):
+        """Whether this queue has been closed."""
+        return self._closed
+
+    def full(self):
+        """Check if this queue is at capacity."""
+        return (self._capacity is not None
+                and len(self._queue) >= self._capacity)
+
+    async def put(self, item):
+        """Put an item in the queue, waiting for room if it is full."""
+        while self.full() and not self._closed:
+            await self._wait(self._putters, self._can_put)
+        self.put_nowait(item)
+
+    def put_nowait(self, item):
+        """Put an item in the queue if there is room. Don't wait."""
+        if self._closed:
+            raise QueueClosedError("Can't put to closed queue")
+        if self.full():
+            raise asyncio.QueueFull
+
+        self._queue.enqueue(item)
+        self._wake_next(self._getters)
+
+    async def get(self):
+        """Remove and return an item, waiting for one if the queue is empty."""
+        while not self._queue and not self._closed:
+            await self._wait(self._getters, self._can_get)
+        return self.get_nowait()
+
+    def get_nowait(self):
+        """Remove and return an item if one is available. Don't wait."""
+        if not self._queue:
+            if self._closed:
+                raise QueueClosedError("Can't get from closed, empty queue")
+            raise asyncio.QueueEmpty
+
+        item = self._queue.dequeue()
+        self._wake_next(self._putters)
+        return item
+
+    def peek(self):
+        """Return the item that would be gotten next, without removing it."""
+        if not self._queue:
+            raise LookupError("Can't peek from empty queue")
+        return self._queue.peek()
+
+    def close(self):
+        """Close this queue, waking all waiting coroutines. Idempotent."""
+        self._closed = True
+        for waiters in self._getters, self._putters:
+            while waiters:
+                self._wake_next(waiters)
+
+    def _can_put(self):
+        """Check if a put would succeed or fail without waiting."""
+        return self._closed or not self.full()
+
+    def _can_get(self):
+        """Check if a get would succeed or fail without waiting."""
+        return self._closed or bool(self._queue)
+
+    @staticmethod
+    async def _wait(waiters, can_proceed):
+        """
+        Wait on a new future in waiters until woken.
+
+        If cancelled after being woken, pass the wakeup on to the next waiter,
+        if it could still proceed, so a wakeup is never lost.
+        """
+        waiter = asyncio.get_running_loop().create_future()
+        waiters.append(waiter)
+        try:
+            await waiter
+        except BaseException:
+            waiter.cancel()  # In case the cancellation didn't come through it.
+            try:
+                waiters.remove(waiter)
+            except ValueError:
+                pass  # It was already woken, so it was already removed.
+            if not waiter.cancelled() and can_proceed():
+                AsyncQueue._wake_next(waiters)
+            raise
+
+    @staticmethod
+    def _wake_next(waiters):
+        """Wake the first waiter in waiters that has not been cancelled."""
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,911 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""
+Benchmarks for data structures and algorithms in this project.
+
+Run "python -m palgoviz.bench --help" to list the benchmarks. Each benchmark is
+a subcommand with its own options. Results are timings on this machine, so
+they are only meaningful relative to one another.
+"""
+
+__all__ = [
+    'bench_async_queues',
+    'bench_binary_search_many',
+    'bench_hash_node_memory',
+    'bench_hash_nodes',
+    'bench_linked_queues',
+    'bench_merge_sorts',
+    'bench_parallel_merge_sort',
+    'bench_queues',
+    'bench_sll_ops',
+    'main',
+]
+
+import argparse
+import array
+import asyncio
+import datetime
+import functools
+import inspect
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+import tracemalloc
+
+import numpy
+
+from palgoviz import queues, recursion, sll
+from palgoviz.async_queues import AsyncQueue
+from palgoviz.sll import CompactHashNode, HashNode
+
+
+def _time_ns(func, *args):
+    """Call func(*args). Return the elapsed time in nanoseconds."""
+    start = time.perf_counter_ns()
+    func(*args)
+    return time.perf_counter_ns() - start
+
+
+def _peak_bytes(func, *args):
+    """Call func(*args). Return the peak traced memory use, in bytes."""
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def _print_rows(rows, *, unit):
+    """Print (label, value) pairs as a table, with values per unit."""
+    width = max(len(label) for label, _ in rows)
+    for label, value in rows:
+        print(f'{label:<{width}}  {value:12,.1f} ns/{unit}')
+
+
+async def _produce_consume(make_queue, items, *, producers, consumers):
+    """Put all items through a queue with several producers and consumers."""
+    queue = make_queue()
+    chunks = [items[index::producers] for index in range(producers)]
+    counts = [len(items[index::consumers]) for index in range(consumers)]
+
+    async def produce(chunk):
+        for item in chunk:
+            await queue.put(item)
+
+    async def consume(count):
+        for _ in range(count):
+            await queue.get()
+
+    await asyncio.gather(*map(produce, chunks), *map(consume, counts))
+
+
+def bench_async_queues(*, size=100_000, producers=4, consumers=4,
+                       capacity=64, seed=None):
+    """
+    Compare AsyncQueue backends against asyncio.Queue and its subclasses.
+
+    Each contender moves the same items through a bounded queue, with several
+    producer and consumer tasks, so both put and get frequently wait. Returns
+    (label, nanoseconds per item) pairs.
+    """
+    rng = random.Random(seed)
+    items = [rng.random() for _ in range(size)]
+
+    contenders = [
+        ('AsyncQueue(FifoQueue.create())',
+         lambda: AsyncQueue.wrap(queues.FifoQueue.create(),
+                                 capacity=capacity)),
+        ('asyncio.Queue',
+         lambda: asyncio.Queue(capacity)),
+        ('AsyncQueue(LifoQueue.create())',
+         lambda: AsyncQueue.wrap(queues.LifoQueue.create(),
+                                 capacity=capacity)),
+        ('asyncio.LifoQueue',
+         lambda: asyncio.LifoQueue(capacity)),
+        ('AsyncQueue(PriorityQueue.create())',
+         lambda: AsyncQueue.wrap(queues.PriorityQueue.create(),
+                                 capacity=capacity)),
+        ('asyncio.PriorityQueue',
+         lambda: asyncio.PriorityQueue(capacity)),
+    ]
+
+    def run(make_queue):
+        asyncio.run(_produce_consume(make_queue, items,
+                                     producers=producers,
+                                     consumers=consumers))
+
+    return [(label, _time_ns(run, make_queue) / size)
+            for label, make_queue in contenders]
+
+
+def bench_binary_search_many(*, size=1_000_000,
+                             counts=(10, 100, 1000, 10_000, 100_000,
+                                     1_000_000),
+                             seed=0):
+    """
+    Compare binary_search_many to searching for each needle separately.
+
+    This searches size sorted even numbers for each count of random needles,
+    about half of which are present. Separate searches use binary_search,
+    binary_search_iterative, and binary_search_good. binary_search_many is
+    run on unsorted needles, on the same needles sorted, and on NumPy arrays.
+    Returns (label, nanoseconds per needle) pairs, showing the crossovers.
+    """
+    values = list(range(0, size * 2, 2))
+    values_array = numpy.array(values)
+    rng = random.Random(seed)
+
+    def each(search, needles):
+        return [search(values, x) for x in needles]
+
+    rows = []
+    for count in counts:
+        needles = [rng.randrange(size * 2) for _ in range(count)]
+        sorted_needles = sorted(needles)
+        contenders = [
+            ('binary_search', functools.partial(each,
+                                                recursion.binary_search),
+             needles),
+            ('binary_search_iterative',
+             functools.partial(each, recursion.binary_search_iterative),
+             needles),
+            ('binary_search_good',
+             functools.partial(each, recursion.binary_search_good), needles),
+            ('binary_search_many',
+             functools.partial(recursion.binary_search_many, values),
+             needles),
+            ('binary_search_many, sorted',
+             functools.partial(recursion.binary_search_many, values),
+             sorted_needles),
+            ('binary_search_many, array',
+             functools.partial(recursion.binary_search_many, values_array),
+             numpy.array(needles)),
+        ]
+        for name, search, arg in contenders:
+            label = f'{name}, {count:,} needles'
+            rows.append((label, _time_ns(search, arg) / count))
+    return rows
+
+
+def _run_binary_search_many(args):
+    """Run the binary-search-many benchmark from parsed arguments."""
+    rows = bench_binary_search_many(size=args.size, counts=args.counts,
+                                    seed=args.seed)
+    _print_rows(rows, unit='needle')
+
+
+def _fill_then_drain(queue_type, items):
+    """Enqueue items on a new queue_type instance, then dequeue them all."""
+    queue = queue_type()
+    for item in items:
+        queue.enqueue(item)
+    while queue:
+        queue.dequeue()
+
+
+def _fill(queue_type, items):
+    """Enqueue items on a new queue_type instance. Return the queue."""
+    queue = queue_type()
+    for item in items:
+        queue.enqueue(item)
+    return queue
+
+
+def bench_linked_queues(*, size=1_000_000):
+    """
+    Compare unrolled linked list queues to SLL and other FIFOs and LIFOs.
+
+    For each queue type, this times enqueuing size items and then dequeuing
+    them all, and measures the peak memory used to hold them. Returns
+    (label, nanoseconds per item, bytes per item) triples. The items exist
+    before measuring starts, so the bytes are the queue's own overhead.
+    """
+    items = list(range(size))
+    contenders = [
+        queues.DequeFifoQueue,
+        queues.SinglyLinkedListFifoQueue,
+        queues.UnrolledLinkedListFifoQueue,
+        queues.ListLifoQueue,
+        queues.SinglyLinkedListLifoQueue,
+        queues.UnrolledLinkedListLifoQueue,
+    ]
+    return [
+        (queue_type.__name__,
+         _time_ns(_fill_then_drain, queue_type, items) / size,
+         _peak_bytes(_fill, queue_type, items) / size)
+        for queue_type in contenders
+    ]
+
+
+def _run_linked_queues(args):
+    """Run the linked-queues benchmark from parsed command-line arguments."""
+    rows = bench_linked_queues(size=args.size)
+    width = max(len(label) for label, _, _ in rows)
+    for label, nanoseconds, size in rows:
+        print(f'{label:<{width}}  {nanoseconds:10,.1f} ns/item'
+              f'  {size:8,.1f} bytes/item')
+
+
+MERGE_SORT_INPUTS = ('random', 'batches')
+"""Kinds of input the merge-sorts benchmark can sort."""
+
+
+def _merge_sort_input(rng, size, kind):
+    """Make size random floats, arranged as kind (see bench_merge_sorts)."""
+    values = [rng.random() for _ in range(size)]
+    if kind == 'batches':
+        batch_size = max(size // 10, 1)
+        for start in range(0, size, batch_size):
+            values[start:start + batch_size] = sorted(
+                values[start:start + batch_size])
+    return values
+
+
+def bench_merge_sorts(*, sizes=(1_000_000, 10_000_000), seed=0,
+                      kind='random'):
+    """
+    Compare the merge sorts in recursion.py to each other and to sorted.
+
+    For each size, this sorts the same list of random floats with each sort.
+    If kind is 'batches', the list is ten separately sorted batches, like
+    nearly sorted data arriving in chunks. The sorts given a merge function
+    use their defaults. Returns (label, nanoseconds per item) pairs.
+    """
+    contenders = [
+        recursion.merge_sort,
+        recursion.merge_sort_bottom_up_unstable,
+        recursion.merge_sort_bottom_up,
+        recursion.merge_sort_buffered,
+        recursion.merge_sort_adaptive,
+        sorted,
+    ]
+    rng = random.Random(seed)
+    rows = []
+    for size in sizes:
+        values = _merge_sort_input(rng, size, kind)
+        for sort in contenders:
+            label = f'{sort.__name__}, {size:,} items'
+            rows.append((label, _time_ns(sort, values) / size))
+    return rows
+
+
+def _run_merge_sorts(args):
+    """Run the merge-sorts benchmark from parsed command-line arguments."""
+    rows = bench_merge_sorts(sizes=args.sizes, seed=args.seed,
+                             kind=args.input)
+    _print_rows(rows, unit='item')
+
+
+def _worker_counts(max_workers):
+    """Return 1, 2, 4, ... up to max_workers, always including max_workers."""
+    counts = []
+    count = 1
+    while count < max_workers:
+        counts.append(count)
+        count *= 2
+    counts.append(max_workers)
+    return counts
+
+
+def bench_parallel_merge_sort(*, size=10_000_000, max_workers=None,
+                              numeric=True, seed=0):
+    """
+    Show how recursion.merge_sort_parallel scales from 1 to N cores.
+
+    This sorts size random floats with 1, 2, 4, ... workers, up to max_workers,
+    which defaults to os.cpu_count(). One worker sorts serially, in this
+    process. If numeric is true, the floats are in an array.array, which is
+    passed to workers in shared memory; otherwise, they are in a list, which
+    is pickled. Times include starting the worker processes. Returns
+    (label, nanoseconds per item) pairs.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    rng = random.Random(seed)
+    values = [rng.random() for _ in range(size)]
+    if numeric:
+        values = array.array('d', values)
+
+    return [
+        (f'{workers} worker(s)',
+         _time_ns(functools.partial(recursion.merge_sort_parallel,
+                                    workers=workers, threshold=0),
+                  values) / size)
+        for workers in _worker_counts(max_workers)
+    ]
+
+
+def _run_parallel_merge_sort(args):
+    """Run the parallel-merge-sort benchmark from parsed arguments."""
+    rows = bench_parallel_merge_sort(size=args.size,
+                                     max_workers=args.max_workers,
+                                     numeric=not args.list)
+    _print_rows(rows, unit='item')
+
+
+def _build_lists(construct, chunks, rounds):
+    """Build a linked list from each chunk of values, rounds times over."""
+    for _ in range(rounds):
+        for chunk in chunks:
+            head = None
+            for value in reversed(chunk):
+                head = construct(value, head)
+
+
+def _run_threads(construct, chunks_per_thread, rounds):
+    """Build lists in one thread per element of chunks_per_thread, at once."""
+    barrier = threading.Barrier(len(chunks_per_thread))
+
+    def work(chunks):
+        barrier.wait()
+        _build_lists(construct, chunks, rounds)
+
+    threads = [threading.Thread(target=work, args=(chunks,))
+               for chunks in chunks_per_thread]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def bench_hash_nodes(*, threads=(1, 2, 4, 8), length=1000, lists=10,
+                     rounds=20):
+    """
+    Time HashNode construction from several threads at once.
+
+    Each thread builds the same lists, of the given length, rounds times. In
+    the "hit" workload, the lists already exist, so every call finds a node.
+    In the "miss" workload, each thread uses its own values, which are new on
+    the first round. Lookups of existing nodes normally skip the lock. For
+    comparison, "locked" rows use the path that always takes the lock and
+    allocates a key. Returns (label, nanoseconds per node) pairs.
+    """
+    contenders = [
+        ('', HashNode),
+        (' locked', lambda value, next_node:
+            HashNode._lock_and_get_or_add_all((value,), next_node)),
+    ]
+    rows = []
+
+    for count in threads:
+        shared = [list(range(index * length, (index + 1) * length))
+                  for index in range(lists)]
+        keep_alive = [HashNode.from_iterable(chunk) for chunk in shared]
+        for suffix, construct in contenders:
+            label = f'hit, {count} thread(s){suffix}'
+            elapsed = _time_ns(_run_threads, construct, [shared] * count,
+                               rounds)
+            rows.append((label, elapsed / (count * lists * length * rounds)))
+        del keep_alive
+
+        for suffix, construct in contenders:
+            label = f'miss, {count} thread(s){suffix}'
+            per_thread = [
+                [[(thread, index, value) for value in range(length)]
+                 for index in range(lists)]
+                for thread in range(count)
+            ]
+            elapsed = _time_ns(_run_threads, construct, per_thread, 1)
+            rows.append((label, elapsed / (count * lists * length)))
+
+    return rows
+
+
+def _run_hash_nodes(args):
+    """Run the hash-nodes benchmark from parsed command-line arguments."""
+    rows = bench_hash_nodes(threads=args.threads, length=args.length,
+                            lists=args.lists, rounds=args.rounds)
+    _print_rows(rows, unit='node')
+
+
+def _traced_bytes(func, *args):
+    """Call func(*args). Return the memory it leaves allocated, in bytes."""
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        result = func(*args)
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return after - before
+
+
+def bench_hash_node_memory(*, size=1_000_000):
+    """
+    Compare memory per node of HashNode and CompactHashNode, and build times.
+
+    For each class, this builds a list of size nodes, and measures how much
+    memory stays allocated, which includes each node's share of its table.
+    The values exist before measuring starts, so they are not counted. Returns
+    (label, bytes per node, nanoseconds per node) triples.
+    """
+    values = list(range(size))
+    rows = []
+    for node_type in HashNode, CompactHashNode:
+        size_bytes = _traced_bytes(node_type.from_iterable, values)
+        nanoseconds = _time_ns(node_type.from_iterable, values)
+        rows.append((node_type.__name__, size_bytes / size,
+                     nanoseconds / size))
+    return rows
+
+
+def _run_hash_node_memory(args):
+    """Run the hash-node-memory benchmark from parsed command-line args."""
+    rows = bench_hash_node_memory(size=args.size)
+    width = max(len(label) for label, _, _ in rows)
+    for label, size, nanoseconds in rows:
+        print(f'{label:<{width}}  {size:8,.1f} bytes/node'
+              f'  {nanoseconds:10,.1f} ns/node')
+
+
+def _rebuilt_onto(values, end):
+    """Build a list of values onto end, one node at a time, from the back."""
+    acc = end
+    for value in reversed(values):
+        acc = HashNode(value, acc)
+    return acc
+
+
+def bench_sll_ops(*, lists=20, prefix_length=10, tail_length=10_000):
+    """
+    Compare memoized HashNode list operations to rebuilding lists naively.
+
+    Each operation is applied to lists that have distinct short prefixes but
+    share one long tail, keeping the results. The memoized operations in sll
+    reuse their results for the shared tail, while the "rebuilt" versions walk
+    and rebuild each whole list. Reversed lists share no tail, so reverse only
+    saves time when repeated. Returns (label, nanoseconds per list) pairs.
+    """
+    tail = list(range(tail_length))
+    heads = [
+        HashNode.from_iterable(
+            [(index, position) for position in range(prefix_length)] + tail)
+        for index in range(lists)
+    ]
+    end = HashNode('end')
+    count = prefix_length + tail_length // 2
+
+    operations = [
+        ('append',
+         lambda head: sll.append(head, 'end'),
+         lambda head: _rebuilt_onto(list(sll.traverse(head)), end)),
+        ('concat',
+         lambda head: sll.concat(head, end),
+         lambda head: _rebuilt_onto(list(sll.traverse(head)), end)),
+        ('map_values',
+         lambda head: sll.map_values(str, head),
+         lambda head: _rebuilt_onto(list(map(str, sll.traverse(head))),
+                                    None)),
+        ('take',
+         lambda head: sll.take(head, count),
+         lambda head: _rebuilt_onto(
+             list(itertools.islice(sll.traverse(head), count)), None)),
+        ('reverse',
+         sll.reverse,
+         lambda head: _rebuilt_onto(list(sll.traverse(head))[::-1], None)),
+    ]
+
+    def run(operate):
+        return [operate(head) for head in heads]
+
+    rows = []
+    for name, memoized, rebuilt in operations:
+        rows.append((f'{name} memoized', _time_ns(run, memoized) / lists))
+        rows.append((f'{name} rebuilt', _time_ns(run, rebuilt) / lists))
+    return rows
+
+
+def _run_sll_ops(args):
+    """Run the sll-ops benchmark from parsed command-line arguments."""
+    rows = bench_sll_ops(lists=args.lists, prefix_length=args.prefix_length,
+                         tail_length=args.tail_length)
+    _print_rows(rows, unit='list')
+
+
+QUEUE_WORKLOADS = ('steady', 'burst', 'interleaved')
+"""Workloads the queues benchmark can run, in the order they are reported."""
+
+_QUADRATIC_QUEUE_TYPES = frozenset({
+    queues.SlowFifoQueue,
+    queues.FastEnqueueMaxPriorityQueue,
+    queues.FastDequeueMaxPriorityQueue,
+})
+"""Queue types with an O(n) operation, making the workloads O(n**2)."""
+
+
+def _concrete_queue_types():
+    """Get all concrete queue types in the queues module, in __all__ order."""
+    candidates = (getattr(queues, name) for name in queues.__all__)
+    return [cls for cls in candidates if not inspect.isabstract(cls)]
+
+
+def _run_steady(queue_type, items):
+    """
+    Time a dequeue and an enqueue per item on a queue already holding items.
+
+    The queue's size stays at len(items) throughout the timed operations.
+    """
+    queue = queue_type()
+    queue.enqueue_many(items)
+    enqueue = queue.enqueue
+    dequeue = queue.dequeue
+
+    start = time.perf_counter_ns()
+    for item in items:
+        dequeue()
+        enqueue(item)
+    return time.perf_counter_ns() - start, len(items) * 2
+
+
+def _run_burst(queue_type, items):
+    """Time enqueuing all items on a new queue, then dequeuing them all."""
+    queue = queue_type()
+    enqueue = queue.enqueue
+    dequeue = queue.dequeue
+
+    start = time.perf_counter_ns()
+    for item in items:
+        enqueue(item)
+    for _ in items:
+        dequeue()
+    return time.perf_counter_ns() - start, len(items) * 2
+
+
+def _run_interleaved(queue_type, items, pattern):
+    """
+    Time enqueues and dequeues in a random order, starting from empty.
+
+    The pattern is a sequence of bools, True for enqueue and False for dequeue.
+    """
+    queue = queue_type()
+    enqueue = queue.enqueue
+    dequeue = queue.dequeue
+    source = itertools.cycle(items)
+
+    start = time.perf_counter_ns()
+    for is_enqueue in pattern:
+        if is_enqueue:
+            enqueue(next(source))
+        else:
+            dequeue()
+    return time.perf_counter_ns() - start, len(pattern)
+
+
+def _random_pattern(rng, length):
+    """Make a pattern for _run_interleaved that never dequeues when empty."""
+    pattern = []
+    size = 0
+    for _ in range(length):
+        is_enqueue = size == 0 or rng.random() < 0.5
+        pattern.append(is_enqueue)
+        size += 1 if is_enqueue else -1
+    return pattern
+
+
+def _sizes(min_size, max_size):
+    """Get the powers of ten from min_size to max_size, inclusive."""
+    sizes = []
+    size = 1
+    while size <= max_size:
+        if size >= min_size:
+            sizes.append(size)
+        size *= 10
+    return sizes
+
+
+def bench_queues(*, min_size=10, max_size=10**7, backends=None,
+                 workloads=QUEUE_WORKLOADS, repeat=1, quadratic_cap=10**4,
+                 seed=0, progress=None):
+    """
+    Benchmark each queue implementation across sizes and workloads.
+
+    Sizes are the powers of ten from min_size to max_size. For each queue type
+    and size, each workload is timed (the best of repeat runs), and the peak
+    memory while holding that many items is measured with tracemalloc:
+
+      steady       Dequeue and re-enqueue, on a queue holding size items.
+      burst        Enqueue size items on an empty queue, then dequeue them.
+      interleaved  Do 2 * size enqueues and dequeues in a random order.
+
+    Queue types whose workloads are quadratic are skipped at sizes above
+    quadratic_cap, and the skip is recorded. Returns a dict that can be
+    serialized as JSON. If progress is given, it is called with a string as
+    each measurement finishes.
+    """
+    if backends is None:
+        queue_types = _concrete_queue_types()
+    else:
+        queue_types = [getattr(queues, name) for name in backends]
+
+    rng = random.Random(seed)
+    results = []
+
+    for size in _sizes(min_size, max_size):
+        items = [rng.random() for _ in range(size)]
+        pattern = _random_pattern(rng, size * 2)
+
+        runners = {
+            'steady': lambda queue_type: _run_steady(queue_type, items),
+            'burst': lambda queue_type: _run_burst(queue_type, items),
+            'interleaved':
+                lambda queue_type: _run_interleaved(queue_type, items,
+                                                    pattern),
+        }
+
+        for queue_type in queue_types:
+            record = {'backend': queue_type.__name__, 'size': size}
+
+            if queue_type in _QUADRATIC_QUEUE_TYPES and size > quadratic_cap:
+                record['skipped'] = f'quadratic, and size > {quadratic_cap}'
+            else:
+                record['ns_per_op'] = {}
+                for workload in workloads:
+                    elapsed, ops = min(runners[workload](queue_type)
+                                       for _ in range(repeat))
+                    record['ns_per_op'][workload] = elapsed / ops
+                record['peak_bytes'] = _peak_bytes(queue_type().enqueue_many,
+                                                   items)
+
+            results.append(record)
+            if progress is not None:
+                progress(f'{queue_type.__name__} size={size}')
+
+    return {
+        'benchmark': 'queues',
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'parameters': {
+            'min_size': min_size,
+            'max_size': max_size,
+            'workloads': list(workloads),
+            'repeat': repeat,
+            'quadratic_cap': quadratic_cap,
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+
+def _print_queue_results(report):
+    """Print the results of bench_queues as a table."""
+    workloads = report['parameters']['workloads']
+    width = max(len(record['backend']) for record in report['results'])
+
+    heading = ''.join(f'{workload:>13}' for workload in workloads)
+    print(f'{"backend":<{width}}  {"size":>10}{heading}  {"peak bytes":>13}')
+
+    for record in report['results']:
+        prefix = f'{record["backend"]:<{width}}  {record["size"]:>10,}'
+        if 'skipped' in record:
+            print(f'{prefix}  (skipped: {record["skipped"]})')
+        else:
+            times = ''.join(f'{record["ns_per_op"][workload]:13,.1f}'
+                            for workload in workloads)
+            print(f'{prefix}{times}  {record["peak_bytes"]:13,}')
+
+
+def _report_progress(message):
+    """Print a progress message to standard error."""
+    print(message, file=sys.stderr)
+
+
+def _run_queues(args):
+    """Run the queues benchmark from parsed command-line arguments."""
+    report = bench_queues(
+        min_size=args.min_size,
+        max_size=args.max_size,
+        backends=args.backends,
+        workloads=args.workloads,
+        repeat=args.repeat,
+        quadratic_cap=args.quadratic_cap,
+        seed=args.seed,
+        progress=(_report_progress if args.verbose else None),
+    )
+
+    if args.json == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        return
+
+    _print_queue_results(report)
+    if args.json is not None:
+        with open(args.json, mode='w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+            file.write('\n')
+
+
+def _run_async_queues(args):
+    """Run the async-queues benchmark from parsed command-line arguments."""
+    rows = bench_async_queues(size=args.size, producers=args.producers,
+                              consumers=args.consumers,
+                              capacity=args.capacity, seed=args.seed)
+    _print_rows(rows, unit='item')
+
+
+def _parse_args(argv):
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(
+        prog='python -m palgoviz.bench',
+        description='Run a benchmark.',
+    )
+    subparsers = parser.add_subparsers(required=True, metavar='BENCHMARK')
+
+    async_queues = subparsers.add_parser(
+        'async-queues',
+        help='AsyncQueue versus asyncio.Queue',
+        description=bench_async_queues.__doc__.strip().splitlines()[0],
+    )
+    async_queues.add_argument('--size', type=int, default=100_000,
+                              help='number of items to transfer')
+    async_queues.add_argument('--producers', type=int, default=4,
+                              help='number of producer tasks')
+    async_queues.add_argument('--consumers', type=int, default=4,
+                              help='number of consumer tasks')
+    async_queues.add_argument('--capacity', type=int, default=64,
+                              help='maximum number of items in each queue')
+    async_queues.add_argument('--seed', type=int, default=None,
+                              help='random seed for the items')
+    async_queues.set_defaults(run=_run_async_queues)
+
+    binary_search_many = subparsers.add_parser(
+        'binary-search-many',
+        help='batched versus separate binary searches',
+        description=bench_binary_search_many.__doc__.strip().splitlines()[0],
+    )
+    binary_search_many.add_argument('--size', type=int, default=1_000_000,
+                                    help='number of values to search')
+    binary_search_many.add_argument('--counts', type=int, nargs='+',
+                                    default=[10, 100, 1000, 10_000, 100_000,
+                                             1_000_000],
+                                    metavar='N',
+                                    help='numbers of needles to compare')
+    binary_search_many.add_argument('--seed', type=int, default=0,
+                                    help='random seed for the needles')
+    binary_search_many.set_defaults(run=_run_binary_search_many)
+
+    hash_node_memory = subparsers.add_parser(
+        'hash-node-memory',
+        help='HashNode versus CompactHashNode memory per node',
+        description=bench_hash_node_memory.__doc__.strip().splitlines()[0],
+    )
+    hash_node_memory.add_argument('--size', type=int, default=1_000_000,
+                                  help='number of nodes to make')
+    hash_node_memory.set_defaults(run=_run_hash_node_memory)
+
+    hash_nodes = subparsers.add_parser(
+        'hash-nodes',
+        help='sll.HashNode construction under thread contention',
+        description=bench_hash_nodes.__doc__.strip().splitlines()[0],
+    )
+    hash_nodes.add_argument('--threads', type=int, nargs='+',
+                            default=[1, 2, 4, 8], metavar='N',
+                            help='numbers of threads to compare')
+    hash_nodes.add_argument('--length', type=int, default=1000,
+                            help='number of nodes in each list')
+    hash_nodes.add_argument('--lists', type=int, default=10,
+                            help='number of lists each thread builds')
+    hash_nodes.add_argument('--rounds', type=int, default=20,
+                            help='times each thread builds its lists')
+    hash_nodes.set_defaults(run=_run_hash_nodes)
+
+    linked_queues = subparsers.add_parser(
+        'linked-queues',
+        help='unrolled versus singly linked list queues',
+        description=bench_linked_queues.__doc__.strip().splitlines()[0],
+    )
+    linked_queues.add_argument('--size', type=int, default=1_000_000,
+                               help='number of items to enqueue')
+    linked_queues.set_defaults(run=_run_linked_queues)
+
+    merge_sorts = subparsers.add_parser(
+        'merge-sorts',
+        help='merge sorts in recursion.py versus sorted',
+        description=bench_merge_sorts.__doc__.strip().splitlines()[0],
+    )
+    merge_sorts.add_argument('--sizes', type=int, nargs='+',
+                             default=[1_000_000, 10_000_000], metavar='N',
+                             help='numbers of items to sort')
+    merge_sorts.add_argument('--seed', type=int, default=0,
+                             help='random seed for the items')
+    merge_sorts.add_argument('--input', choices=MERGE_SORT_INPUTS,
+                             default='random',
+                             help='kind of input to sort')
+    merge_sorts.set_defaults(run=_run_merge_sorts)
+
+    parallel_merge_sort = subparsers.add_parser(
+        'parallel-merge-sort',
+        help='merge_sort_parallel scaling from 1 to N cores',
+        description=bench_parallel_merge_sort.__doc__.strip().splitlines()[0],
+    )
+    parallel_merge_sort.add_argument('--size', type=int, default=10_000_000,
+                                     help='number of items to sort')
+    parallel_merge_sort.add_argument('--max-workers', type=int, default=None,
+                                     metavar='N',
+                                     help='most worker processes to try '
+                                          '(default: number of CPUs)')
+    parallel_merge_sort.add_argument('--list', action='store_true',
+                                     help='sort a list instead of an array '
+                                          '(pickling instead of shared '
+                                          'memory)')
+    parallel_merge_sort.set_defaults(run=_run_parallel_merge_sort)
+
+    queue_names = [cls.__name__ for cls in _concrete_queue_types()]
+    queues_parser = subparsers.add_parser(
+        'queues',
+        help='every queue implementation, across sizes and workloads',
+        description=bench_queues.__doc__.strip().splitlines()[0],
+    )
+    queues_parser.add_argument('--min-size', type=int, default=10,
+                               help='smallest size (rounded up to a power '
+                                    'of 10)')
+    queues_parser.add_argument('--max-size', type=int, default=10**7,
+                               help='largest size (rounded down to a power '
+                                    'of 10)')
+    queues_parser.add_argument('--backends', nargs='+', choices=queue_names,
+                               metavar='BACKEND',
+                               help='queue types to run (default: all)')
+    queues_parser.add_argument('--workloads', nargs='+',
+                               choices=QUEUE_WORKLOADS,
+                               default=list(QUEUE_WORKLOADS),
+                               help='workloads to run (default: all)')
+    queues_parser.add_argument('--repeat', type=int, default=1,
+                               help='runs per measurement (the best is used)')
+    queues_parser.add_argument('--quadratic-cap', type=int, default=10**4,
+                               help='largest size for quadratic queue types')
+    queues_parser.add_argument('--seed', type=int, default=0,
+                               help='random seed for items and patterns')
+    queues_parser.add_argument('--json', metavar='FILE',
+                               help='also write JSON results to FILE '
+                                    '(if "-", write only JSON, to stdout)')
+    queues_parser.add_argument('-v', '--verbose', action='store_true',
+                               help='report progress on stderr')
+    queues_parser.set_defaults(run=_run_queues)
+
+    sll_ops = subparsers.add_parser(
+        'sll-ops',
+        help='memoized HashNode list operations on lists with shared tails',
+        description=bench_sll_ops.__doc__.strip().splitlines()[0],
+    )
+    sll_ops.add_argument('--lists', type=int, default=20,
+                         help='number of lists sharing a tail')
+    sll_ops.add_argument('--prefix-length', type=int, default=10,
+                         help='number of distinct values before the tail')
+    sll_ops.add_argument('--tail-length', type=int, default=10_000,
+                         help='number of values in the shared tail')
+    sll_ops.set_defaults(run=_run_sll_ops)
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the benchmark given on the command line."""
+    args = _parse_args(argv)
+    args.run(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""
+Thread-safe blocking queues, wrapping the generalized queues in queues.py.
+
+The queue types in queues.py are not thread-safe. BlockingQueue makes any of
+them safe to share between threads, and lets consumers wait for items and
+producers wait for room, without polling. It does this with a lock and two
+condition variables, in the same way as the standard library's queue.Queue.
+The wrapped queue determines the order items come out in, and the asymptotic
+cost of each operation, which BlockingQueue adds only O(1) to.
+"""
+
+__all__ = ['QueueClosedError', 'BlockingQueue']
+
+import threading
+
+
+class QueueClosedError(Exception):
+    """An operation can't proceed because the queue is (or was) closed."""
+
+
+class BlockingQueue:
+    """
+    A thread-safe wrapper for a queues.Queue, with blocking and closing.
+
+    If a capacity is given, enqueue blocks while the queue is full. Dequeue
+    blocks while the queue is empty. Both accept a timeout in seconds, after
+    which they give up by raising TimeoutError. A timeout of None (the default)
+    waits indefinitely. A timeout of 0 doesn't wait at all.
+
+    Closing a BlockingQueue prevents further enqueues and wakes all waiting
+    threads. Items already in the queue may still be dequeued. Once they are
+    gone, dequeue raises QueueClosedError instead of waiting forever.
+
+    >>> from palgoviz.queues import FifoQueue
+    >>> bq = BlockingQueue.wrap(FifoQueue.create(), capacity=2)
+    >>> bq.enqueue('ham'); bq.enqueue('spam')
+    >>> bq.enqueue('eggs', timeout=0)
+    Traceback (most recent call last):
+      ...
+    TimeoutError: Timed out waiting to enqueue
+    >>> bq.close()
+    >>> bq.dequeue(), bq.dequeue()
+    ('ham', 'spam')
+    >>> bq.dequeue()  # doctest: +IGNORE_EXCEPTION_DETAIL
+    Traceback (most recent call last):
+      ...
+    QueueClosedError: Can't dequeue from closed, empty queue
+    """
+
+    __slots__ = ('_queue', '_capacity', '_closed', '_not_empty', '_not_full')
+
+    @classmethod
+    def wrap(cls, queue, *, capacity=None):
+        """Wrap a queue to be used only through this BlockingQueue."""
+        return cls(queue, capacity=capacity)
+
+    def __init__(self, queue, *, capacity=None):
+        """
+        Create a BlockingQueue wrapping a queue, optionally bounded.
+
+        The caller should not access the wrapped queue directly afterwards.
+        """
+        if capacity is not None and capacity < 1:
+            raise ValueError('capacity must be positive (or None)')
+
+        lock = threading.Lock()
+        self._queue = queue
+        self._capacity = capacity
+        self._closed = False
+        self._not_empty = threading.Condition(lock)
+        self._not_full = threading.Condition(lock)
+
+    def __repr__(self):
+        """Representation for debugging. Shows the capacity and state."""
+        state = 'closed' if self.closed else 'open'
+        return (f'<{type(self).__name__} of {type(self._queue).__name__}, '
+                f'capacity={self.capacity!r}, {state}>')
+
+    def __bool__(self):
+        """Check if there are items. (Another thread may soon change this.)"""
+        with self._not_empty:
+            return bool(self._queue)
+
+    def __len__(self):
+        """Count the items. (Another thread may soon change this.)"""
+        with self._not_empty:
+            return len(self._queue)
+
+    @property
+    def capacity(self):
+        """The most items this queue holds at once, or None if unbounded."""
+        return self._capacity
+
+    @property
+    def closed(self):
+        """Whether this queue has been closed."""
+        return self._closed
+
+    def enqueue(self, item, *, timeout=None):
+        """Enqueue an item, waiting for room if the queue is full."""
+        with self._not_full:
+            if not self._not_full.wait_for(self._can_enqueue, timeout):
+                raise TimeoutError('Timed out waiting to enqueue')
+            if self._closed:
+                raise QueueClosedError("Can't enqueue to closed queue")
+
+            self._queue.enqueue(item)
+            self._not_empty.notify()
+
+    def dequeue(self, *, timeout=None):
+        """Dequeue an item, waiting for one if the queue is empty."""
+        with self._not_empty:
+            if not self._not_empty.wait_for(self._can_dequeue, timeout):
+                raise TimeoutError('Timed out waiting to dequeue')
+            if not self._queue:
+                raise QueueClosedError(
+                    "Can't dequeue from closed, empty queue")
+
+            item = self._queue.dequeue()
+            self._not_full.notify()
+            return item
+
+    def peek(self):
+        """Return the item that would be dequeued next, without waiting."""
+        with self._not_empty:
+            if not self._queue:
+                raise LookupError("Can't peek from empty queue")
+            return self._queue.peek()
+
+    def close(self):
+        """Close this queue, waking all waiting threads. Idempotent."""
+        with self._not_empty:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+
+    def _can_enqueue(self):
+        """Check if enqueue should stop waiting. Caller must hold the lock."""
+        return (self._closed or self._capacity is None
+                or len(self._queue) < self._capacity)
+
+    def _can_dequeue(self):
+        """Check if dequeue should stop waiting. Caller must hold the lock."""
+        return self._closed or bool(self._queue)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -19,14 +19,41 @@ Caching decorators.
 Most other decorators, not related to caching, are in decorators.py.
 """
 
-__all__ = ['memoize', 'memoize_by']
+__all__ = ['CacheInfo', 'SqliteStore', 'memoize', 'memoize_by']
 
+import collections
+import contextlib
 import functools
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
 
+_POLICIES = ('lru', 'lfu')
+"""Eviction policies supported for caches with a maxsize."""
 
-def memoize(func):
+_FAST_KEY_TYPES = frozenset({int, str})
+"""Types of lone arguments that are their own keys, even with typed=True."""
+
+_KWARGS_MARK = object()
+"""Separator between positional and keyword arguments in cache keys."""
+
+
+class CacheInfo(collections.namedtuple(
+        'CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])):
+    """Statistics reported by a memoized function's cache_info() method."""
+
+    __slots__ = ()
+
+
+def memoize(optional_func=None, /, *, maxsize=None, policy='lru', ttl=None,
+            timer=time.monotonic, thread_safe=False, typed=False):
     """
-    Decorator that memoizes a naive implementation of an algorithm.
+    Optionally parameterized decorator for caching a function's results.
+
+    This makes a naive implementation of an algorithm memoized.
 
     >>> @memoize
     ... def f(n):
@@ -51,24 +78,111 @@ def memoize(func):
     8
     >>> f(2)
     4
+
+    By default, the cache grows without bound. Passing maxsize bounds it.
+    Then, when it is full, an entry is evicted to make room for each new one,
+    according to the policy: 'lru' (least recently used, the default) or 'lfu'
+    (least frequently used, with ties broken by least recent use). Passing ttl
+    makes entries expire that many seconds after they were computed, as
+    measured by timer. Lookups and insertions are O(1) for every combination.
+
+    The wrapper has a cache_info() method, returning a CacheInfo, and a
+    cache_clear() method, which empties the cache and resets its statistics:
+
+    >>> @memoize(maxsize=2)
+    ... def h(n):
+    ...     print(n)
+    ...     return -n
+    >>> h(1), h(2), h(1)
+    1
+    2
+    (-1, -2, -1)
+    >>> h(3)  # Evicts h(2), which was less recently used than h(1).
+    3
+    -3
+    >>> h(1), h(2)
+    2
+    (-1, -2)
+    >>> h.cache_info()
+    CacheInfo(hits=2, misses=4, maxsize=2, currsize=2)
+    >>> h.cache_clear()
+    >>> h.cache_info()
+    CacheInfo(hits=0, misses=0, maxsize=2, currsize=0)
+
+    By default, the wrapper is not thread-safe. With thread_safe=True, it may
+    be called concurrently from multiple threads. Then the first caller for a
+    key computes the value, while other threads calling with that key wait for
+    it, rather than computing it again. Different keys are still computed in
+    parallel. If computing a value raises an exception, it is not cached, but
+    propagates to the caller and all waiting callers. If the function calls
+    itself recursively with the same key, RuntimeError is raised instead of
+    deadlocking.
+
+    The function may take any number of positional and keyword arguments, all
+    of which must be hashable. Keyword arguments are matched in the order they
+    are passed, so f(x=1, y=2) and f(y=2, x=1) are cached separately. With
+    typed=True, arguments of different types are cached separately, even if
+    they are equal, such as 3 and 3.0:
+
+    >>> @memoize
+    ... def power(base, exponent=2):
+    ...     print(f'Computing {base}**{exponent}.')
+    ...     return base**exponent
+    >>> power(3), power(3, exponent=3), power(3), power(3, exponent=3)
+    Computing 3**2.
+    Computing 3**3.
+    (9, 27, 9, 27)
     """
-    cache = {}
+    if optional_func is not None:
+        return memoize(maxsize=maxsize, policy=policy, ttl=ttl, timer=timer,
+                       thread_safe=thread_safe, typed=typed)(optional_func)
 
-    @functools.wraps(func)
-    def wrapper(arg):
-        if arg not in cache:
-            cache[arg] = func(arg)
-        return cache[arg]
+    def decorator(func):
+        cache = _Cache(maxsize=maxsize, policy=policy, ttl=ttl, timer=timer)
+        if thread_safe:
+            return _synchronized_wrapper(
+                func,
+                lambda *args, **kwargs: _make_key(args, kwargs, typed),
+                cache)
 
-    return wrapper
+        lookup = cache.lookup
+        insert = cache.store
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # Inline _make_key's fast path, to avoid a call on common hits.
+            if (not kwargs and len(args) == 1
+                    and (type(args[0]) in _FAST_KEY_TYPES
+                         or not (typed or isinstance(args[0], tuple)))):
+                arg_key = args[0]
+            else:
+                arg_key = _make_key(args, kwargs, typed)
+
+            value = lookup(arg_key)
+            if value is _MISSING:
+                value = func(*args, **kwargs)
+                insert(arg_key, value)
+            return value
+
+        wrapper.cache_info = cache.info
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
 
 
-def memoize_by(key):
+def memoize_by(key, /, *, maxsize=None, policy='lru', ttl=None,
+               timer=time.monotonic, thread_safe=False, store=None,
+               namespace=None):
     """
     Parameterized decorator for caching using a key selector.
 
     This is like @memoize except the specified key selector function, key, maps
-    arguments to hashable objects that are used as dictionary keys.
+    arguments to hashable objects that are used as dictionary keys. The key
+    selector is called with the same positional and keyword arguments as the
+    decorated function, which don't need to be hashable. It supports the same
+    maxsize, policy, ttl, timer, and thread_safe options as @memoize, and the
+    same cache_info() and cache_clear() methods.
 
     NOTE: Argument values are NOT stored. For example, in @memoize_by(id),
     objects whose ids are taken are *not* kept alive by their ids being cached.
@@ -88,21 +202,784 @@ def memoize_by(key):
     5
     >>> length('bye')
     3
+    >>> length.cache_info()
+    CacheInfo(hits=2, misses=2, maxsize=None, currsize=2)
+    >>> @memoize_by(lambda items, *, start=0: (tuple(items), start))
+    ... def total(items, *, start=0):
+    ...     print(f'Adding up {items!r}.')
+    ...     return sum(items, start)
+    >>> total([1, 2, 3]), total([1, 2, 3]), total([1, 2, 3], start=10)
+    Adding up [1, 2, 3].
+    Adding up [1, 2, 3].
+    (6, 6, 16)
+
+    To keep the cache on disk, pass a SqliteStore as store. Then cached values
+    survive restarts and are shared by all processes using the same file. Keys
+    are looked up by a hash of their pickled form, so they should be made of
+    types that pickle the same way every time, such as str, int, and tuple.
+    Frozensets, whose pickled form follows their hash-randomized iteration
+    order, are also fine, because their elements are put in a canonical order
+    first, in keys and in tuples and frozensets in keys.
+    Eviction is then by the store's max_bytes, so maxsize and ttl don't apply.
+
+    A function's entries in a store are kept apart from other functions' by
+    namespace, a string that defaults to the function's module and qualified
+    name. Functions that may share that name, such as closures made by the
+    same factory, or lambdas, must each be given their own namespace, else
+    ValueError is raised.
     """
+    if namespace is not None and store is None:
+        raise ValueError('namespace can only be used with a store')
+
     def decorator(func):
-        cache = {}
+        cache = _Cache(
+            maxsize=maxsize, policy=policy, ttl=ttl, timer=timer,
+            store=(None if store is None
+                   else store.bind(_store_namespace(func, namespace))))
+        if thread_safe:
+            return _synchronized_wrapper(func, key, cache)
+
+        lookup = cache.lookup
+        insert = cache.store
 
         @functools.wraps(func)
-        def wrapper(arg):
-            if key(arg) not in cache:
-                cache[key(arg)] = func(arg)
-            return cache[key(arg)]
+        def wrapper(*args, **kwargs):
+            # Computed once, since key may be expensive.
+            arg_key = key(*args, **kwargs)
+            value = lookup(arg_key)
+            if value is _MISSING:
+                value = func(*args, **kwargs)
+                insert(arg_key, value)
+            return value
 
+        wrapper.cache_info = cache.info
+        wrapper.cache_clear = cache.clear
         return wrapper
 
     return decorator
 
 
+def _store_namespace(func, namespace):
+    """Get the namespace for func's entries in a store, if it can have one."""
+    if namespace is not None:
+        return namespace
+
+    qualname = func.__qualname__
+    if '<locals>' in qualname or '<lambda>' in qualname:
+        raise ValueError(f'{qualname} may share its name with other '
+                         'functions, so it needs its own namespace')
+
+    return f'{func.__module__}.{qualname}'
+
+
+def _synchronized_wrapper(func, key, cache):
+    """
+    Make a thread-safe memoizing wrapper for func, using key and cache.
+
+    A lock guards the cache, but is not held while func runs. Instead, each key
+    being computed has an _InFlightCall, which other threads calling with that
+    key wait on.
+    """
+    lock = threading.Lock()
+    in_flight = {}  # Maps each key whose value is being computed to its call.
+    lookup = cache.lookup
+    insert = cache.store
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        arg_key = key(*args, **kwargs)
+
+        with lock:
+            value = lookup(arg_key)
+            if value is not _MISSING:
+                return value
+
+            call = in_flight.get(arg_key)
+            if call is None:
+                call = in_flight[arg_key] = _InFlightCall()
+                owner = True
+            elif call.thread_id == threading.get_ident():
+                raise RuntimeError(
+                    f'{func.__qualname__} reentered for a key it is computing')
+            else:
+                owner = False
+
+        if not owner:
+            return call.wait()
+
+        try:
+            value = func(*args, **kwargs)
+        except BaseException as error:
+            with lock:
+                del in_flight[arg_key]
+            call.fail(error)
+            raise
+
+        with lock:
+            insert(arg_key, value)
+            del in_flight[arg_key]
+        call.succeed(value)
+        return value
+
+    def cache_info():
+        """Report the cache's statistics."""
+        with lock:
+            return cache.info()
+
+    def cache_clear():
+        """Remove all entries from the cache and reset its statistics."""
+        with lock:
+            cache.clear()
+
+    wrapper.cache_info = cache_info
+    wrapper.cache_clear = cache_clear
+    return wrapper
+
+
+def _make_key(args, kwargs, typed):
+    """
+    Make a cache key from positional and keyword arguments.
+
+    A lone argument that is not a tuple is its own key, avoiding building a
+    tuple. This can't collide with other keys, which are always tuples, and
+    equal arguments, such as 1 and 1.0, share a key whatever their types. With
+    typed=True, only a lone int or str is its own key, since other arguments
+    equal to it have other types and so get tuple keys. Otherwise, the key is
+    a flat tuple of the positional arguments, then (if there are keyword
+    arguments) a marker and the keyword names and values in the order passed.
+    With typed=True, the arguments' types are appended.
+    """
+    if not kwargs and len(args) == 1:
+        arg = args[0]
+        if (type(arg) in _FAST_KEY_TYPES
+                or not (typed or isinstance(arg, tuple))):
+            return arg
+
+    key = args
+    if kwargs:
+        key += (_KWARGS_MARK,)
+        for item in kwargs.items():
+            key += item
+    if typed:
+        key += tuple(type(arg) for arg in args)
+        if kwargs:
+            key += tuple(type(value) for value in kwargs.values())
+    return key
+
+
+class _InFlightCall:
+    """A value being computed by one thread, which other threads may await."""
+
+    __slots__ = ('thread_id', '_done', '_value', '_error')
+
+    def __init__(self):
+        """Create a call that is being made on the current thread."""
+        self.thread_id = threading.get_ident()
+        self._done = threading.Event()
+        self._value = self._error = None
+
+    def wait(self):
+        """Wait for the call to finish. Return its value or raise its error."""
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+    def succeed(self, value):
+        """Finish the call with a value, waking waiting threads."""
+        self._value = value
+        self._done.set()
+
+    def fail(self, error):
+        """Finish the call with an exception, waking waiting threads."""
+        self._error = error
+        self._done.set()
+
+
+class SqliteStore:
+    """
+    Persistent storage for @memoize_by caches, in an SQLite database file.
+
+    Many functions, threads, and processes may use the same file at once. Each
+    thread in each process gets its own connection. The database uses write-
+    ahead logging, and writes are serialized in short transactions, so readers
+    don't block writers and concurrent writes are safe.
+
+    Values are converted to bytes with serializer.dumps and back with
+    serializer.loads. The default serializer is the pickle module. If max_bytes
+    is not None, the least recently used entries, across all functions using
+    the file, are evicted to keep the total size of serialized values within
+    max_bytes. A value larger than max_bytes is not kept at all.
+
+    Cache hits are reads, so hits in many processes don't wait for each other.
+    To track recency for eviction, a hit writes the entry's access time, but
+    only if max_bytes is not None, and only if the access time it would replace
+    is more than a second old. So recency is only precise to about a second.
+
+    >>> import os, tempfile
+    >>> tmp = tempfile.TemporaryDirectory()
+    >>> store = SqliteStore(os.path.join(tmp.name, 'cache.sqlite3'))
+    >>> @memoize_by(str.casefold, store=store, namespace='length')
+    ... def length(text):
+    ...     print(f'Computing the length of {text!r}.')
+    ...     return len(text)
+    >>> length('hello'), length('HELLO')
+    Computing the length of 'hello'.
+    (5, 5)
+
+    A function in the same namespace uses the same entries, as a function does
+    when its program is run again:
+
+    >>> @memoize_by(str.casefold, store=store, namespace='length')
+    ... def length(text):
+    ...     print(f'Computing the length of {text!r}.')
+    ...     return len(text)
+    >>> length('Hello')
+    5
+    >>> store.close(); tmp.cleanup()
+    """
+
+    __slots__ = ('_path', '_serializer', '_max_bytes', '_timeout', '_local')
+
+    _TOUCH_INTERVAL_NS = 1_000_000_000
+    """How old, in nanoseconds, a hit entry's access time must be to update."""
+
+    def __init__(self, path, *, serializer=pickle, max_bytes=None,
+                 timeout=30.0):
+        """
+        Open or create a store in the SQLite database at path.
+
+        The timeout is how long, in seconds, to wait for another connection's
+        write transaction to finish before giving up.
+        """
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError('max_bytes must be nonnegative (or None)')
+
+        self._path = os.fspath(path)
+        self._serializer = serializer
+        self._max_bytes = max_bytes
+        self._timeout = timeout
+        self._local = threading.local()
+
+        with self._write() as connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    namespace TEXT NOT NULL,
+                    digest BLOB NOT NULL,
+                    value BLOB NOT NULL,
+                    accessed INTEGER NOT NULL,
+                    PRIMARY KEY (namespace, digest)
+                ) WITHOUT ROWID
+            """)
+            connection.execute("""
+                CREATE INDEX IF NOT EXISTS entries_by_access
+                ON entries (accessed)
+            """)
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS totals (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    bytes INTEGER NOT NULL
+                )
+            """)
+            connection.execute(
+                'INSERT OR IGNORE INTO totals (id, bytes) VALUES (0, 0)')
+
+    def __repr__(self):
+        """Representation for debugging."""
+        return (f'{type(self).__name__}({self._path!r}, '
+                f'max_bytes={self._max_bytes!r})')
+
+    @property
+    def path(self):
+        """The path to the database file."""
+        return self._path
+
+    @property
+    def max_bytes(self):
+        """The most bytes of values kept, or None if unbounded."""
+        return self._max_bytes
+
+    def total_bytes(self):
+        """Get the total size of all serialized values in the store."""
+        [(total,)] = self._connection().execute(
+            'SELECT bytes FROM totals WHERE id = 0')
+        return total
+
+    def bind(self, namespace):
+        """
+        Get storage for one function's cache, whose entries are in namespace.
+
+        This is called by @memoize_by. It rarely needs to be called directly.
+        """
+        return _SqliteNamespace(self, namespace)
+
+    def close(self):
+        """Close the calling thread's connection, if it has one."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            del self._local.connection
+
+    def _connection(self):
+        """Get the calling thread's connection, opening it if necessary."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            # isolation_level=None lets _write manage transactions explicitly.
+            connection = sqlite3.connect(self._path, timeout=self._timeout,
+                                         isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            self._local.pid = os.getpid()  # Connections don't survive fork.
+        return connection
+
+    @contextlib.contextmanager
+    def _write(self):
+        """Context manager for a write transaction, which it commits."""
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    def _get(self, namespace, digest):
+        """Get a value (refreshing its access time if stale), or _MISSING."""
+        connection = self._connection()
+        row = connection.execute(
+            'SELECT value, accessed FROM entries '
+            'WHERE namespace = ? AND digest = ?',
+            (namespace, digest)).fetchone()
+        if row is None:
+            return _MISSING
+
+        # Updating takes the write lock, so avoid it when it isn't needed.
+        blob, accessed = row
+        now = time.time_ns()
+        if (self._max_bytes is not None
+                and now - accessed > self._TOUCH_INTERVAL_NS):
+            connection.execute(
+                'UPDATE entries SET accessed = ? '
+                'WHERE namespace = ? AND digest = ?',
+                (now, namespace, digest))
+        return self._serializer.loads(blob)
+
+    def _put(self, namespace, digest, value):
+        """Store a value, then evict entries if the store is too big."""
+        blob = self._serializer.dumps(value)
+
+        with self._write() as connection:
+            self._delete(connection, namespace, digest)
+
+            # A value that can never fit must not evict the entries that do.
+            if self._max_bytes is not None and len(blob) > self._max_bytes:
+                return
+
+            connection.execute(
+                'INSERT INTO entries (namespace, digest, value, accessed) '
+                'VALUES (?, ?, ?, ?)',
+                (namespace, digest, blob, time.time_ns()))
+            connection.execute(
+                'UPDATE totals SET bytes = bytes + ? WHERE id = 0',
+                (len(blob),))
+            if self._max_bytes is not None:
+                self._evict(connection)
+
+    def _pop(self, namespace, digest):
+        """Remove an entry."""
+        with self._write() as connection:
+            self._delete(connection, namespace, digest)
+
+    def _count(self, namespace):
+        """Count the entries in a namespace."""
+        [(count,)] = self._connection().execute(
+            'SELECT COUNT(*) FROM entries WHERE namespace = ?', (namespace,))
+        return count
+
+    def _clear(self, namespace):
+        """Remove all entries in a namespace."""
+        with self._write() as connection:
+            [(size,)] = connection.execute(
+                'SELECT COALESCE(SUM(LENGTH(value)), 0) FROM entries '
+                'WHERE namespace = ?', (namespace,))
+            connection.execute('DELETE FROM entries WHERE namespace = ?',
+                               (namespace,))
+            connection.execute(
+                'UPDATE totals SET bytes = bytes - ? WHERE id = 0', (size,))
+
+    @staticmethod
+    def _delete(connection, namespace, digest):
+        """Delete an entry, if present, in a write transaction."""
+        row = connection.execute(
+            'SELECT LENGTH(value) FROM entries '
+            'WHERE namespace = ? AND digest = ?',
+            (namespace, digest)).fetchone()
+        if row is None:
+            return
+        connection.execute(
+            'DELETE FROM entries WHERE namespace = ? AND digest = ?',
+            (namespace, digest))
+        connection.execute(
+            'UPDATE totals SET bytes = bytes - ? WHERE id = 0', row)
+
+    def _evict(self, connection):
+        """Evict least recently used entries until within max_bytes."""
+        [(total,)] = connection.execute(
+            'SELECT bytes FROM totals WHERE id = 0')
+        excess = total - self._max_bytes
+        if excess <= 0:
+            return
+
+        victims = []
+        for namespace, digest, size in connection.execute(
+                'SELECT namespace, digest, LENGTH(value) FROM entries '
+                'ORDER BY accessed'):
+            victims.append((namespace, digest))
+            excess -= size
+            if excess <= 0:
+                break
+
+        for namespace, digest in victims:
+            self._delete(connection, namespace, digest)
+
+
+class _Cache:
+    """
+    Cache for a memoized function, with optional eviction and expiration.
+
+    On a hit, lookup probes the underlying storage just once. With a ttl, each
+    value is stored together with its deadline, so checking expiration does not
+    take another probe.
+    """
+
+    __slots__ = ('_store', '_maxsize', '_ttl', '_timer', '_deadlines',
+                 '_hits', '_misses')
+
+    def __init__(self, *, maxsize, policy, ttl, timer, store=None):
+        """Create a cache with the given options, using store if not None."""
+        if store is not None and (maxsize is not None or ttl is not None):
+            raise ValueError("maxsize and ttl can't be used with a store")
+        if maxsize is not None and maxsize < 0:
+            raise ValueError('maxsize must be nonnegative (or None)')
+        if policy not in _POLICIES:
+            raise ValueError(f'policy must be one of {_POLICIES!r}')
+        if ttl is not None and ttl <= 0:
+            raise ValueError('ttl must be positive (or None)')
+
+        if store is not None:
+            self._store = store
+        elif maxsize is None:
+            self._store = _UnboundedStore()
+        elif policy == 'lru':
+            self._store = _LruStore(maxsize)
+        else:
+            self._store = _LfuStore(maxsize)
+
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._timer = timer
+        # Keys in order of expiration, which is the order they were stored in.
+        self._deadlines = None if ttl is None else collections.OrderedDict()
+        self._hits = self._misses = 0
+
+    def lookup(self, key):
+        """Get the value for key (a hit) or _MISSING (a miss). Count which."""
+        value = self._store[key]
+
+        if value is not _MISSING and self._ttl is not None:
+            value, deadline = value
+            if self._timer() >= deadline:
+                self._store.pop(key)
+                del self._deadlines[key]
+                value = _MISSING
+
+        if value is _MISSING:
+            self._misses += 1
+        else:
+            self._hits += 1
+        return value
+
+    def store(self, key, value):
+        """Store a value for key, which lookup has just reported missing."""
+        if self._maxsize == 0:
+            return
+
+        if self._ttl is not None:
+            self._expire()
+            deadline = self._timer() + self._ttl
+            self._deadlines[key] = deadline
+            self._deadlines.move_to_end(key)  # In case func stored it too.
+            value = (value, deadline)
+
+        evicted = self._store.put(key, value)
+        if evicted is not _MISSING and self._ttl is not None:
+            del self._deadlines[evicted]
+
+    def info(self):
+        """Report the cache's statistics."""
+        return CacheInfo(hits=self._hits, misses=self._misses,
+                         maxsize=self._maxsize, currsize=len(self._store))
+
+    def clear(self):
+        """Remove all entries from the cache and reset its statistics."""
+        self._store.clear()
+        if self._deadlines is not None:
+            self._deadlines.clear()
+        self._hits = self._misses = 0
+
+    def _expire(self):
+        """Remove expired entries. This takes amortized O(1) time."""
+        now = self._timer()
+        deadlines = self._deadlines
+        while deadlines:
+            key, deadline = next(iter(deadlines.items()))
+            if deadline > now:
+                break
+            del deadlines[key]
+            self._store.pop(key)
+
+
+_MISSING = object()
+"""Sentinel indicating the absence of a key."""
+
+
+class _UnboundedStore(dict):
+    """
+    Cache storage that never evicts anything.
+
+    Subscripting gives _MISSING for absent keys. Since this is a dict, a hit
+    runs no Python code.
+    """
+
+    __slots__ = ()
+
+    def __missing__(self, key):
+        return _MISSING
+
+    def put(self, key, value):
+        """Store a value. Return the evicted key, which is always _MISSING."""
+        self[key] = value
+        return _MISSING
+
+
+class _LruStore:
+    """
+    Cache storage that evicts the least recently used entry when full.
+
+    Subscripting gives _MISSING for absent keys.
+    """
+
+    __slots__ = ('_table', '_maxsize')
+
+    def __init__(self, maxsize):
+        """Create an empty store that holds up to maxsize entries."""
+        self._table = collections.OrderedDict()  # Least recently used first.
+        self._maxsize = maxsize
+
+    def __len__(self):
+        return len(self._table)
+
+    def __getitem__(self, key):
+        value = self._table.get(key, _MISSING)
+        if value is not _MISSING:
+            self._table.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        """Store a value. Return the evicted key, if any, else _MISSING."""
+        self._table[key] = value
+        self._table.move_to_end(key)
+        if len(self._table) <= self._maxsize:
+            return _MISSING
+        evicted, _ = self._table.popitem(last=False)
+        return evicted
+
+    def pop(self, key):
+        """Remove an entry."""
+        del self._table[key]
+
+    def clear(self):
+        """Remove all entries."""
+        self._table.clear()
+
+
+class _LfuStore:
+    """
+    Cache storage that evicts the least frequently used entry when full.
+
+    Ties are broken by evicting the least recently used. Each entry is in a
+    bucket for its use count, and the buckets form a doubly linked list in
+    increasing order of count, so every operation takes O(1) time.
+    Subscripting gives _MISSING for absent keys.
+    """
+
+    __slots__ = ('_entries', '_sentinel', '_maxsize')
+
+    def __init__(self, maxsize):
+        """Create an empty store that holds up to maxsize entries."""
+        self._entries = {}  # Maps each key to its _LfuEntry.
+        self._sentinel = _LfuBucket(0)
+        self._sentinel.prev = self._sentinel.next = self._sentinel
+        self._maxsize = maxsize
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getitem__(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        self._promote(key, entry)
+        return entry.value
+
+    def put(self, key, value):
+        """Store a value. Return the evicted key, if any, else _MISSING."""
+        try:
+            entry = self._entries[key]
+        except KeyError:
+            pass
+        else:
+            # Replacing a value (such as an expired one) restarts its count.
+            self._unlink_key(key, entry)
+
+        evicted = _MISSING
+        if len(self._entries) >= self._maxsize and key not in self._entries:
+            evicted = next(iter(self._sentinel.next.keys))
+            self._unlink_key(evicted, self._entries.pop(evicted))
+
+        first = self._sentinel.next
+        if first.count != 1:
+            first = self._insert_bucket_after(self._sentinel, 1)
+        first.keys[key] = None
+        self._entries[key] = _LfuEntry(value, first)
+        return evicted
+
+    def pop(self, key):
+        """Remove an entry."""
+        self._unlink_key(key, self._entries.pop(key))
+
+    def clear(self):
+        """Remove all entries."""
+        self._entries.clear()
+        self._sentinel.prev = self._sentinel.next = self._sentinel
+
+    def _promote(self, key, entry):
+        """Move a key into the bucket for one more use than it had."""
+        bucket = entry.bucket
+        target = bucket.next
+        if target.count != bucket.count + 1:
+            target = self._insert_bucket_after(bucket, bucket.count + 1)
+        target.keys[key] = None
+        self._unlink_key(key, entry)
+        entry.bucket = target
+
+    @staticmethod
+    def _insert_bucket_after(bucket, count):
+        """Create a bucket for count, linked in after a given bucket."""
+        new_bucket = _LfuBucket(count)
+        new_bucket.prev = bucket
+        new_bucket.next = bucket.next
+        bucket.next.prev = new_bucket
+        bucket.next = new_bucket
+        return new_bucket
+
+    @staticmethod
+    def _unlink_key(key, entry):
+        """Remove a key from its bucket, and the bucket if it becomes empty."""
+        bucket = entry.bucket
+        del bucket.keys[key]
+        if not bucket.keys:
+            bucket.prev.next = bucket.next
+            bucket.next.prev = bucket.prev
+
+
+class _LfuBucket:
+    """Node in _LfuStore's list of buckets. Holds keys used count times."""
+
+    __slots__ = ('count', 'keys', 'prev', 'next')
+
+    def __init__(self, count):
+        """Create an empty, unlinked bucket for count."""
+        self.count = count
+        self.keys = {}  # Used as an ordered set, least recently used first.
+        self.prev = self.next = None
+
+
+class _LfuEntry:
+    """A value in an _LfuStore, and the bucket its key is in."""
+
+    __slots__ = ('value', 'bucket')
+
+    def __init__(self, value, bucket):
+        """Create an entry for a value whose key is in a bucket."""
+        self.value = value
+        self.bucket = bucket
+
+
+class _SqliteNamespace:
+    """
+    Cache storage for one function, backed by a SqliteStore.
+
+    Keys are identified by the SHA-256 digest of their pickled form, after
+    _canonical is applied. Subscripting gives _MISSING for absent keys.
+    """
+
+    __slots__ = ('_store', '_namespace')
+
+    def __init__(self, store, namespace):
+        """Create storage for the namespace's entries in store."""
+        self._store = store
+        self._namespace = namespace
+
+    def __len__(self):
+        return self._store._count(self._namespace)
+
+    def __getitem__(self, key):
+        return self._store._get(self._namespace, _digest(key))
+
+    def put(self, key, value):
+        """Store a value. Return _MISSING, as evictions aren't reported."""
+        self._store._put(self._namespace, _digest(key), value)
+        return _MISSING
+
+    def pop(self, key):
+        """Remove an entry."""
+        self._store._pop(self._namespace, _digest(key))
+
+    def clear(self):
+        """Remove all entries."""
+        self._store._clear(self._namespace)
+
+
+class _SortedSet(tuple):
+    """Canonical stand-in for a set in a key: its elements' pickles, sorted."""
+
+    __slots__ = ()
+
+
+def _canonical(key):
+    """
+    Make a key's pickled form the same in every process. For _digest.
+
+    Sets and frozensets, including in tuples, become _SortedSet instances,
+    since otherwise they pickle in an order that depends on string hashing,
+    which is randomized per process. Other objects are used as they are.
+    """
+    if type(key) is tuple:
+        return tuple(map(_canonical, key))
+    if isinstance(key, (set, frozenset)):
+        return _SortedSet(sorted(pickle.dumps(_canonical(item), protocol=4)
+                                 for item in key))
+    return key
+
+
+def _digest(key):
+    """Compute a stable digest of a key, for finding it in a SqliteStore."""
+    return hashlib.sha256(pickle.dumps(_canonical(key), protocol=4)).digest()
+
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod()
@@ -101,7 +101,8 @@ class Patient:
         Use initials, not name, for privacy. Change them on patient request.
 
         Pass a starting priority (severity), which may need to be updated. (In
-        some data structures, the record would need to be removed/reinserted.)
+        some data structures, the record would need to be removed/reinserted.
+        queues.IndexedMaxPriorityQueue.update_priority can change it in place.)
         """
         self._mrn = Patient._next_mrn
         Patient._next_mrn += 1
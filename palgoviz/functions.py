@@ -44,6 +44,7 @@ __all__ = [
     'as_iterator_alt',
     'count_tree_nodes',
     'count_tree_nodes_alt',
+    'count_tree_nodes_iterative',
     'count_tree_nodes_instrumented',
     'report_attributes',
     'as_closeable_func',
@@ -57,6 +58,7 @@ import itertools
 
 from palgoviz.decorators import peek_return
 from palgoviz.fibonacci import fib
+from palgoviz.recursion import fold
 from palgoviz.util import identity_function
 
 
@@ -367,6 +369,35 @@ def count_tree_nodes_alt(root):
     return count
 
 
+def count_tree_nodes_iterative(root):
+    """
+    Nonrecursively count nodes in a tuple structure.
+
+    Empty tuples and non-tuples are leaves. Other objects are internal nodes.
+    The structure is treated as a tree: objects reached in more than one way
+    are counted multiple times. But each object's count is computed only once,
+    because recursion.fold memoizes by identity. fold uses an explicit stack,
+    so this works on structures too deep for count_tree_nodes.
+
+    >>> count_tree_nodes_iterative('a parrot')
+    1
+    >>> count_tree_nodes_iterative(())
+    1
+    >>> a = ((2, 7, 1), (8, 6), (9, (4, 5)), ((((5, 4), 3), 2), 1))
+    >>> count_tree_nodes_iterative(a)
+    22
+    >>> count_tree_nodes_iterative([a])
+    1
+    >>> from palgoviz.fibonacci import fib_nest
+    >>> [count_tree_nodes_iterative(fib_nest(k)) for k in range(17)]
+    [1, 1, 3, 5, 9, 15, 25, 41, 67, 109, 177, 287, 465, 753, 1219, 1973, 3193]
+    >>> from palgoviz.recursion import make_deep_tuple
+    >>> count_tree_nodes_iterative(make_deep_tuple(100_000))
+    100001
+    """
+    return fold(root, lambda _, child_counts: 1 + sum(child_counts))
+
+
 def count_tree_nodes_instrumented(root):
     """
     Call count_tree_nodes as if it were decorated with @decorators.peek_return.
@@ -34,12 +34,16 @@ __all__ = [
     'SlowFifoQueue',
     'BiStackFifoQueue',
     'SinglyLinkedListFifoQueue',
+    'UnrolledLinkedListFifoQueue',
     'ListLifoQueue',
     'DequeLifoQueue',
     'AltDequeLifoQueue',
     'SinglyLinkedListLifoQueue',
+    'UnrolledLinkedListLifoQueue',
     'FastEnqueueMaxPriorityQueue',
     'FastDequeueMaxPriorityQueue',
+    'BinaryHeapMaxPriorityQueue',
+    'IndexedMaxPriorityQueue',
 ]
 
 from abc import ABC, abstractmethod
@@ -47,6 +51,9 @@ import bisect
 import collections
 import operator
 
+_DEFAULT_CHUNK_SIZE = 64
+"""Default number of items per node in unrolled linked list queues."""
+
 
 class Queue(ABC):
     """Abstract class representing a generalized queue."""
@@ -73,6 +80,28 @@ class Queue(ABC):
     def peek(self):
         raise NotImplementedError
 
+    def enqueue_many(self, items):
+        """Enqueue each of the given items, in order."""
+        for item in items:
+            self.enqueue(item)
+
+    def dequeue_many(self, count):
+        """
+        Dequeue count items. Return them in a list, in the order dequeued.
+
+        If there are fewer than count items, raise LookupError. None are taken.
+        """
+        self._check_dequeue_count(count)
+        return [self.dequeue() for _ in range(count)]
+
+    def _check_dequeue_count(self, count):
+        """Check that count items could be dequeued at once."""
+        if count < 0:
+            raise ValueError("Can't dequeue a negative number of items")
+        if count > len(self):
+            raise LookupError(
+                f"Can't dequeue {count} items from queue of {len(self)}")
+
 
 class FifoQueue(Queue):
     """Abstract class representing a first-in first-out queue (a "queue")."""
@@ -101,12 +130,10 @@ class PriorityQueue(Queue):
 
     __slots__ = ()
 
-    # TODO: Explore which PriorityQueue should be default. (If we implement a
-    #       binary heap in this module, then that should be the default.)
     @classmethod
     def create(cls):
         """Create a PriorityQueue instance."""
-        return FastEnqueueMaxPriorityQueue() if cls is PriorityQueue else cls()
+        return BinaryHeapMaxPriorityQueue() if cls is PriorityQueue else cls()
 
 
 class DequeFifoQueue(FifoQueue):
@@ -133,6 +160,14 @@ class DequeFifoQueue(FifoQueue):
     def peek(self):
         return self._deque[0]
 
+    def enqueue_many(self, items):
+        self._deque.extend(items)
+
+    def dequeue_many(self, count):
+        self._check_dequeue_count(count)
+        popleft = self._deque.popleft
+        return [popleft() for _ in range(count)]
+
 
 class AltDequeFifoQueue(FifoQueue):
     """
@@ -162,6 +197,14 @@ class AltDequeFifoQueue(FifoQueue):
     def peek(self):
         return self._deque[-1]
 
+    def enqueue_many(self, items):
+        self._deque.extendleft(items)
+
+    def dequeue_many(self, count):
+        self._check_dequeue_count(count)
+        pop = self._deque.pop
+        return [pop() for _ in range(count)]
+
 
 class SlowFifoQueue(FifoQueue):
     """A FIFO queue (i.e., a "queue") based on a list. Linear-time dequeue."""
@@ -187,6 +230,15 @@ class SlowFifoQueue(FifoQueue):
     def peek(self):
         return self._list[0]
 
+    def enqueue_many(self, items):
+        self._list.extend(items)
+
+    def dequeue_many(self, count):
+        self._check_dequeue_count(count)
+        result = self._list[:count]
+        del self._list[:count]
+        return result
+
 
 class BiStackFifoQueue(FifoQueue):
     """A FIFO queue (i.e., a "queue") based on two lists used as stacks."""
@@ -223,6 +275,25 @@ class BiStackFifoQueue(FifoQueue):
 
         return self._out[-1] if self._out else self._in[0]
 
+    def enqueue_many(self, items):
+        self._in.extend(items)
+
+    def dequeue_many(self, count):
+        self._check_dequeue_count(count)
+
+        if len(self._out) < count:
+            # Move everything to the output stack, oldest items on top.
+            self._in.reverse()
+            self._in.extend(self._out)
+            self._out.clear()
+            self._in, self._out = self._out, self._in
+
+        split = len(self._out) - count
+        result = self._out[split:]
+        del self._out[split:]
+        result.reverse()
+        return result
+
 
 class SinglyLinkedListFifoQueue(FifoQueue):
     """A FIFO queue (i.e., a "queue") based on a singly linked list."""
@@ -267,6 +338,153 @@ class SinglyLinkedListFifoQueue(FifoQueue):
             raise LookupError("Can't peek from empty queue")
         return self._head.value
 
+    def enqueue_many(self, items):
+        # Build a separate chain, then splice it onto the end of the list.
+        sentinel = last = _Node(None)
+        count = 0
+        for item in items:
+            last.nextn = _Node(item)
+            last = last.nextn
+            count += 1
+
+        if not count:
+            return
+
+        if self._head:
+            self._tail.nextn = sentinel.nextn
+        else:
+            self._head = sentinel.nextn
+        self._tail = last
+        self._len += count
+
+    def dequeue_many(self, count):
+        self._check_dequeue_count(count)
+        self._head, result = _take_values(self._head, count)
+        if not self._head:
+            self._tail = None
+        self._len -= count
+        return result
+
+
+class UnrolledLinkedListFifoQueue(FifoQueue):
+    """
+    A FIFO queue (i.e., a "queue") based on an unrolled linked list.
+
+    Each node is a chunk holding up to chunk_size items in a list, so there is
+    one node allocation per chunk_size enqueues, rather than per enqueue, and
+    consecutive items are stored contiguously. All operations are still O(1).
+    """
+
+    __slots__ = ('_head', '_tail', '_head_index', '_tail_index', '_len',
+                 '_chunk_size')
+
+    def __init__(self, *, chunk_size=_DEFAULT_CHUNK_SIZE):
+        """Construct an UnrolledLinkedListFifoQueue, with chunked nodes."""
+        if chunk_size < 1:
+            raise ValueError('chunk_size must be positive')
+
+        self._chunk_size = chunk_size
+        self._head = self._tail = _Chunk(chunk_size)
+        self._head_index = 0  # Index of the next item to dequeue in _head.
+        self._tail_index = 0  # Index of the next free slot in _tail.
+        self._len = 0
+
+    def __bool__(self):
+        return bool(self._len)
+
+    def __len__(self):
+        return self._len
+
+    def enqueue(self, item):
+        if self._tail_index == self._chunk_size:
+            self._tail.nextn = _Chunk(self._chunk_size)
+            self._tail = self._tail.nextn
+            self._tail_index = 0
+
+        self._tail.items[self._tail_index] = item
+        self._tail_index += 1
+        self._len += 1
+
+    def dequeue(self):
+        if not self._len:
+            raise LookupError("Can't dequeue from empty queue")
+
+        items = self._head.items
+        result = items[self._head_index]
+        items[self._head_index] = None  # Don't keep the item alive.
+        self._head_index += 1
+        self._len -= 1
+
+        if not self._len:
+            # The head and tail are the same chunk. Reuse it from the start.
+            self._head_index = self._tail_index = 0
+        elif self._head_index == self._chunk_size:
+            self._head = self._head.nextn
+            self._head_index = 0
+
+        return result
+
+    def peek(self):
+        if not self._len:
+            raise LookupError("Can't peek from empty queue")
+        return self._head.items[self._head_index]
+
+    def enqueue_many(self, items):
+        chunk_size = self._chunk_size
+        tail = self._tail
+        slots = tail.items
+        index = self._tail_index
+        count = 0
+
+        # Write into the chunks directly, but always record what was written,
+        # so an exception from the iterable leaves the queue consistent.
+        try:
+            for item in items:
+                if index == chunk_size:
+                    tail.nextn = _Chunk(chunk_size)
+                    tail = tail.nextn
+                    slots = tail.items
+                    index = 0
+                slots[index] = item
+                index += 1
+                count += 1
+        finally:
+            self._tail = tail
+            self._tail_index = index
+            self._len += count
+
+    def dequeue_many(self, count):
+        self._check_dequeue_count(count)
+
+        chunk_size = self._chunk_size
+        head = self._head
+        index = self._head_index
+        result = []
+        remaining = count
+
+        while remaining:
+            if index == chunk_size:
+                head = head.nextn
+                index = 0
+            stop = min(chunk_size, index + remaining)
+            result.extend(head.items[index:stop])
+            head.items[index:stop] = [None] * (stop - index)
+            remaining -= stop - index
+            index = stop
+
+        self._len -= count
+        if self._len:
+            if index == chunk_size:
+                head = head.nextn
+                index = 0
+            self._head = head
+            self._head_index = index
+        else:
+            self._head = self._tail  # Which is head, unless count was 0.
+            self._head_index = self._tail_index = 0
+
+        return result
+
 
 class ListLifoQueue(LifoQueue):
     """A LIFO queue (i.e., a stack) based on a list."""
@@ -292,6 +510,17 @@ class ListLifoQueue(LifoQueue):
     def peek(self):
         return self._list[-1]
 
+    def enqueue_many(self, items):
+        self._list.extend(items)
+
+    def dequeue_many(self, count):
+        self._check_dequeue_count(count)
+        split = len(self._list) - count
+        result = self._list[split:]
+        del self._list[split:]
+        result.reverse()
+        return result
+
 
 class DequeLifoQueue(LifoQueue):
     """A LIFO queue (i.e., a stack) based on a collections.deque."""
@@ -317,6 +546,14 @@ class DequeLifoQueue(LifoQueue):
     def peek(self):
         return self._deque[-1]
 
+    def enqueue_many(self, items):
+        self._deque.extend(items)
+
+    def dequeue_many(self, count):
+        self._check_dequeue_count(count)
+        pop = self._deque.pop
+        return [pop() for _ in range(count)]
+
 
 class AltDequeLifoQueue(LifoQueue):
     """
@@ -346,6 +583,14 @@ class AltDequeLifoQueue(LifoQueue):
     def peek(self):
         return self._deque[0]
 
+    def enqueue_many(self, items):
+        self._deque.extendleft(items)
+
+    def dequeue_many(self, count):
+        self._check_dequeue_count(count)
+        popleft = self._deque.popleft
+        return [popleft() for _ in range(count)]
+
 
 class SinglyLinkedListLifoQueue(LifoQueue):
     """A LIFO queue (i.e., a stack) based on a singly linked list."""
@@ -381,6 +626,134 @@ class SinglyLinkedListLifoQueue(LifoQueue):
             raise LookupError("Can't peek from empty queue")
         return self._head.value
 
+    def enqueue_many(self, items):
+        head = self._head
+        count = 0
+        for item in items:
+            head = _Node(item, head)
+            count += 1
+
+        self._head = head
+        self._len += count
+
+    def dequeue_many(self, count):
+        self._check_dequeue_count(count)
+        self._head, result = _take_values(self._head, count)
+        self._len -= count
+        return result
+
+
+class UnrolledLinkedListLifoQueue(LifoQueue):
+    """
+    A LIFO queue (i.e., a stack) based on an unrolled linked list.
+
+    Each node is a chunk holding up to chunk_size items in a list, so there is
+    one node allocation per chunk_size enqueues, rather than per enqueue, and
+    consecutive items are stored contiguously. All operations are still O(1).
+
+    A chunk emptied by dequeuing is kept until a dequeue needs the chunk below
+    it, so alternating enqueues and dequeues at a chunk boundary don't keep
+    allocating and freeing chunks.
+    """
+
+    __slots__ = ('_head', '_top_index', '_len', '_chunk_size')
+
+    def __init__(self, *, chunk_size=_DEFAULT_CHUNK_SIZE):
+        """Construct an UnrolledLinkedListLifoQueue, with chunked nodes."""
+        if chunk_size < 1:
+            raise ValueError('chunk_size must be positive')
+
+        self._chunk_size = chunk_size
+        self._head = _Chunk(chunk_size)
+        self._top_index = 0  # How many items are in _head.
+        self._len = 0
+
+    def __bool__(self):
+        return bool(self._len)
+
+    def __len__(self):
+        return self._len
+
+    def enqueue(self, item):
+        if self._top_index == self._chunk_size:
+            self._head = _Chunk(self._chunk_size, self._head)
+            self._top_index = 0
+
+        self._head.items[self._top_index] = item
+        self._top_index += 1
+        self._len += 1
+
+    def dequeue(self):
+        if not self._len:
+            raise LookupError("Can't dequeue from empty queue")
+
+        if not self._top_index:
+            self._head = self._head.nextn
+            self._top_index = self._chunk_size
+
+        self._top_index -= 1
+        items = self._head.items
+        result = items[self._top_index]
+        items[self._top_index] = None  # Don't keep the item alive.
+        self._len -= 1
+        return result
+
+    def peek(self):
+        if not self._len:
+            raise LookupError("Can't peek from empty queue")
+        if not self._top_index:
+            return self._head.nextn.items[-1]
+        return self._head.items[self._top_index - 1]
+
+    def enqueue_many(self, items):
+        chunk_size = self._chunk_size
+        head = self._head
+        slots = head.items
+        index = self._top_index
+        count = 0
+
+        # Write into the chunks directly, but always record what was written,
+        # so an exception from the iterable leaves the queue consistent.
+        try:
+            for item in items:
+                if index == chunk_size:
+                    head = _Chunk(chunk_size, head)
+                    slots = head.items
+                    index = 0
+                slots[index] = item
+                index += 1
+                count += 1
+        finally:
+            self._head = head
+            self._top_index = index
+            self._len += count
+
+    def dequeue_many(self, count):
+        self._check_dequeue_count(count)
+
+        chunk_size = self._chunk_size
+        head = self._head
+        index = self._top_index
+        result = []
+        remaining = count
+
+        while remaining:
+            if not index:
+                head = head.nextn
+                index = chunk_size
+            start = max(0, index - remaining)
+            values = head.items[start:index]
+            values.reverse()
+            result.extend(values)
+            head.items[start:index] = [None] * (index - start)
+            remaining -= index - start
+            index = start
+
+        self._head = head
+        self._top_index = index
+        self._len -= count
+        return result
+
 
 class FastEnqueueMaxPriorityQueue(PriorityQueue):
     """A max priority queue with O(1) enqueue, O(n) dequeue, and O(n) peek."""
@@ -412,6 +785,24 @@ class FastEnqueueMaxPriorityQueue(PriorityQueue):
             raise LookupError("Can't peek from empty queue")
         return max(self._list)
 
+    def enqueue_many(self, items):
+        self._list.extend(items)
+
+    def dequeue_many(self, count):
+        self._check_dequeue_count(count)
+
+        # Taking the maximum count times is O(count * n). When that would be
+        # slower than sorting, sort instead and then take from the high end.
+        if count <= len(self._list).bit_length():
+            return super().dequeue_many(count)
+
+        self._list.sort()
+        split = len(self._list) - count
+        result = self._list[split:]
+        del self._list[split:]
+        result.reverse()
+        return result
+
 
 class FastDequeueMaxPriorityQueue(PriorityQueue):
     """A max priority queue with O(n) enqueue, O(1) dequeue, and O(1) peek."""
@@ -441,6 +832,312 @@ class FastDequeueMaxPriorityQueue(PriorityQueue):
             raise LookupError("Can't peek from empty queue")
         return self._list[-1]
 
+    def enqueue_many(self, items):
+        # The list must stay sorted even if iterating items raises, so read
+        # them all before changing it. The list is already one sorted run, so
+        # the sort merges the new items into it instead of shifting the list
+        # once per item, as insort would.
+        items = list(items)
+        self._list.extend(items)
+        self._list.sort()
+
+    def dequeue_many(self, count):
+        self._check_dequeue_count(count)
+        split = len(self._list) - count
+        result = self._list[split:]
+        del self._list[split:]
+        result.reverse()
+        return result
+
+
+class BinaryHeapMaxPriorityQueue(PriorityQueue):
+    """
+    A max priority queue using a binary heap stored in a list.
+
+    Enqueue and dequeue are O(log n). Peek is O(1). Constructing from an
+    iterable of n items heapifies them all at once, in O(n) time.
+
+    Only "<" is used to compare items, so a weak ordering suffices.
+    """
+
+    __slots__ = ('_heap',)
+
+    def __init__(self, items=()):
+        """Construct a BinaryHeapMaxPriorityQueue, optionally with items."""
+        self._heap = list(items)
+        self._heapify()
+
+    def __bool__(self):
+        return bool(self._heap)
+
+    def __len__(self):
+        return len(self._heap)
+
+    def enqueue(self, item):
+        self._heap.append(item)
+        self._sift_up(len(self._heap) - 1)
+
+    def dequeue(self):
+        if not self:
+            raise LookupError("Can't dequeue from empty queue")
+
+        last = self._heap.pop()
+        if not self._heap:
+            return last
+
+        result = self._heap[0]
+        self._heap[0] = last
+        self._sift_down(0)
+        return result
+
+    def peek(self):
+        if not self:
+            raise LookupError("Can't peek from empty queue")
+        return self._heap[0]
+
+    def enqueue_many(self, items):
+        # Read all the items first, so the heap is not left out of order if
+        # iterating them raises.
+        items = list(items)
+        old_length = len(self._heap)
+        self._heap.extend(items)
+        new_length = len(self._heap)
+
+        # Sifting each new item up is O(k log n). Reheapifying is O(n).
+        if (new_length - old_length) * new_length.bit_length() < new_length:
+            for index in range(old_length, new_length):
+                self._sift_up(index)
+        else:
+            self._heapify()
+
+    def _heapify(self):
+        """Rearrange all items into heap order, in linear time."""
+        for index in reversed(range(len(self._heap) // 2)):
+            self._sift_down(index)
+
+    def _sift_up(self, index):
+        """Move the item at index rootward until its parent is no less."""
+        heap = self._heap
+        item = heap[index]
+
+        while index != 0:
+            parent = (index - 1) // 2
+            if not heap[parent] < item:
+                break
+            heap[index] = heap[parent]
+            index = parent
+
+        heap[index] = item
+
+    def _sift_down(self, index):
+        """Move the item at index leafward until no child is greater."""
+        heap = self._heap
+        length = len(heap)
+        item = heap[index]
+
+        while True:
+            child = index * 2 + 1
+            if child >= length:
+                break
+            if child + 1 < length and heap[child] < heap[child + 1]:
+                child += 1
+            if not item < heap[child]:
+                break
+            heap[index] = heap[child]
+            index = child
+
+        heap[index] = item
+
+
+class IndexedMaxPriorityQueue(PriorityQueue):
+    """
+    A max priority queue using a binary heap, whose items can be relocated.
+
+    This also maps each item's key to its position in the heap, so an item in
+    the queue can be found, reprioritized, and removed without a linear scan.
+
+    By default, items are their own keys, and thus must be hashable. Otherwise,
+    pass a key selector. For example, compare.Patient records hash by mrn, so
+    they work as their own keys, but key=operator.attrgetter('mrn') also works.
+    Items with equal keys are treated as interchangeable, like equal items in a
+    set, except that they may appear in the queue more than once.
+
+    update_priority sets an item's priority attribute by default. For items
+    that have no writable priority attribute, pass set_priority, a function
+    that takes an item and a new priority and changes the item's priority.
+
+    Enqueue, dequeue, update_priority, and remove are O(log n). Peek and "in"
+    are O(1). Only the "<" operator is used to compare items.
+    """
+
+    __slots__ = ('_heap', '_buckets', '_key', '_set_priority')
+
+    def __init__(self, *, key=None, set_priority=None):
+        """Construct an IndexedMaxPriorityQueue, optionally customized."""
+        self._heap = []  # Entries, arranged as a binary max-heap.
+        self._buckets = {}  # key -> {entry: None}, entries holding that key.
+        self._key = key
+        self._set_priority = set_priority
+
+    def __bool__(self):
+        return bool(self._heap)
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __contains__(self, item):
+        """Check if an item with the same key as the given item is queued."""
+        return self._key_of(item) in self._buckets
+
+    def enqueue(self, item):
+        entry = _HeapEntry(item, self._key_of(item), len(self._heap))
+        self._heap.append(entry)
+        self._buckets.setdefault(entry.key, {})[entry] = None
+        self._sift_up(entry.index)
+
+    def dequeue(self):
+        if not self:
+            raise LookupError("Can't dequeue from empty queue")
+        return self._remove_at(0)
+
+    def peek(self):
+        if not self:
+            raise LookupError("Can't peek from empty queue")
+        return self._heap[0].item
+
+    def update_priority(self, item, new_priority):
+        """
+        Set the priority of a queued item and restore heap order.
+
+        This is for items like compare.Patient whose order comes from a public
+        mutable priority attribute, or that the queue's set_priority function
+        can change. If such an item's priority was already changed some other
+        way, call this with its current priority to fix it.
+
+        Every queued item with the same key as the given item is updated. If
+        there are none, KeyError is raised. Each item's place in the heap is
+        restored right after its priority is set, so if setting one raises, the
+        items updated so far keep their new priorities, and the queue is still
+        in order.
+        """
+        for entry in self._bucket(item):
+            if self._set_priority is None:
+                entry.item.priority = new_priority
+            else:
+                self._set_priority(entry.item, new_priority)
+            self._restore(entry.index)
+
+    def remove(self, item):
+        """
+        Remove an item from this queue, wherever it is.
+
+        If multiple queued items have the same key as the given item, only one
+        of them is removed. If there are none, KeyError is raised.
+        """
+        entry = next(reversed(self._bucket(item)))
+        self._remove_at(entry.index)
+
+    def _key_of(self, item):
+        """Get the key the item is tracked by."""
+        return item if self._key is None else self._key(item)
+
+    def _bucket(self, item):
+        """Get the entries whose key is the same as the given item's key."""
+        try:
+            return self._buckets[self._key_of(item)]
+        except KeyError:
+            raise KeyError(item) from None
+
+    def _remove_at(self, index):
+        """Remove the entry at the index. Return the item it held."""
+        entry = self._heap[index]
+        last = self._heap.pop()
+
+        if last is not entry:
+            self._heap[index] = last
+            last.index = index
+            self._restore(index)
+
+        bucket = self._buckets[entry.key]
+        del bucket[entry]
+        if not bucket:
+            del self._buckets[entry.key]
+
+        return entry.item
+
+    def _restore(self, index):
+        """Move the entry at index up or down as needed for heap order."""
+        if self._sift_up(index) == index:
+            self._sift_down(index)
+
+    def _sift_up(self, index):
+        """Move the entry at index rootward. Return its final position."""
+        heap = self._heap
+        entry = heap[index]
+
+        while index != 0:
+            parent = (index - 1) // 2
+            if not heap[parent].item < entry.item:
+                break
+            heap[index] = heap[parent]
+            heap[index].index = index
+            index = parent
+
+        heap[index] = entry
+        entry.index = index
+        return index
+
+    def _sift_down(self, index):
+        """Move the entry at index leafward. Return its final position."""
+        heap = self._heap
+        length = len(heap)
+        entry = heap[index]
+
+        while True:
+            child = index * 2 + 1
+            if child >= length:
+                break
+            if child + 1 < length and heap[child].item < heap[child + 1].item:
+                child += 1
+            if not entry.item < heap[child].item:
+                break
+            heap[index] = heap[child]
+            heap[index].index = index
+            index = child
+
+        heap[index] = entry
+        entry.index = index
+        return index
+
+
+class _HeapEntry:
+    """Item in an IndexedMaxPriorityQueue, with its key and heap position."""
+
+    __slots__ = ('item', 'key', 'index')
+
+    def __init__(self, item, key, index):
+        """Construct a heap entry."""
+        self.item = item
+        self.key = key
+        self.index = index
+
+    def __repr__(self):
+        return (f"{type(self).__name__}({self.item!r}, {self.key!r}, "
+                f"{self.index!r})")
+
+
+def _take_values(head, count):
+    """
+    Take count values from the front of a chain of _Node objects.
+
+    Return the new head and a list of the values taken.
+    """
+    values = []
+    for _ in range(count):
+        values.append(head.value)
+        head = head.nextn
+    return head, values
+
 
 class _Node:
     """Singly linked list node for FIFO and LIFO queues."""
@@ -459,3 +1156,17 @@ class _Node:
     def value(self):
         """The value of this node."""
         return self._value
+
+
+class _Chunk:
+    """Unrolled linked list node for FIFO and LIFO queues."""
+
+    __slots__ = ('items', 'nextn')
+
+    def __init__(self, size, nextn=None):
+        """Construct an unrolled linked list node with size empty slots."""
+        self.items = [None] * size
+        self.nextn = nextn
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.items!r}, {self.nextn!r})"
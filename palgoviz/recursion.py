@@ -16,6 +16,13 @@
 """
 Some recursion examples (and a few related iterative implementations).
 
+The searches and sorts that take a sorted sequence or values to sort have a
+fast path for one-dimensional NumPy arrays. binary_search and
+binary_search_many use numpy.searchsorted. The sorts return a new array,
+sorted by numpy.sort with a stable algorithm, rather than a list. Sorts given
+a key, or a merge function or min_run other than the default, always use
+their pure-Python algorithms.
+
 See also object_graph.py.
 """
 
@@ -34,6 +41,7 @@ __all__ = [
     'binary_search_iterative_alt',
     'binary_search_slow',
     'binary_search_good',
+    'binary_search_many',
     'binary_insertion_sort',
     'binary_insertion_sort_recursive',
     'binary_insertion_sort_recursive_alt',
@@ -45,12 +53,20 @@ __all__ = [
     'merge_two_slow',
     'merge_two',
     'merge_two_alt',
+    'merge_two_galloping',
     'merge_sort',
     'merge_sort_bottom_up_unstable',
     'merge_sort_bottom_up',
+    'merge_sort_buffered',
+    'merge_sort_adaptive',
+    'merge_sort_parallel',
+    'merge_k',
+    'external_merge_sort',
     'make_deep_tuple',
     'nest',
     'observe_edge',
+    'walk',
+    'fold',
     'flatten',
     'flatten_observed',
     'flatten_iterative',
@@ -62,12 +78,43 @@ __all__ = [
     'leaf_sum_dec',
 ]
 
+import array
 import bisect
 import collections
+import collections.abc
+import concurrent.futures
+import heapq
+import itertools
+from multiprocessing import shared_memory
+import os
+import pickle
+import tempfile
+
+import numpy
 
 from palgoviz import caching
 
 
+def _is_vector(values):
+    """Check if values is a one-dimensional NumPy array."""
+    return isinstance(values, numpy.ndarray) and values.ndim == 1
+
+
+def _search_vector(values, x):
+    """Find an index to x in a sorted 1-D NumPy array, by searchsorted."""
+    index = int(numpy.searchsorted(values, x))
+    return index if index < len(values) and values[index] == x else None
+
+
+def _sort_vector(values, *, reverse=False):
+    """Return a stably sorted copy of a 1-D NumPy array."""
+    if not reverse:
+        return numpy.sort(values, kind='stable')
+
+    # Reversing before and after a stable sort keeps equal items in order.
+    return numpy.sort(values[::-1], kind='stable')[::-1]
+
+
 def countdown(n):
     """
     Recursively count down from n, printing the positive numbers, one per line.
@@ -278,6 +325,9 @@ def binary_search(values, x):
     >>> binary_search([10, 20], 15)
     >>>
     """
+    if _is_vector(values):
+        return _search_vector(values, x)
+
     def help_binary(low, high):  # high is an inclusive endpoint.
         if low > high:
             return None
@@ -479,6 +529,77 @@ def binary_search_good(values, x):
     return index if (index < len(values)) and (values[index] == x) else None
 
 
+def binary_search_many(values, needles):
+    """
+    Find an index to an occurrence of each needle in values, which is sorted.
+
+    This returns a list with, for each needle, in the same order, an index to
+    an occurrence of it in values, or None if it doesn't occur. This makes
+    fewer comparisons than calling binary_search or binary_search_iterative on
+    each needle, which is what matters when comparisons are slow.
+
+    The needles are searched for in ascending order, each search starting
+    where the last one ended. Each search is exponential, with a first step
+    of about the average distance between needles' positions, followed by a
+    binary search within the bounds found. For M sorted needles in N values,
+    this takes O(M log(N/M)) comparisons, rather than O(M log N). If the
+    needles aren't sorted, they are first sorted (indirectly, keeping their
+    order for the result), which takes O(M log M) more comparisons.
+
+    If values is a one-dimensional NumPy array, all needles are looked up
+    together by numpy.searchsorted, without a Python loop.
+
+    >>> binary_search_many([10, 20, 30], [20, 25, 10, 30])
+    [1, None, 0, 2]
+    >>> binary_search_many([], [1, 2])
+    [None, None]
+    >>> binary_search_many((4, 5, 6), iter([6]))
+    [2]
+    >>> binary_search_many(range(0, 100, 2), [4, 5, 50, 98, 99])
+    [2, None, 25, 49, None]
+    >>> binary_search_many(numpy.array([10, 20, 30]), [20, 25, 10, 30])
+    [1, None, 0, 2]
+    """
+    if _is_vector(values):
+        return _search_many_vector(values, needles)
+
+    if not isinstance(needles, collections.abc.Sequence):
+        needles = list(needles)
+
+    if all(not x2 < x1 for x1, x2 in itertools.pairwise(needles)):
+        order = range(len(needles))
+    else:
+        order = sorted(range(len(needles)), key=needles.__getitem__)
+
+    results = [None] * len(needles)
+    length = len(values)
+    step = max(length // max(len(needles), 1), 1)
+    index = 0
+
+    for position in order:
+        x = needles[position]
+        index = _gallop(values, x, index, right=False, step=step)
+        if index < length and values[index] == x:
+            results[position] = index
+
+    return results
+
+
+def _search_many_vector(values, needles):
+    """Helper for binary_search_many, to search a 1-D NumPy array."""
+    if not isinstance(needles, (numpy.ndarray, collections.abc.Sequence)):
+        needles = list(needles)
+    needles = numpy.asarray(needles)
+    if len(values) == 0:
+        return [None] * len(needles)
+
+    indices = numpy.searchsorted(values, needles)
+    found = values[numpy.minimum(indices, len(values) - 1)] == needles
+    found &= indices < len(values)
+    return [index if hit else None
+            for index, hit in zip(indices.tolist(), found.tolist())]
+
+
 def binary_insertion_sort(values):
     """
     Iterative stable binary insertion sort, creating a new list.
@@ -516,6 +637,9 @@ def binary_insertion_sort(values):
     >>> binary_insertion_sort([0.0, 0, False])  # Stable sort.
     [0.0, 0, False]
     """
+    if _is_vector(values):
+        return _sort_vector(values)
+
     output = []
     for element in values:
         bisect.insort_right(output, element)
@@ -695,6 +819,9 @@ def insertion_sort(values):
     >>> insertion_sort([0.0, 0, False])  # It's a stable sort.
     [0.0, 0, False]
     """
+    if _is_vector(values):
+        return _sort_vector(values)
+
     output = []
     for element in values:
         insort_right_linear(output, element)
@@ -915,6 +1042,98 @@ def merge_two_alt(values1, values2):
     return results
 
 
+_MIN_GALLOP = 7
+"""How many times in a row one side of a merge must win to start galloping."""
+
+
+def _gallop(values, x, start, *, right, step=1):
+    """
+    Find where x goes in sorted values, at or after start, searching outward.
+
+    This returns bisect.bisect_right(values, x, start) if right is true, or
+    bisect.bisect_left(values, x, start) if not. But it first finds bounds by
+    doubling a step from start, so it takes O(log k) time, where k is the
+    distance from start to the result, rather than O(log len(values)). If the
+    distance is probably about some known number, step can start there.
+    """
+    length = len(values)
+    low = start
+    probe = start + step - 1
+
+    while probe < length and (not x < values[probe] if right
+                              else values[probe] < x):
+        low = probe + 1
+        step *= 2
+        probe = start + step - 1
+
+    bisector = bisect.bisect_right if right else bisect.bisect_left
+    return bisector(values, x, low, min(probe, length))
+
+
+def merge_two_galloping(values1, values2):
+    """
+    Return a sorted list of items from two sorted sequences, galloping.
+
+    Separate items that appear in the same list always appear in the output in
+    that order. In addition, this is a stable merge: whenever it won't prevent
+    the output from being sorted, items in values1 appear in the output before
+    those in values2 (i.e., ties are broken in favor of items in values1).
+
+    This works like merge_two_alt until one side wins several times in a row.
+    Then it gallops: it finds how many more items that side wins by
+    exponential and binary search, and copies them all at once. So it still
+    takes linear time, but merging long blocks that don't interleave takes
+    only a logarithmic number of comparisons per block.
+
+    >>> merge_two_galloping([1, 3, 5], [2, 4, 6])
+    [1, 2, 3, 4, 5, 6]
+    >>> merge_two_galloping([2, 4, 6], [1, 3, 5])
+    [1, 2, 3, 4, 5, 6]
+    >>> merge_two_galloping([], [2, 4, 6])
+    [2, 4, 6]
+    >>> merge_two_galloping((), [2, 4, 6])
+    [2, 4, 6]
+    >>> merge_two_galloping((), [])
+    []
+    >>> merge_two_galloping((1, 1, 4, 7, 8), ())
+    [1, 1, 4, 7, 8]
+    >>> merge_two_galloping(range(0, 20, 2), range(10, 12))
+    [0, 2, 4, 6, 8, 10, 10, 11, 12, 14, 16, 18]
+    """
+    results = []
+    index1 = 0
+    index2 = 0
+    wins1 = 0
+    wins2 = 0
+
+    while index1 < len(values1) and index2 < len(values2):
+        if values2[index2] < values1[index1]:
+            results.append(values2[index2])
+            index2 += 1
+            wins1 = 0
+            wins2 += 1
+            if wins2 >= _MIN_GALLOP:
+                stop = _gallop(values2, values1[index1], index2, right=False)
+                results.extend(values2[index2:stop])
+                index2 = stop
+                wins2 = 0
+        else:
+            results.append(values1[index1])
+            index1 += 1
+            wins1 += 1
+            wins2 = 0
+            if wins1 >= _MIN_GALLOP:
+                stop = _gallop(values1, values2[index2], index1, right=True)
+                results.extend(values1[index1:stop])
+                index1 = stop
+                wins1 = 0
+
+    results.extend(values1[index1:])
+    results.extend(values2[index2:])
+
+    return results
+
+
 def merge_sort(values, *, merge=merge_two):
     """
     Merge sort recursively using a two way merge function.
@@ -940,6 +1159,9 @@ def merge_sort(values, *, merge=merge_two):
     >>> merge_sort([0.0, 0, False])  # It's a stable sort.
     [0.0, 0, False]
     """
+    if _is_vector(values) and merge is merge_two:
+        return _sort_vector(values)
+
     def helper(values):
         # base case: length is less than 2, return the list
         if len(values) < 2:
@@ -984,10 +1206,12 @@ def merge_sort_bottom_up_unstable(values, *, merge=merge_two):
     >>> merge_sort_bottom_up_unstable([0.0, 0, False])  # doctest: +SKIP
     [0.0, 0, False]
     """
-    if not values:
-        return []
+    if _is_vector(values) and merge is merge_two:
+        return _sort_vector(values)
 
     queue = collections.deque([x] for x in values)
+    if not queue:
+        return []
 
     while len(queue) > 1:
         left = queue.popleft()
@@ -1024,10 +1248,207 @@ def merge_sort_bottom_up(values, *, merge=merge_two):
     >>> merge_sort_bottom_up([0.0, 0, False])  # It's a stable sort.
     [0.0, 0, False]
     """
-    if not values:
-        return []
+    if _is_vector(values) and merge is merge_two:
+        return _sort_vector(values)
 
     queue = collections.deque([x] for x in values)
+    if not queue:
+        return []
+    queue2 = collections.deque()
+
+    while len(queue) > 1:
+        queue, queue2 = queue2, queue
+
+        while len(queue2) > 1:
+            left = queue2.popleft()
+            right = queue2.popleft()
+            queue.append(merge(left, right))
+
+        if queue2:
+            queue.append(queue2.popleft())
+
+    return queue[0]
+
+
+def _merge_runs(keys, new_keys, items, new_items, low, middle, high,
+                reverse):
+    """
+    Stably merge keys[low:middle] and keys[middle:high] into new_keys.
+
+    This works by index. If items is not None, its elements are moved in step
+    with the keys, from items into new_items. If reverse is true, the runs are
+    in descending order, and the merge keeps them that way.
+    """
+    left = low
+    right = middle
+    index = low
+
+    if left < middle and right < high:
+        left_key = keys[left]
+        right_key = keys[right]
+
+        while True:
+            if (left_key < right_key) if reverse else (right_key < left_key):
+                new_keys[index] = right_key
+                if items is not None:
+                    new_items[index] = items[right]
+                index += 1
+                right += 1
+                if right == high:
+                    break
+                right_key = keys[right]
+            else:
+                new_keys[index] = left_key
+                if items is not None:
+                    new_items[index] = items[left]
+                index += 1
+                left += 1
+                if left == middle:
+                    break
+                left_key = keys[left]
+
+    # Copy the rest of whichever run isn't used up. This is the only slicing.
+    # It copies at most one run, at C speed, and the copy is freed right away.
+    start, stop = (left, middle) if left < middle else (right, high)
+    new_keys[index:high] = keys[start:stop]
+    if items is not None:
+        new_items[index:high] = items[start:stop]
+
+
+def merge_sort_buffered(values, *, key=None, reverse=False):
+    """
+    Mergesort bottom-up, iteratively, ping-ponging with one scratch list.
+
+    This is a stable sort that supports key and reverse, like sorted. Unlike
+    merge_sort and merge_sort_bottom_up, it doesn't slice its input or make a
+    new list for each merge. Each pass merges adjacent runs from one list into
+    the other, by index, and then the lists switch roles. Runs start at length
+    1 and double each pass. If key is given, each key is computed once, and
+    the keys are merged in step with the items. The result is a new list.
+
+    >>> merge_sort_buffered([])
+    []
+    >>> merge_sort_buffered(())
+    []
+    >>> merge_sort_buffered((2,))
+    [2]
+    >>> merge_sort_buffered([20, 10])
+    [10, 20]
+    >>> a = [5660, -6307, 5315, 389, 3446, 2673, 1555, -7225, 1597, -7129]
+    >>> merge_sort_buffered(a)
+    [-7225, -7129, -6307, 389, 1555, 1597, 2673, 3446, 5315, 5660]
+    >>> merge_sort_buffered(a, reverse=True)
+    [5660, 5315, 3446, 2673, 1597, 1555, 389, -6307, -7129, -7225]
+    >>> b = ['foo', 'bar', 'baz', 'quux', 'foobar', 'ham', 'spam', 'eggs']
+    >>> merge_sort_buffered(b, key=len)
+    ['foo', 'bar', 'baz', 'ham', 'quux', 'spam', 'eggs', 'foobar']
+    >>> merge_sort_buffered(b, key=len, reverse=True)
+    ['foobar', 'quux', 'spam', 'eggs', 'foo', 'bar', 'baz', 'ham']
+    >>> merge_sort_buffered([0.0, 0, False])  # It's a stable sort.
+    [0.0, 0, False]
+    """
+    if _is_vector(values) and key is None:
+        return _sort_vector(values, reverse=reverse)
+
+    items = list(values)
+    length = len(items)
+
+    if key is None:
+        keys = items
+        items = new_items = None
+    else:
+        keys = [key(item) for item in items]
+        new_items = [None] * length
+
+    new_keys = [None] * length
+    width = 1
+
+    while width < length:
+        for low in range(0, length, width * 2):
+            middle = min(low + width, length)
+            high = min(low + width * 2, length)
+            _merge_runs(keys, new_keys, items, new_items, low, middle, high,
+                        reverse)
+
+        keys, new_keys = new_keys, keys
+        items, new_items = new_items, items
+        width *= 2
+
+    return keys if items is None else items
+
+
+def _natural_runs(values, min_run):
+    """
+    Yield sorted lists that, concatenated, are a stable sort of values.
+
+    Each list is an ascending or strictly descending run found in values, with
+    strictly descending runs reversed. Runs shorter than min_run, other than
+    the last, are extended to length min_run by binary insertion sort.
+    """
+    length = len(values)
+    start = 0
+
+    while start < length:
+        stop = start + 1
+        if stop < length and values[stop] < values[start]:
+            # Strictly descending, so reversing it doesn't break stability.
+            while stop < length and values[stop] < values[stop - 1]:
+                stop += 1
+            run = values[start:stop]
+            run.reverse()
+        else:
+            while stop < length and not values[stop] < values[stop - 1]:
+                stop += 1
+            run = values[start:stop]
+
+        if stop - start < min_run and stop < length:
+            stop = min(start + min_run, length)
+            run = binary_insertion_sort(run + values[start + len(run):stop])
+
+        yield run
+        start = stop
+
+
+def merge_sort_adaptive(values, *, merge=merge_two_galloping, min_run=32):
+    """
+    Mergesort natural runs bottom-up, using a two way merge function. Stable.
+
+    Instead of starting from runs of length 1 like merge_sort_bottom_up, this
+    starts from the ascending and strictly descending runs already in values,
+    reversing the descending ones. Short runs are extended to min_run items by
+    binary_insertion_sort. Adjacent runs are then merged in passes, as in
+    merge_sort_bottom_up, with merge_two_galloping by default. This is
+    adaptive: it takes O(N log R) time for N items in R runs, so O(N) time if
+    values is already sorted, or sorted in reverse.
+
+    >>> merge_sort_adaptive([])
+    []
+    >>> merge_sort_adaptive(())
+    []
+    >>> merge_sort_adaptive((2,))
+    [2]
+    >>> merge_sort_adaptive([20, 10])
+    [10, 20]
+    >>> a = [5660, -6307, 5315, 389, 3446, 2673, 1555, -7225, 1597, -7129]
+    >>> merge_sort_adaptive(a)
+    [-7225, -7129, -6307, 389, 1555, 1597, 2673, 3446, 5315, 5660]
+    >>> merge_sort_adaptive(a, min_run=1)
+    [-7225, -7129, -6307, 389, 1555, 1597, 2673, 3446, 5315, 5660]
+    >>> merge_sort_adaptive([4, 5, 6, 3, 2, 1, 7, 8, 9], min_run=2)
+    [1, 2, 3, 4, 5, 6, 7, 8, 9]
+    >>> merge_sort_adaptive([0.0, 0, False])  # It's a stable sort.
+    [0.0, 0, False]
+    """
+    if min_run < 1:
+        raise ValueError('min_run must be positive')
+    if (_is_vector(values) and merge is merge_two_galloping
+            and min_run == 32):
+        return _sort_vector(values)
+
+    queue = collections.deque(_natural_runs(list(values), min_run))
+    if not queue:
+        return []
+
     queue2 = collections.deque()
 
     while len(queue) > 1:
@@ -1044,6 +1465,302 @@ def merge_sort_bottom_up(values, *, merge=merge_two):
     return queue[0]
 
 
+class _MergeEntry:
+    """An entry in the heap merge_k uses: an item, its key, and its source."""
+
+    __slots__ = ('key', 'index', 'item', 'iterator')
+
+    def __init__(self, key, index, item, iterator):
+        """Create an entry for an item from the source at index."""
+        self.key = key
+        self.index = index
+        self.item = item
+        self.iterator = iterator
+
+    def __lt__(self, other):
+        """Compare by key, then index. Only < is used, as in merge_two."""
+        # Tuples and lists compare elements with == first, and use < only on
+        # the first unequal pair. Keys that are neither equal nor ordered, like
+        # OrderIndistinct instances, would never reach the index. So a tuple
+        # or list here would make the merge unstable.
+        if self.key < other.key:
+            return True
+        if other.key < self.key:
+            return False
+        return self.index < other.index
+
+
+def merge_k(iterables, *, key=None):
+    """
+    Lazily merge any number of sorted iterables, using a heap. Stable.
+
+    This is a k-way generalization of merge_two, but it works on iterables, not
+    just sequences, and yields items instead of returning a list. The heap
+    holds one item from each iterable that isn't used up yet, and an item is
+    pulled from an iterable only when the one before it from that iterable is
+    yielded. So merging N items from k iterables takes O(N log k) time and only
+    O(k) auxiliary space. If key is given, it is called once on each item, and
+    items are compared by their keys. Ties are broken in favor of items from
+    iterables that come earlier, so merging consecutive runs is stable.
+
+    >>> list(merge_k([[1, 4, 7], [2, 5, 8], [3, 6, 9]]))
+    [1, 2, 3, 4, 5, 6, 7, 8, 9]
+    >>> list(merge_k([]))
+    []
+    >>> list(merge_k([(), [2], iter([1, 3])]))
+    [1, 2, 3]
+    >>> list(merge_k([['bb', 'ccc'], ['a', 'dd']], key=len))
+    ['a', 'bb', 'dd', 'ccc']
+    >>> list(merge_k([[0.0], [0], [False]]))  # It's a stable merge.
+    [0.0, 0, False]
+    """
+    heap = []
+    for index, iterable in enumerate(iterables):
+        iterator = iter(iterable)
+        for item in iterator:
+            heap.append(_MergeEntry(item if key is None else key(item), index,
+                                    item, iterator))
+            break
+
+    heapq.heapify(heap)
+
+    while len(heap) > 1:
+        entry = heap[0]
+        yield entry.item
+
+        for item in entry.iterator:
+            entry.key = item if key is None else key(item)
+            entry.item = item
+            heapq.heapreplace(heap, entry)
+            break
+        else:
+            heapq.heappop(heap)
+
+    # With one iterable left, no more comparisons are needed.
+    if heap:
+        yield heap[0].item
+        yield from heap[0].iterator
+
+
+_SPILL_CHUNK_SIZE = 1024
+"""How many items external_merge_sort pickles together when writing a run."""
+
+
+def _spill(items, directory):
+    """Write items to a new temporary file. Return the file, rewound."""
+    file = tempfile.TemporaryFile(dir=directory)
+    try:
+        iterator = iter(items)
+        while chunk := list(itertools.islice(iterator, _SPILL_CHUNK_SIZE)):
+            pickle.dump(chunk, file, protocol=pickle.HIGHEST_PROTOCOL)
+        file.seek(0)
+    except BaseException:
+        file.close()
+        raise
+    return file
+
+
+def _unspill(file):
+    """Lazily yield the items that _spill wrote to file, a chunk at a time."""
+    while True:
+        try:
+            chunk = pickle.load(file)
+        except EOFError:
+            return
+        yield from chunk
+
+
+def external_merge_sort(values, *, key=None, run_size=100_000, fan_in=16,
+                        directory=None):
+    """
+    Sort an iterable too big for memory, with temporary files. Stable.
+
+    This returns an iterator that yields the items of values in sorted order.
+    First, values is read run_size items at a time, and each run is sorted in
+    memory and pickled to a temporary file. Then the runs are merged by
+    merge_k, at most fan_in at a time. If there are more than fan_in runs, this
+    takes more than one pass, each pass writing the merged runs to new
+    temporary files. The last pass is not written, but is yielded from lazily.
+
+    So no more than run_size items are in memory at once while runs are made,
+    and about fan_in chunks of items are in memory at once while they are
+    merged. Items must be picklable. If key is given, items are compared by
+    their keys. Temporary files go in directory, or in the default temporary
+    directory if directory is None. They are closed, and thus removed, when the
+    iterator is exhausted or closed.
+
+    For data that fits in memory, merge_sort and the other sorts above are
+    simpler and faster.
+
+    >>> list(external_merge_sort([5, 3, 8, 1, 9, 2, 7], run_size=2, fan_in=2))
+    [1, 2, 3, 5, 7, 8, 9]
+    >>> list(external_merge_sort(iter('spam'), run_size=3))
+    ['a', 'm', 'p', 's']
+    >>> list(external_merge_sort([]))
+    []
+    >>> words = ['foo', 'bar', 'baz', 'quux', 'foobar', 'ham', 'spam', 'eggs']
+    >>> list(external_merge_sort(words, key=len, run_size=3, fan_in=2))
+    ['foo', 'bar', 'baz', 'ham', 'quux', 'spam', 'eggs', 'foobar']
+    """
+    if run_size < 1:
+        raise ValueError('run_size must be positive')
+    if fan_in < 2:
+        raise ValueError('fan_in must be at least 2')
+
+    return _external_merge_sort(iter(values), key, run_size, fan_in,
+                                directory)
+
+
+def _external_merge_sort(iterator, key, run_size, fan_in, directory):
+    """Helper for external_merge_sort. Yield the sorted items."""
+    files = collections.deque()
+    try:
+        # The runs are sorted by list.sort, which is fastest, and stable. Keys
+        # aren't saved, so they are computed again when the runs are merged.
+        while run := list(itertools.islice(iterator, run_size)):
+            run.sort(key=key)
+            files.append(_spill(run, directory))
+            del run
+
+        # Each pass merges consecutive groups of fan_in runs, in order, and
+        # appends the results. All old runs are used up before any new run is,
+        # so the runs stay in order, keeping the sort stable.
+        while len(files) > fan_in:
+            remaining = len(files)
+            while remaining:
+                size = min(fan_in, remaining)
+                remaining -= size
+                group = [files.popleft() for _ in range(size)]
+                try:
+                    if size == 1:
+                        files.append(group.pop())
+                    else:
+                        merged = merge_k(map(_unspill, group), key=key)
+                        files.append(_spill(merged, directory))
+                finally:
+                    for file in group:
+                        file.close()
+
+        yield from merge_k(map(_unspill, files), key=key)
+    finally:
+        for file in files:
+            file.close()
+
+
+_SHAREABLE_TYPECODES = frozenset('bBhHiIlLqQfd')
+"""Typecodes of numeric arrays merge_sort_parallel passes in shared memory."""
+
+
+def _sort_chunk(chunk, key):
+    """Sort a chunk in a worker process, for merge_sort_parallel."""
+    return merge_sort_buffered(chunk, key=key)
+
+
+def _sort_shared_chunk(name, typecode, length, start, stop, key):
+    """Sort part of a shared numeric array in place, in a worker process."""
+    shared = shared_memory.SharedMemory(name=name)
+    try:
+        with shared.buf[:length * array.array(typecode).itemsize] as raw:
+            with raw.cast(typecode) as view:
+                view[start:stop] = array.array(
+                    typecode, merge_sort_buffered(view[start:stop], key=key))
+    finally:
+        shared.close()
+
+
+def _chunk_bounds(length, count):
+    """Split range(length) into count contiguous nearly equal (start, stop)."""
+    return [(length * index // count, length * (index + 1) // count)
+            for index in range(count)]
+
+
+def merge_sort_parallel(values, *, key=None, workers=None,
+                        threshold=100_000):
+    """
+    Mergesort on several cores: sort chunks in processes, then k-way merge.
+
+    Return a sorted list. This is a stable sort. The values are split into
+    one contiguous chunk per worker. Each chunk is sorted by
+    merge_sort_buffered in a concurrent.futures.ProcessPoolExecutor, and the
+    sorted chunks are merged by merge_k, which keeps the sort stable. If key is
+    given, it must be picklable, so it can be sent to the workers.
+
+    If values is an array.array of a numeric type, it is copied once into
+    shared memory, and each worker sorts its part of that memory in place, so
+    the items are not pickled. Otherwise, each chunk is pickled to a worker,
+    and the sorted chunk is pickled back.
+
+    workers is the number of processes, defaulting to os.cpu_count(). Starting
+    processes and moving data between them is costly, so if there are fewer
+    than threshold values, or only one worker, this just calls
+    merge_sort_buffered, in this process.
+
+    >>> merge_sort_parallel([5660, -6307, 5315, 389, 3446, 2673, 1555])
+    [-6307, 389, 1555, 2673, 3446, 5315, 5660]
+    >>> merge_sort_parallel([3, 1, 2, 0, 5, 4], workers=2, threshold=0)
+    [0, 1, 2, 3, 4, 5]
+    >>> merge_sort_parallel(array.array('d', [2.5, -1.0, 0.0]), threshold=0)
+    [-1.0, 0.0, 2.5]
+    >>> merge_sort_parallel([0.0, 0, False], threshold=0)  # It's stable.
+    [0.0, 0, False]
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    elif workers < 1:
+        raise ValueError('workers must be positive')
+
+    if _is_vector(values) and key is None:
+        return _sort_vector(values)
+
+    if not isinstance(values, (array.array, collections.abc.Sequence)):
+        values = list(values)
+
+    workers = min(workers, len(values))
+    if workers <= 1 or len(values) < threshold:
+        return merge_sort_buffered(values, key=key)
+
+    bounds = _chunk_bounds(len(values), workers)
+
+    if (isinstance(values, array.array)
+            and values.typecode in _SHAREABLE_TYPECODES):
+        return _merge_sort_shared(values, key, bounds)
+
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        chunks = executor.map(_sort_chunk,
+                              (values[start:stop] for start, stop in bounds),
+                              itertools.repeat(key))
+        return list(merge_k(list(chunks), key=key))
+
+
+def _merge_sort_shared(values, key, bounds):
+    """Helper for merge_sort_parallel, to sort a numeric array.array."""
+    typecode = values.typecode
+    length = len(values)
+    size = length * values.itemsize
+    shared = shared_memory.SharedMemory(create=True, size=size)
+    try:
+        shared.buf[:size] = memoryview(values).cast('B')
+
+        with concurrent.futures.ProcessPoolExecutor(len(bounds)) as executor:
+            futures = [
+                executor.submit(_sort_shared_chunk, shared.name, typecode,
+                                length, start, stop, key)
+                for start, stop in bounds
+            ]
+            for future in futures:
+                future.result()
+
+        # The sorted chunks are copied out, so no views of the shared memory
+        # outlive it.
+        with shared.buf[:size] as raw, raw.cast(typecode) as view:
+            chunks = [view[start:stop].tolist() for start, stop in bounds]
+
+        return list(merge_k(chunks, key=key))
+    finally:
+        shared.close()
+        shared.unlink()
+
+
 def make_deep_tuple(depth):
     """Make a tuple of the specified depth."""
     tup = ()
@@ -1088,12 +1805,169 @@ def observe_edge(parent, child):
     print(f'{parent!r}  ->  {child!r}')
 
 
+WALK_ORDERS = ('preorder', 'postorder', 'levelorder')
+"""Orders walk can yield nodes in."""
+
+
+def walk(root, order='preorder', *, observer=None, memoize=False):
+    """
+    Lazily yield the nodes of a nested tuple, without recursion.
+
+    Tuples are internal nodes, whose children are their elements. Everything
+    else, including the empty tuple, is a leaf. This yields each node, tuple or
+    not, in order, which is 'preorder' (each node before its children),
+    'postorder' (each node after its children), or 'levelorder' (breadth
+    first). Children are always visited left to right. No recursion is used:
+    depth-first orders keep an explicit stack, so very deep structures work.
+
+    If observer is given, observer(parent, child) is called for each edge, in
+    the order flatten_observed (for preorder and postorder) or
+    flatten_levelorder_observed (for levelorder) would call it.
+
+    Without memoize, the structure is treated as a tree: a node reached in
+    more than one way is yielded each time. With memoize, each node (by
+    identity) is yielded, and its children visited, only the first time it is
+    reached. Later edges to it are still observed. That takes time linear in
+    the number of distinct nodes and edges, however much they are shared.
+
+    >>> root = ((1, (2,)), 3)
+    >>> list(walk(root))
+    [((1, (2,)), 3), (1, (2,)), 1, (2,), 2, 3]
+    >>> list(walk(root, 'postorder'))
+    [1, 2, (2,), (1, (2,)), 3, ((1, (2,)), 3)]
+    >>> list(walk(root, 'levelorder'))
+    [((1, (2,)), 3), (1, (2,)), 3, 1, (2,), 2]
+    >>> shared = ('a', 'b')
+    >>> list(walk((shared, shared)))
+    [(('a', 'b'), ('a', 'b')), ('a', 'b'), 'a', 'b', ('a', 'b'), 'a', 'b']
+    >>> list(walk((shared, shared), memoize=True))
+    [(('a', 'b'), ('a', 'b')), ('a', 'b'), 'a', 'b']
+    >>> sum(1 for _ in walk(make_deep_tuple(100_000)))
+    100001
+    """
+    if order == 'preorder':
+        return _walk_preorder(root, observer, memoize)
+    if order == 'postorder':
+        return _walk_postorder(root, observer, memoize)
+    if order == 'levelorder':
+        return _walk_levelorder(root, observer, memoize)
+    raise ValueError(f'order must be one of {WALK_ORDERS!r}, not {order!r}')
+
+
+def _walk_preorder(root, observer, memoize):
+    """Helper for walk. Yield nodes in preorder."""
+    seen = set()
+    stack = [(None, root)]
+
+    while stack:
+        parent, node = stack.pop()
+        if parent is not None and observer is not None:
+            observer(parent, node)
+
+        if memoize:
+            if id(node) in seen:
+                continue
+            seen.add(id(node))
+
+        yield node
+        if isinstance(node, tuple):
+            stack.extend((node, child) for child in reversed(node))
+
+
+def _walk_postorder(root, observer, memoize):
+    """Helper for walk. Yield nodes in postorder."""
+    seen = set()
+    if memoize:
+        seen.add(id(root))
+    if not isinstance(root, tuple):
+        yield root
+        return
+
+    # Each frame is a tuple and an iterator over its children not yet visited.
+    stack = [(root, iter(root))]
+
+    while stack:
+        parent, children = stack[-1]
+
+        for child in children:
+            if observer is not None:
+                observer(parent, child)
+            if memoize:
+                if id(child) in seen:
+                    continue
+                seen.add(id(child))
+            if isinstance(child, tuple):
+                stack.append((child, iter(child)))
+                break
+            yield child
+        else:
+            stack.pop()
+            yield parent
+
+
+def _walk_levelorder(root, observer, memoize):
+    """Helper for walk. Yield nodes in level order."""
+    seen = {id(root)}
+    queue = collections.deque((root,))
+
+    while queue:
+        node = queue.popleft()
+        yield node
+        if not isinstance(node, tuple):
+            continue
+
+        for child in node:
+            if observer is not None:
+                observer(node, child)
+            if memoize:
+                if id(child) in seen:
+                    continue
+                seen.add(id(child))
+            queue.append(child)
+
+
+def fold(root, combine):
+    """
+    Compute a value for a nested tuple from its nodes' values, bottom up.
+
+    This calls combine(node, child_values), for each node of the structure,
+    where child_values is a list of the values already computed for the node's
+    children, in order. (For a leaf, including the empty tuple, it is empty.)
+    The value for root is returned. No recursion is used, so very deep
+    structures work.
+
+    Values are memoized by node identity, so a node reached in more than one
+    way is combined only once, and its value is reused. This is safe because
+    tuples are immutable and the structure stays alive during the call. But
+    the value is used once for each way the node is reached, so results are
+    the same as if the structure were a tree.
+
+    >>> fold(((1, 2), (3,)), lambda node, values: sum(values) or node)
+    6
+    >>> def height(node, heights):
+    ...     return max(heights, default=-1) + 1
+    >>> fold(make_deep_tuple(100_000), height)
+    100000
+    """
+    values = {}
+
+    for node in walk(root, 'postorder', memoize=True):
+        if isinstance(node, tuple):
+            child_values = [values[id(child)] for child in node]
+        else:
+            child_values = []
+        values[id(node)] = combine(node, child_values)
+
+    return values[id(root)]
+
+
 def flatten(root):
     """
-    Recursively lazily flatten a nested tuple, yielding all non-tuple leaves.
+    Lazily flatten a nested tuple, yielding all non-tuple leaves.
 
     This returns an iterator that yields all leaves in the order the repr shows
     them. If root is not a tuple, it is considered to be the one and only leaf.
+    This uses walk, so it doesn't recurse, and very deep nesting is fine.
 
     >>> list(flatten(()))
     []
@@ -1115,22 +1989,21 @@ def flatten(root):
     ['foo', ['bar'], 'baz', ['quux', ('foobar',)]]
     >>> list(flatten(nest('hi', 3, 3))) == ['hi'] * 27
     True
+    >>> deep = 'hi'
+    >>> for _ in range(100_000):
+    ...     deep = (deep,)
+    >>> list(flatten(deep))
+    ['hi']
     """
-    # base case: we are at a leaf
-    if not isinstance(root, tuple):
-        yield root
-        return
-
-    for element in root:
-        yield from flatten(element)
+    return (node for node in walk(root) if not isinstance(node, tuple))
 
 
 def flatten_observed(root, observer):
     """
-    Recursively lazily flatten a nested tuple. Call an observer for each edge.
+    Lazily flatten a nested tuple. Call an observer for each edge.
 
     This is like flatten (above), but it also calls observer(parent, child) for
-    each child found, in the order they are found.
+    each child found, in the order they are found. It also uses walk.
 
     >>> list(flatten_observed((), observe_edge))
     []
@@ -1152,21 +2025,15 @@ def flatten_observed(root, observer):
     (4, (5,), (), 6)  ->  6
     [1, 2, 3, 4, 5, 6]
     """
-    # Base case: we are at a leaf.
-    if not isinstance(root, tuple):
-        yield root
-        return
-
-    for element in root:
-        observer(root, element)
-        yield from flatten_observed(element, observer)
+    return (node for node in walk(root, observer=observer)
+            if not isinstance(node, tuple))
 
 
 def flatten_iterative(root):
     """
     Nonrecursively lazily flatten a tuple, yielding all non-tuple leaves.
 
-    This is like flatten (above), but using a purely iterative algorithm.
+    This is like flatten (above), but with its own loop, rather than walk.
 
     >>> list(flatten_iterative(()))
     []
@@ -1205,7 +2072,7 @@ def flatten_iterative_observed(root, observer):
 
     This is like flatten_iterative (above), but it also calls
     observer(parent, child) for each child found, in the order the usual
-    recursive algorithm (implemented in flatten, above) would find them.
+    recursive algorithm would find them (which flatten_observed also does).
 
     Various iterative algorithms discover nodes in different orders. There are
     no requirements on the order in which the algorithm used here discovers
@@ -1332,10 +2199,10 @@ def flatten_levelorder_observed(root, observer):
 
 def leaf_sum(root):
     """
-    Using recursion, sum non-tuples accessible through nested tuples.
+    Sum non-tuples accessible through nested tuples, without recursion.
 
     Overlapping subproblems (the same tuple object in multiple places) are
-    solved only once; the solution is cached and reused.
+    solved only once; the solution is cached and reused. This is done by fold.
 
     >>> leaf_sum(3)
     3
@@ -1351,19 +2218,16 @@ def leaf_sum(root):
     55
     >>> all(leaf_sum(fib_nest(i)) == x for i, x in zip(range(401), fib()))
     True
+    >>> deep = 1
+    >>> for _ in range(100_000):
+    ...     deep = (deep, 1)
+    >>> leaf_sum(deep)
+    100001
     """
-    cache = {}
+    def combine(node, child_sums):
+        return sum(child_sums) if isinstance(node, tuple) else node
 
-    def traverse(parent):
-        if not isinstance(parent, tuple):
-            return parent
-
-        if id(parent) not in cache:
-            cache[id(parent)] = sum(traverse(child) for child in parent)
-
-        return cache[id(parent)]
-
-    return traverse(root)
+    return fold(root, combine)
 
 
 def _traverse(parent, cache):
@@ -1384,7 +2248,7 @@ def leaf_sum_alt(root):
     Overlapping subproblems (the same tuple object in multiple places) are
     solved only once; the solution is cached and reused.
 
-    This is like leaf_sum except it does not use any local functions.
+    This is like leaf_sum, but it recurses, and uses no local functions.
 
     >>> leaf_sum_alt(3)
     3
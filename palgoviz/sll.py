@@ -14,7 +14,7 @@
 # PERFORMANCE OF THIS SOFTWARE.
 
 """
-Immutable singly linked lists using hash consing to share tails globally.
+Immutable singly linked lists and trees using hash consing to share structure.
 
 Hash consing is an advanced technique. This project currently has no module
 dedicated to presenting singly linked lists in an introductory fashion. But a
@@ -39,17 +39,51 @@ Hash consing can be applied to any immutable node-based data structure whose
 nodes make up a directed acyclic graph. This includes, but is not limited to,
 binary and n-ary trees without parent pointers. This is analogous to the case
 of singly linked lists. (A binary tree node has two child pointers; a singly
-linked list node has one "child" pointer.) Only SLLs are implemented here.
+linked list node has one "child" pointer.) HashTreeNode and HashBinaryTreeNode
+are hash-consed n-ary and binary tree nodes. All the trees of each type form a
+single directed acyclic graph, where any repeated subtree is stored only once.
+
+Since a node that heads a hash-consed structure never changes, a computation on
+it always gives the same result. tree_fold makes functions that take advantage
+of this, remembering results by node identity. On a tree with a lot of repeated
+structure, that can be exponentially faster than walking the whole tree.
+
+The list operations append, concat, map_values, take, and reverse work the same
+way for HashNode lists. They remember results weakly, per node, so operations
+on lists that share a long suffix only rebuild the parts that differ.
 """
 
-__all__ = ['HashNode', 'traverse']
-
+__all__ = [
+    'HashNode',
+    'CompactHashNode',
+    'HashTreeNode',
+    'HashBinaryTreeNode',
+    'tree_fold',
+    'tree_size',
+    'tree_height',
+    'count_distinct_nodes',
+    'traverse',
+    'append',
+    'concat',
+    'map_values',
+    'take',
+    'reverse',
+]
+
+import array
+import functools
 import html
+import itertools
+import operator
+import random
 import threading
 import weakref
 
 import graphviz
 
+_BATCH_SIZE = 1024
+"""Most nodes HashNode.from_iterable adds while holding the lock once."""
+
 
 class _Box:
     """
@@ -107,12 +141,343 @@ class _Box:
         return self._value
 
 
+class _Probe:
+    """
+    Stand-in for a _WeakTable key, to look up a node without making one.
+
+    A key in the table is a tuple of a weak reference to a _Box and, for each
+    link (a HashNode's next node, or a tree node's children), either None or a
+    weak reference to the linked node. Looking up a node by such a key would
+    allocate the box and all the weak references, even when the node exists. A
+    _Probe holds the value and links directly. It hashes the same as a key for
+    them, because weak references and boxes hash as their referents do, and it
+    compares equal to such a key if it was made from them. Comparing a tuple to
+    a _Probe falls back to _Probe.__eq__, so the dictionary's lookup works. A
+    _Probe is never stored in the table.
+    """
+
+    __slots__ = ('_value', '_links', '_hash')
+
+    def __init__(self, value, links):
+        """Create a probe for the node with a given value and links."""
+        self._value = value
+        self._links = links
+        self._hash = hash((value, *links))
+
+    def __repr__(self):
+        """Python code representation for debugging."""
+        return f'{type(self).__name__}({self._value!r}, {self._links!r})'
+
+    def __eq__(self, other):
+        """A probe is equal to the table key for its value and links."""
+        if not isinstance(other, tuple):
+            return NotImplemented
+        if len(other) != len(self._links) + 1:
+            return False
+
+        # Compare the values first, as comparing keys does, so a value's __eq__
+        # is called as many times when probing as when looking up by key.
+        box = other[0]()
+        if box is None:
+            return False
+        if not (box.value is self._value or box.value == self._value):
+            return False
+
+        return all((link is None) if ref is None else (ref() is link)
+                   for ref, link in zip(other[1:], self._links))
+
+    def __hash__(self):
+        """A probe hashes the same as the table key it is equal to."""
+        return self._hash
+
+
+def _weak_key(box, links):
+    """Make the _WeakTable key for a node with a given box and links."""
+    # The key accesses the node's element and links through weak references.
+    # This is important because the WeakValueDictionary holds strong references
+    # to its keys. If an element has a strong reference cycle back to the node
+    # that holds it, the cyclic garbage collector can clean it up after it is
+    # only accessible through the table, but only if the table doesn't strongly
+    # refer into the cycle.
+    return (weakref.ref(box), *(link and weakref.ref(link) for link in links))
+
+
+class _WeakTable:
+    """
+    The usual HashNode table: a WeakValueDictionary whose keys are weak.
+
+    Nodes hold their values in _Box objects. A node's key is made by _weak_key
+    from its box and its links: (next_node,) for a HashNode, or its children
+    for a tree node, which also uses this kind of table. Calls to get_or_add,
+    get_or_add_all, __len__, and nodes must hold the node type's lock.
+    """
+
+    __slots__ = ('_entries',)
+
+    def __init__(self):
+        """Create an empty table."""
+        self._entries = weakref.WeakValueDictionary()
+
+    def __len__(self):
+        """Count the nodes in the table."""
+        return len(self._entries)
+
+    node_value = property(operator.attrgetter('_box.value'),
+                          doc='The value held by this node.')
+
+    def nodes(self):
+        """Return a list of all the nodes in the table."""
+        return list(self._entries.values())
+
+    def weak_refs(self):
+        """Return a list of weak references to all the nodes in the table."""
+        # Copying the dict's values runs no Python code, so no entries can be
+        # removed while it happens, even by weakref callbacks.
+        return list(self._entries.data.values())
+
+    def find(self, value, next_node):
+        """Get the node for value and next_node, if it exists. Don't lock."""
+        return self.find_links(value, (next_node,))
+
+    def find_links(self, value, links):
+        """Get the node for value and links, if it exists. Don't lock."""
+        # This reads the underlying dict directly, because the table's own
+        # lookup methods may remove dead entries, which must be done under the
+        # lock. A dead or missing entry just means the caller must lock and
+        # check again.
+        ref = self._entries.data.get(_Probe(value, links))
+        return None if ref is None else ref()
+
+    def get_or_add(self, node_type, value, links):
+        """Get the tree node for value and links, adding it if missing."""
+        box = _Box(value)
+        key = _weak_key(box, links)
+
+        # This *must* use EAFP. See greet.UniqueGreeter.__new__.
+        try:
+            return self._entries[key]
+        except KeyError:
+            pass
+
+        node = object.__new__(node_type)
+        node._box = box
+        node._links = links
+        self._entries[key] = node
+        return node
+
+    def get_or_add_all(self, node_type, backwards, next_node):
+        """
+        Prepend values, given back to front, to next_node. Return the head.
+
+        Nodes are looked up until one is missing. All nodes made after that are
+        added without being looked up, since while the lock is held, no other
+        thread can have made a node whose next node was just made.
+        """
+        entries = self._entries
+        probing = True
+
+        for value in backwards:
+            box = _Box(value)
+            # This is _weak_key(box, (next_node,)), inlined for speed.
+            key = (weakref.ref(box), next_node and weakref.ref(next_node))
+
+            if probing:
+                # This *must* use EAFP. See greet.UniqueGreeter.__new__.
+                try:
+                    next_node = entries[key]
+                    continue
+                except KeyError:
+                    probing = False
+
+            node = object.__new__(node_type)
+            node._box = box
+            node._next_node = next_node
+            entries[key] = node
+            next_node = node
+
+        return next_node
+
+
+class _CompactTable:
+    """
+    A smaller HashNode table, using open addressing over parallel arrays.
+
+    Nodes hold their values directly, with no _Box. Slot i holds the hash of a
+    node's value and next node in _hashes[i], and a weak reference to the node
+    in _refs[i], or None if the slot has never been used. Collisions are
+    resolved by linear probing. Per node, this saves the box, the weak
+    reference to it, the key tuple, and the dictionary's weak reference with a
+    callback. The table holds no strong references to nodes or values, so, as
+    with _WeakTable, heterogeneous cycles do not leak.
+
+    The weak references have no callbacks, because a callback (or a __del__
+    method on nodes) would be another object, or another cost, per node.
+    Instead, a slot whose node has died is reused by a later insertion that
+    reaches it, and all such slots are dropped when the table is resized.
+
+    Lookups without the lock read a snapshot of the arrays, which resizing
+    replaces rather than modifies, and check each candidate node's actual
+    value and next node. So a lookup racing with an insertion may miss, but it
+    never finds a wrong node. Calls to get_or_add_all, __len__, and nodes must
+    hold the node type's lock.
+    """
+
+    __slots__ = ('_arrays', '_filled')
+
+    _MIN_CAPACITY = 8
+    """The fewest slots the table has. Like all its sizes, a power of 2."""
+
+    def __init__(self):
+        """Create an empty table."""
+        self._arrays = self._empty_arrays(self._MIN_CAPACITY)
+        self._filled = 0  # Slots that are not None, including dead ones.
+
+    def __len__(self):
+        """Count the nodes in the table."""
+        _, refs = self._arrays
+        return sum(1 for ref in refs if ref is not None and ref() is not None)
+
+    node_value = property(operator.attrgetter('_box'),
+                          doc='The value held by this node.')
+
+    def nodes(self):
+        """Return a list of all the nodes in the table."""
+        _, refs = self._arrays
+        return [node for ref in refs
+                if ref is not None and (node := ref()) is not None]
+
+    def weak_refs(self):
+        """Return a list of weak references to all the nodes in the table."""
+        # Weak references are always true, so this skips just the Nones. Some
+        # may be dead. This runs no Python code.
+        _, refs = self._arrays
+        return list(filter(None, refs))
+
+    def find(self, value, next_node):
+        """Get the node for value and next_node, if it exists. Don't lock."""
+        return self._lookup(hash((value, next_node)), value, next_node)
+
+    def get_or_add_all(self, node_type, backwards, next_node):
+        """
+        Prepend values, given back to front, to next_node. Return the head.
+
+        As in _WeakTable.get_or_add_all, nodes are looked up only until one is
+        missing.
+        """
+        probing = True
+
+        for value in backwards:
+            table_hash = hash((value, next_node))
+
+            if probing:
+                node = self._lookup(table_hash, value, next_node)
+                if node is not None:
+                    next_node = node
+                    continue
+                probing = False
+
+            node = object.__new__(node_type)
+            node._box = value
+            node._next_node = next_node
+            self._insert(table_hash, node)
+            next_node = node
+
+        return next_node
+
+    @staticmethod
+    def _empty_arrays(capacity):
+        """Make a hashes array and a references list, with capacity slots."""
+        return array.array('q', bytes(8 * capacity)), [None] * capacity
+
+    def _lookup(self, table_hash, value, next_node):
+        """Find the node for value and next_node, whose hash is table_hash."""
+        hashes, refs = self._arrays
+        mask = len(refs) - 1
+        index = table_hash & mask
+
+        while (ref := refs[index]) is not None:
+            if hashes[index] == table_hash:
+                node = ref()
+                if (node is not None and node._next_node is next_node
+                        and (node._box is value or node._box == value)):
+                    return node
+            index = (index + 1) & mask
+
+        return None
+
+    def _insert(self, table_hash, node):
+        """Put a node, whose hash is table_hash, in a free or dead slot."""
+        if (self._filled + 1) * 3 > len(self._arrays[1]) * 2:
+            self._resize()
+
+        hashes, refs = self._arrays
+        mask = len(refs) - 1
+        index = table_hash & mask
+
+        while (ref := refs[index]) is not None and ref() is not None:
+            index = (index + 1) & mask
+
+        if ref is None:
+            self._filled += 1
+        hashes[index] = table_hash
+        refs[index] = weakref.ref(node)
+
+    def _resize(self):
+        """Move the live entries to new arrays, with room for as many again."""
+        hashes, refs = self._arrays
+
+        # Weak references are always true, so compress skips just the Nones.
+        live = [index for index in itertools.compress(range(len(refs)), refs)
+                if refs[index]() is not None]
+
+        capacity = self._MIN_CAPACITY
+        while capacity < len(live) * 3:
+            capacity *= 2
+
+        new_hashes, new_refs = self._empty_arrays(capacity)
+        mask = capacity - 1
+        for old_index in live:
+            table_hash = hashes[old_index]
+            index = table_hash & mask
+            while new_refs[index] is not None:
+                index = (index + 1) & mask
+            new_hashes[index] = table_hash
+            new_refs[index] = refs[old_index]
+
+        self._arrays = (new_hashes, new_refs)
+        self._filled = len(live)
+
+
+def _enter_new(node_type):
+    """
+    Mark this thread as making or finding a node. Return the guard object.
+
+    node_type is a hash-consed node class, with a _reentry_guard. The caller
+    must set the guard's active attribute to False when done. This raises
+    RuntimeError if the thread is already making or finding a node of that
+    type, which happens if an element's __hash__ or __eq__ makes one.
+    """
+    guard = node_type._reentry_guard
+    if getattr(guard, 'active', False):
+        name = f'{node_type.__name__}.__new__'
+        message = f'{name} reentered through __hash__ or __eq__'
+        raise RuntimeError(message)
+
+    guard.active = True
+    return guard
+
+
+_TABLE_TYPES = {'weak': _WeakTable, 'compact': _CompactTable}
+"""Kinds of tables a HashNode subclass can be given, by name."""
+
+
 class HashNode:
     """
     Immutable singly linked list node, using hash consing. Thread-safe.
 
     See the sll module docstring regarding the concepts involved. HashNode
-    equality implies identity. Inheriting from this class is not recommended.
+    equality implies identity. Inheriting from this class is not recommended,
+    except to choose a different kind of table, as CompactHashNode does.
 
     >>> head1 = HashNode('a', HashNode('b', HashNode('c', HashNode('d'))))
     >>> head1.value
@@ -171,10 +536,10 @@ class HashNode:
 
     To build an SLL from an iterable of values, use from_iterable. This is a
     named constructor, not a top-level function. That is so it is always clear,
-    looking at the call site, what class is being instantiated. But
-    from_iterable uses no part of the HashNode interface, other than calling
-    the class. It especially doesn't use or depend on any implementation
-    details of HashNode.
+    looking at the call site, what class is being instantiated. It gives the
+    same result as calling the class once per value, from the back, but it is
+    faster for long lists, because it holds the lock for a batch of new nodes
+    at a time and skips lookups for nodes that cannot exist yet.
 
     >>> HashNode.from_iterable(iter('abcd')) is head1
     True
@@ -192,8 +557,30 @@ class HashNode:
     __match_args__ = ('value', 'next_node')
 
     _lock = threading.RLock()
-    _already_locked = False
-    _table = weakref.WeakValueDictionary()  # (value, next_node) -> node
+    _reentry_guard = threading.local()  # .active: this thread is in __new__.
+    _table = _WeakTable()  # (value, next_node) -> node
+
+    def __init_subclass__(cls, /, *, table=None, **kwargs):
+        """
+        Set up a subclass, giving it its own kind of table if table is given.
+
+        table may be 'weak', for the kind of table HashNode uses, or 'compact'.
+        A subclass given a table has its own nodes, lock, and reentrance guard.
+        A subclass not given one shares them with its base class.
+        """
+        super().__init_subclass__(**kwargs)
+        if table is None:
+            return
+
+        try:
+            table_type = _TABLE_TYPES[table]
+        except KeyError:
+            raise ValueError(f'unknown table kind: {table!r}') from None
+
+        cls._lock = threading.RLock()
+        cls._reentry_guard = threading.local()
+        cls._table = table_type()
+        cls.value = table_type.node_value
 
     @classmethod
     def count_instances(cls):
@@ -205,15 +592,34 @@ class HashNode:
 
     @classmethod
     def from_iterable(cls, values):
-        """Make a singly linked list of the given values. Return the head."""
-        try:
-            backwards = reversed(values)
-        except TypeError:
-            backwards = reversed(list(values))
+        """
+        Make a singly linked list of the given values. Return the head.
 
+        Nodes are made from the back. The longest suffix that already exists is
+        found without locking. After that, every node is new, because its next
+        node is new. So the rest are added in batches, taking the lock once per
+        batch and not looking up nodes that could not already exist.
+        """
+        backwards = _iterate_backward(values)
         acc = None
+
         for value in backwards:
-            acc = cls(value, acc)
+            guard = _enter_new(cls)
+            try:
+                node = cls._table.find(value, acc)
+            finally:
+                guard.active = False
+
+            if node is None:
+                batch = [value, *itertools.islice(backwards, _BATCH_SIZE - 1)]
+                acc = cls._get_or_add_batch(batch, acc)
+                break
+
+            acc = node
+
+        while batch := list(itertools.islice(backwards, _BATCH_SIZE)):
+            acc = cls._get_or_add_batch(batch, acc)
+
         return acc
 
     def __new__(cls, value, next_node=None):
@@ -221,37 +627,37 @@ class HashNode:
         # Since we are doing hash consing, the effects of allowing a next_node
         # of the wrong type are dire: the wrong behavior is both unintuitive
         # and global. So it is important to check the type of next_node, even
-        # if runtime type-checking is not otherwise called for.
-        if not isinstance(next_node, cls | None):
+        # if runtime type-checking is not otherwise called for. A node of a
+        # subclass with its own table, such as CompactHashNode, is an instance
+        # of cls but not one of its nodes, so what matters is the table.
+        if next_node is not None and not (isinstance(next_node, HashNode)
+                                          and next_node._table is cls._table):
             raise TypeError(f'next_node must be a {cls.__name__} or None, not '
                             + type(next_node).__name__)
 
-        # The key for a node accesses the node's element and successor through
-        # weak references. This is important because the WeakValueDictionary
-        # holds strong references to its keys. If an element has a strong
-        # reference cycle back to the node that holds it, the cyclic garbage
-        # collector can clean it up after it is only accessible through the
-        # table, but only if the table doesn't strongly refer into the cycle.
-        box = _Box(value)
-        key = (weakref.ref(box), next_node and weakref.ref(next_node))
+        guard = _enter_new(cls)
+        try:
+            # Most calls find an existing node, so first try to find it without
+            # allocating anything but the probe and without taking the lock.
+            return (cls._table.find(value, next_node)
+                    or cls._lock_and_get_or_add_all((value,), next_node))
+        finally:
+            guard.active = False
+
+    @classmethod
+    def _get_or_add_batch(cls, batch, next_node):
+        """Prepend a batch of values, given back to front, to next_node."""
+        guard = _enter_new(cls)
+        try:
+            return cls._lock_and_get_or_add_all(batch, next_node)
+        finally:
+            guard.active = False
 
+    @classmethod
+    def _lock_and_get_or_add_all(cls, backwards, next_node):
+        """Prepend values, given back to front, to next_node. Hold the lock."""
         with cls._lock:
-            if cls._already_locked:
-                name = f'{cls.__name__}.__new__'
-                message = f'{name} reentered through __hash__ or __eq__'
-                raise RuntimeError(message)
-
-            cls._already_locked = True
-            try:  # This *must* use EAFP. See greet.UniqueGreeter.__new__.
-                return cls._table[key]
-            except KeyError:
-                node = super().__new__(cls)
-                node._box = box
-                node._next_node = next_node
-                cls._table[key] = node
-                return node
-            finally:
-                cls._already_locked = False
+            return cls._table.get_or_add_all(cls, backwards, next_node)
 
     def __repr__(self):
         """
@@ -298,7 +704,7 @@ class HashNode:
         # be confident the graph we draw makes sense, and that we don't cause
         # any invariants to be violated. (Contrast recursion.leaf_sum_dec.)
         with cls._lock:
-            nodes = list(cls._table.values())
+            nodes = cls._table.nodes()
 
         graph = graphviz.Digraph()
 
@@ -315,6 +721,478 @@ class HashNode:
 
         return graph
 
+    @classmethod
+    def write_dot(cls, file, *, max_nodes=None, max_depth=None, sample=None,
+                  seed=None, chunk_size=10_000):
+        """
+        Write the structure of all instances, as DOT code, to a text file.
+
+        This is like draw, but it streams the output, so it works for tables
+        far too large to draw at once. The lock is held only while copying
+        weak references to all nodes, which runs no Python code. Then nodes
+        are examined and written chunk_size at a time, with strong references
+        to at most one chunk. Nodes collected before their chunk are skipped.
+
+        To keep the output small enough to render, max_nodes stops after that
+        many nodes, max_depth writes only nodes that head lists of at most
+        that length (those nearest the root, None), and sample writes each node
+        with that probability, using a random.Random seeded with seed. Nodes
+        that written nodes link to, but that are left out, appear as "...".
+
+        Returns the number of nodes written.
+        """
+        if max_nodes is not None and max_nodes < 0:
+            raise ValueError('max_nodes must be nonnegative (or None)')
+        if max_depth is not None and max_depth < 0:
+            raise ValueError('max_depth must be nonnegative (or None)')
+        if sample is not None and not 0.0 < sample <= 1.0:
+            raise ValueError('sample must be in (0, 1] (or None)')
+        if chunk_size < 1:
+            raise ValueError('chunk_size must be positive')
+
+        # All the nodes referred to here were alive together when this copy was
+        # made, so their ids are distinct, even if some are collected later.
+        # (A node's next node was alive whenever the node was.) See draw.
+        with cls._lock:
+            refs = cls._table.weak_refs()
+
+        rng = random.Random(seed)
+        lengths = {}
+        track_omissions = max_nodes is not None or sample is not None
+        written_ids = set()
+        linked_ids = set()
+        count = 0
+
+        file.write('digraph {\n')
+        sentinel = graphviz.Digraph()
+        sentinel.node(str(id(None)), shape='point')
+        file.writelines(sentinel.body)
+
+        for start in range(0, len(refs), chunk_size):
+            if max_nodes is not None and count >= max_nodes:
+                break
+
+            graph = graphviz.Digraph()
+
+            for ref in refs[start:start + chunk_size]:
+                if max_nodes is not None and count >= max_nodes:
+                    break
+
+                node = ref()
+                if node is None:
+                    continue
+                if (max_depth is not None
+                        and _list_length(node, lengths) > max_depth):
+                    continue
+                if sample is not None and rng.random() >= sample:
+                    continue
+
+                graph.node(str(id(node)), label=html.escape(repr(node.value)))
+                graph.edge(str(id(node)), str(id(node.next_node)))
+                count += 1
+
+                if track_omissions:
+                    written_ids.add(id(node))
+                    if node.next_node is not None:
+                        linked_ids.add(id(node.next_node))
+
+            file.writelines(graph.body)
+
+        omitted = graphviz.Digraph()
+        for node_id in linked_ids - written_ids:
+            omitted.node(str(node_id), label='...', shape='plaintext')
+        file.writelines(omitted.body)
+
+        file.write('}\n')
+        return count
+
+
+class CompactHashNode(HashNode, table='compact'):
+    """
+    Like HashNode, but with a smaller table. For programs with many nodes.
+
+    Each HashNode in its table costs, besides the node, a box for its value,
+    two weak references, a key tuple, and a dictionary entry with a weak
+    reference of its own. CompactHashNode instances hold their values directly
+    and cost only one weak reference and a slot in an open-addressing table.
+    Finding a node that exists is a bit faster. Making new nodes is somewhat
+    slower, because growing the table is done in Python.
+    CompactHashNode instances are separate from HashNode instances: they are
+    never the same object, and each class counts and draws only its own.
+
+    >>> head = CompactHashNode.from_iterable('abc')
+    >>> head
+    CompactHashNode('a', CompactHashNode('b', CompactHashNode('c')))
+    >>> CompactHashNode('a', CompactHashNode.from_iterable('bc')) is head
+    True
+    >>> import math
+    >>> CompactHashNode(math.nan) is CompactHashNode(math.nan)
+    True
+    """
+
+    __slots__ = ()
+
+
+class _HashTreeNodeBase:
+    """
+    Base for hash-consed tree node types. Each subclass has its own table.
+
+    A node holds a box for its value and a tuple of links to its children, some
+    of which may be None, if the subclass allows it. The subclass's __new__
+    validates its arguments and calls _get_or_add with them. Like HashNode,
+    nodes use reference-based equality comparison, and equality of the trees
+    they are the roots of implies identity. The _folds slot, set on first use,
+    holds a dict of the node's tree_fold results, by each fold's token.
+    """
+
+    __slots__ = ('_box', '_links', '_folds', '__weakref__')
+
+    def __init_subclass__(cls, **kwargs):
+        """Give a tree node subclass its own table, lock, and guard."""
+        super().__init_subclass__(**kwargs)
+        cls._lock = threading.RLock()
+        cls._reentry_guard = threading.local()  # .active: in _get_or_add.
+        cls._table = _WeakTable()  # (value, *links) -> node
+
+    @classmethod
+    def count_instances(cls):
+        """Return the number of currently existing instances."""
+        # See HashNode.count_instances.
+        with cls._lock:
+            return len(cls._table)
+
+    @classmethod
+    def _get_or_add(cls, value, links):
+        """Make a node or retrieve the suitable one that already exists."""
+        guard = _enter_new(cls)
+        try:
+            # As in HashNode.__new__, first try without taking the lock.
+            node = cls._table.find_links(value, links)
+            if node is not None:
+                return node
+            with cls._lock:
+                return cls._table.get_or_add(cls, value, links)
+        finally:
+            guard.active = False
+
+    @property
+    def value(self):
+        """The value held by this node."""
+        return self._box.value
+
+    @property
+    def children(self):
+        """The children of this node, left to right, as a tuple."""
+        return tuple(link for link in self._links if link is not None)
+
+    @classmethod
+    def draw(cls):
+        """Draw the structure of all instances of this class."""
+        # For why this is synchronized and materializes the table's values, see
+        # HashNode.draw. Here, all children of nodes we see are protected.
+        with cls._lock:
+            nodes = cls._table.nodes()
+
+        graph = graphviz.Digraph()
+
+        for node in nodes:
+            graph.node(str(id(node)), label=html.escape(repr(node.value)))
+
+        for node in nodes:
+            for child in node.children:
+                graph.edge(str(id(node)), str(id(child)))
+
+        return graph
+
+
+class HashTreeNode(_HashTreeNodeBase):
+    """
+    Immutable n-ary tree node, using hash consing. Thread-safe.
+
+    A node holds a value and a tuple of any number of child nodes. Subtrees are
+    shared in the same way as SLL suffixes in HashNode, with the same rules for
+    equal values, NaNs, and reentrance. Equality implies identity.
+
+    >>> x = HashTreeNode('x')
+    >>> expr = HashTreeNode('+', [HashTreeNode('*', [x, x]), x])
+    >>> expr.children[0]
+    HashTreeNode('*', (HashTreeNode('x'), HashTreeNode('x')))
+    >>> expr.children[0].children[1] is expr.children[1] is HashTreeNode('x')
+    True
+    >>> HashTreeNode('+', (HashTreeNode('*', [x, x]), x)) is expr
+    True
+    >>> HashTreeNode('+', [x]) is HashTreeNode('+', [x, x])
+    False
+    """
+
+    __slots__ = ()
+
+    __match_args__ = ('value', 'children')
+
+    def __new__(cls, value, children=()):
+        """Make a node or retrieve the suitable one that already exists."""
+        children = tuple(children)
+
+        # As in HashNode, the wrong child type would have global effects. A
+        # subclass has its own table, so what matters is the table.
+        for child in children:
+            if not (isinstance(child, _HashTreeNodeBase)
+                    and child._table is cls._table):
+                raise TypeError(f'children must be {cls.__name__} instances, '
+                                f'not {type(child).__name__}')
+
+        return cls._get_or_add(value, children)
+
+    def __repr__(self):
+        """
+        Code representation of this node. Shows the whole tree.
+
+        Like HashNode.__repr__, this is recursive, and raises RecursionError
+        for very deep trees. Shared subtrees are shown each time they occur.
+        """
+        if self._links:
+            return f'{type(self).__name__}({self.value!r}, {self._links!r})'
+        return f'{type(self).__name__}({self.value!r})'
+
+
+class HashBinaryTreeNode(_HashTreeNodeBase):
+    """
+    Immutable binary tree node, using hash consing. Thread-safe.
+
+    A node holds a value and left and right children, either or both of which
+    may be None. Subtrees are shared in the same way as SLL suffixes in
+    HashNode, with the same rules for equal values, NaNs, and reentrance.
+    Equality implies identity.
+
+    >>> one = HashBinaryTreeNode(1)
+    >>> root = HashBinaryTreeNode(2, one, HashBinaryTreeNode(3, right=one))
+    >>> root.right
+    HashBinaryTreeNode(3, None, HashBinaryTreeNode(1))
+    >>> root.right.right is root.left
+    True
+    >>> HashBinaryTreeNode(3, one) is root.right
+    False
+    """
+
+    __slots__ = ()
+
+    __match_args__ = ('value', 'left', 'right')
+
+    def __new__(cls, value, left=None, right=None):
+        """Make a node or retrieve the suitable one that already exists."""
+        # As in HashNode, the wrong child type would have global effects. A
+        # subclass has its own table, so what matters is the table.
+        for child in left, right:
+            if child is not None and not (isinstance(child, _HashTreeNodeBase)
+                                          and child._table is cls._table):
+                raise TypeError(f'children must be {cls.__name__} or None, '
+                                f'not {type(child).__name__}')
+
+        return cls._get_or_add(value, (left, right))
+
+    def __repr__(self):
+        """
+        Code representation of this node. Shows the whole tree.
+
+        Like HashNode.__repr__, this is recursive, and raises RecursionError
+        for very deep trees. Shared subtrees are shown each time they occur.
+        """
+        name = type(self).__name__
+        left, right = self._links
+        if right is not None:
+            return f'{name}({self.value!r}, {left!r}, {right!r})'
+        if left is not None:
+            return f'{name}({self.value!r}, {left!r})'
+        return f'{name}({self.value!r})'
+
+    @property
+    def left(self):
+        """The left child, or None if there is none."""
+        return self._links[0]
+
+    @property
+    def right(self):
+        """The right child, or None if there is none."""
+        return self._links[1]
+
+
+_NOT_FOLDED = object()
+"""Sentinel for a node that has no stored result for a tree_fold function."""
+
+
+def _stored_fold_result(node, token):
+    """Get node's stored result for a tree_fold token, or _NOT_FOLDED."""
+    try:
+        return node._folds.get(token, _NOT_FOLDED)
+    except AttributeError:  # The _folds slot has not been set yet.
+        return _NOT_FOLDED
+
+
+def _store_fold_result(node, token, result):
+    """Store node's result for a tree_fold token."""
+    try:
+        node._folds[token] = result
+    except AttributeError:  # The _folds slot has not been set yet.
+        node._folds = {token: result}
+
+
+def tree_fold(combine):
+    """
+    Decorator to make a function on hash-consed trees, memoized by identity.
+
+    combine(node, child_results) computes the result for node from its value,
+    or anything else about it, and the results for its children, in the order
+    of node.children. The decorated function takes a root node and returns its
+    result. Each result is computed once and stored on its node, so the work is
+    linear in the number of distinct nodes reached the first time, and a
+    repeated call is one lookup. A result lasts as long as its node, and since
+    only the node refers to it, a result that refers back to its own node does
+    not keep the node alive. The tree is traversed iteratively, so very deep
+    trees are fine.
+
+    If several threads call the function at once, a result may sometimes be
+    computed more than once, which is harmless, since nodes are immutable.
+
+    >>> @tree_fold
+    ... def total(node, child_totals):
+    ...     return node.value + sum(child_totals)
+    >>> node = HashTreeNode(1)
+    >>> for _ in range(100):
+    ...     node = HashTreeNode(1, [node, node])
+    >>> total(node)  # A tree of 2**101 - 1 nodes, but only 101 distinct ones.
+    2535301200456458802993406410751
+    """
+    # Results are stored by a token that refers to nothing. Storing them by
+    # the function would make nodes refer to combine, and so to anything it
+    # refers to, which could be the nodes themselves.
+    token = object()
+
+    @functools.wraps(combine)
+    def fold(root):
+        result = _stored_fold_result(root, token)
+        if result is not _NOT_FOLDED:
+            return result
+
+        # Results found or computed in this call, by node id. Every node here
+        # is kept alive by root, so ids are not reused. This call relies only
+        # on these, because a stored result can be lost if another thread
+        # stores the first result on the same node at the same time.
+        results = {}
+
+        stack = [(root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if id(node) in results:
+                continue
+            if expanded:
+                child_results = [results[id(child)]
+                                 for child in node.children]
+                result = combine(node, child_results)
+                _store_fold_result(node, token, result)
+                results[id(node)] = result
+                continue
+
+            result = _stored_fold_result(node, token)
+            if result is not _NOT_FOLDED:
+                results[id(node)] = result
+                continue
+
+            stack.append((node, True))
+            stack.extend((child, False) for child in node.children
+                         if id(child) not in results)
+
+        return results[id(root)]
+
+    return fold
+
+
+@tree_fold
+def tree_size(node, child_sizes):
+    """
+    Count the nodes in a tree, counting shared subtrees each time they appear.
+
+    This takes a root node only. It is memoized by node identity.
+
+    >>> leaf = HashBinaryTreeNode('leaf')
+    >>> tree_size(HashBinaryTreeNode('root', leaf, leaf))
+    3
+    """
+    return 1 + sum(child_sizes)
+
+
+@tree_fold
+def tree_height(node, child_heights):
+    """
+    Find the height of a tree: the most edges on any path from its root down.
+
+    This takes a root node only. It is memoized by node identity.
+
+    >>> leaf = HashTreeNode('leaf')
+    >>> tree_height(leaf), tree_height(HashTreeNode('root', [leaf, leaf]))
+    (0, 1)
+    """
+    return 1 + max(child_heights, default=-1)
+
+
+def count_distinct_nodes(root):
+    """
+    Count the distinct nodes in a hash-consed tree.
+
+    This is the number of node objects the tree really uses, which may be far
+    less than tree_size(root).
+
+    >>> leaf = HashBinaryTreeNode('leaf')
+    >>> count_distinct_nodes(HashBinaryTreeNode('root', leaf, leaf))
+    2
+    """
+    # Every node reachable from root is kept alive by it, so ids are stable.
+    seen = {id(root)}
+    stack = [root]
+    while stack:
+        for child in stack.pop().children:
+            if id(child) not in seen:
+                seen.add(id(child))
+                stack.append(child)
+    return len(seen)
+
+
+def _list_length(head, lengths):
+    """
+    Get the length of the nonempty list at head, remembering lengths by id.
+
+    The caller must ensure all nodes whose lengths are in lengths are alive, or
+    were alive at once with every node passed later, so ids are not reused.
+    """
+    path = []
+    while head is not None and id(head) not in lengths:
+        path.append(head)
+        head = head.next_node
+
+    length = 0 if head is None else lengths[id(head)]
+    for node in reversed(path):
+        length += 1
+        lengths[id(node)] = length
+    return length
+
+
+def _iterate_backward(values):
+    """
+    Iterate values back to front.
+
+    If values is not reversible, it is read into a list first. The list is
+    emptied as it is iterated, so each value is released once it is used.
+    """
+    try:
+        return reversed(values)
+    except TypeError:
+        return _pop_all(list(values))
+
+
+def _pop_all(items):
+    """Pop and yield every item from a list, last to first."""
+    while items:
+        yield items.pop()
+
 
 def traverse(head):
     """
@@ -333,6 +1211,169 @@ def traverse(head):
         head = head.next_node
 
 
+_append_results = weakref.WeakValueDictionary()
+"""Results of append, keyed by (weak reference to node, value)."""
+
+_concat_results = weakref.WeakValueDictionary()
+"""Results of concat, keyed by (weak reference to node, second list)."""
+
+_map_results = weakref.WeakValueDictionary()
+"""Results of map_values, keyed by (weak reference to node, function)."""
+
+_take_results = weakref.WeakValueDictionary()
+"""Results of take, keyed by (weak reference to node, count)."""
+
+_reverse_results = weakref.WeakValueDictionary()
+"""Results of reverse, keyed by weak reference to node."""
+
+
+def _rebuild_onto(head, results, arg, end, convert=None):
+    """
+    Copy the list at head onto end, converting values. Reuse known results.
+
+    The copy is made of nodes of the same type as head. The result for each
+    node is remembered in results, keyed by a weak reference to the node, with
+    arg. Copying stops at the first node whose
+    result is known, since that result is the rest of the copy. Entries last
+    only while their results exist, so results never keep lists alive, even
+    if a result contains the very node it was computed from.
+    """
+    node_type = type(head)
+    path = []
+    acc = end
+
+    while head is not None:
+        key = (weakref.ref(head), arg)
+        known = results.get(key)
+        if known is not None:
+            acc = known
+            break
+        path.append((head, key))
+        head = head.next_node
+
+    for node, key in reversed(path):
+        value = node.value if convert is None else convert(node.value)
+        acc = node_type(value, acc)
+        results[key] = acc
+
+    return acc
+
+
+def append(head, value):
+    """
+    Return a list like the one at head, but with value added at the end.
+
+    Like the other list operations, this makes nodes of the same type as head.
+    An empty list is taken to be a HashNode list.
+
+    >>> append(HashNode.from_iterable('abc'), 'd')
+    HashNode('a', HashNode('b', HashNode('c', HashNode('d'))))
+    >>> append(CompactHashNode.from_iterable('a'), 'b')
+    CompactHashNode('a', CompactHashNode('b'))
+    >>> append(None, 'a')
+    HashNode('a')
+    """
+    node_type = HashNode if head is None else type(head)
+    return _rebuild_onto(head, _append_results, value, node_type(value))
+
+
+def concat(first, second):
+    """
+    Return the list of the values in first, followed by those in second.
+
+    The result shares all of second. If neither list is empty, they must be
+    made of the same type of nodes, or TypeError is raised.
+
+    >>> second = HashNode.from_iterable('cd')
+    >>> head = concat(HashNode.from_iterable('ab'), second)
+    >>> head
+    HashNode('a', HashNode('b', HashNode('c', HashNode('d'))))
+    >>> head.next_node.next_node is second
+    True
+    """
+    return _rebuild_onto(first, _concat_results, second, second)
+
+
+def map_values(func, head):
+    """
+    Return the list of func applied to each value in the list at head.
+
+    func must be hashable, since results are remembered per function. Like
+    values in HashNode lists, it should also have no side effects, since it
+    is not called on nodes whose results are still remembered.
+
+    >>> map_values(str.upper, HashNode.from_iterable('abc'))
+    HashNode('A', HashNode('B', HashNode('C')))
+    """
+    return _rebuild_onto(head, _map_results, func, None, func)
+
+
+def take(head, count):
+    """
+    Return the list of the first count values in the list at head.
+
+    If the list is no longer than count, the result is head itself.
+
+    >>> take(HashNode.from_iterable('abcd'), 2)
+    HashNode('a', HashNode('b'))
+    >>> head = HashNode.from_iterable('ab')
+    >>> take(head, 3) is head
+    True
+    """
+    if count < 0:
+        raise ValueError("can't take negatively many items")
+
+    node_type = type(head)
+    path = []
+    acc = None
+
+    while head is not None and count > 0:
+        key = (weakref.ref(head), count)
+        known = _take_results.get(key)
+        if known is not None:
+            acc = known
+            break
+        path.append((head, key))
+        head = head.next_node
+        count -= 1
+
+    for node, key in reversed(path):
+        acc = node_type(node.value, acc)
+        _take_results[key] = acc
+
+    return acc
+
+
+def reverse(head):
+    """
+    Return the list of the values in the list at head, in reverse order.
+
+    The result and head are each remembered as the other's reverse.
+
+    >>> head = HashNode.from_iterable('abc')
+    >>> reverse(head)
+    HashNode('c', HashNode('b', HashNode('a')))
+    >>> reverse(reverse(head)) is head
+    True
+    """
+    if head is None:
+        return None
+
+    key = weakref.ref(head)
+    known = _reverse_results.get(key)
+    if known is not None:
+        return known
+
+    node_type = type(head)
+    acc = None
+    for value in traverse(head):
+        acc = node_type(value, acc)
+
+    _reverse_results[key] = acc
+    _reverse_results[weakref.ref(acc)] = head
+    return acc
+
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""Tests for async_queues.py."""
+
+import asyncio
+import unittest
+
+from parameterized import parameterized, parameterized_class
+
+from palgoviz import queues
+from palgoviz.async_queues import AsyncQueue
+from palgoviz.blocking_queues import QueueClosedError
+
+
+async def _yield_many(count=5):
+    """Let other tasks run for a while."""
+    for _ in range(count):
+        await asyncio.sleep(0)
+
+
+@parameterized_class(('name', 'queue_type'), [
+    (queue_type.__name__, queue_type) for queue_type in [
+        queues.DequeFifoQueue,
+        queues.BiStackFifoQueue,
+        queues.SinglyLinkedListFifoQueue,
+        queues.ListLifoQueue,
+        queues.SinglyLinkedListLifoQueue,
+        queues.FastDequeueMaxPriorityQueue,
+        queues.BinaryHeapMaxPriorityQueue,
+        queues.IndexedMaxPriorityQueue,
+    ]
+])
+class TestAsyncQueue(unittest.IsolatedAsyncioTestCase):
+    """Tests for AsyncQueue, wrapping various queue types."""
+
+    def _expected_order(self, items):
+        """Get the order the wrapped queue type would dequeue items in."""
+        queue = self.queue_type()
+        queue.enqueue_many(items)
+        return queue.dequeue_many(len(items))
+
+    async def test_gets_in_wrapped_queue_order(self):
+        items = [30, 10, 50, 20, 40]
+        aq = AsyncQueue.wrap(self.queue_type())
+        for item in items:
+            await aq.put(item)
+        actual = [await aq.get() for _ in items]
+        self.assertListEqual(actual, self._expected_order(items))
+
+    async def test_peek_shows_next_item(self):
+        aq = AsyncQueue.wrap(self.queue_type())
+        for item in [30, 10, 50]:
+            aq.put_nowait(item)
+        self.assertEqual(aq.peek(), self._expected_order([30, 10, 50])[0])
+
+    async def test_peek_on_empty_raises_lookup_error(self):
+        aq = AsyncQueue.wrap(self.queue_type())
+        with self.assertRaises(LookupError):
+            aq.peek()
+
+    async def test_get_nowait_on_empty_raises_queue_empty(self):
+        aq = AsyncQueue.wrap(self.queue_type())
+        with self.assertRaises(asyncio.QueueEmpty):
+            aq.get_nowait()
+
+    async def test_put_nowait_on_full_raises_queue_full(self):
+        aq = AsyncQueue.wrap(self.queue_type(), capacity=1)
+        aq.put_nowait('ham')
+        with self.assertRaises(asyncio.QueueFull):
+            aq.put_nowait('spam')
+
+    async def test_waiting_get_gets_item_put_later(self):
+        aq = AsyncQueue.wrap(self.queue_type())
+        getter = asyncio.create_task(aq.get())
+        await _yield_many()
+
+        with self.subTest('waiting'):
+            self.assertFalse(getter.done())
+
+        await aq.put('ham')
+
+        with self.subTest('item'):
+            self.assertEqual(await getter, 'ham')
+
+    async def test_waiting_put_proceeds_once_there_is_room(self):
+        aq = AsyncQueue.wrap(self.queue_type(), capacity=1)
+        await aq.put('ham')
+        putter = asyncio.create_task(aq.put('spam'))
+        await _yield_many()
+
+        with self.subTest('waiting'):
+            self.assertFalse(putter.done())
+
+        first = await aq.get()
+        await putter
+
+        with self.subTest('first item'):
+            self.assertEqual(first, 'ham')
+        with self.subTest('second item'):
+            self.assertEqual(aq.get_nowait(), 'spam')
+
+    async def test_cancelled_waiting_get_loses_no_item(self):
+        aq = AsyncQueue.wrap(self.queue_type())
+        doomed = asyncio.create_task(aq.get())
+        survivor = asyncio.create_task(aq.get())
+        await _yield_many()
+        doomed.cancel()
+        await _yield_many()
+        await aq.put('ham')
+
+        with self.subTest('cancelled'):
+            with self.assertRaises(asyncio.CancelledError):
+                await doomed
+        with self.subTest('survivor'):
+            self.assertEqual(await survivor, 'ham')
+
+    async def test_getter_cancelled_after_wakeup_passes_it_on(self):
+        aq = AsyncQueue.wrap(self.queue_type())
+        doomed = asyncio.create_task(aq.get())
+        survivor = asyncio.create_task(aq.get())
+        await _yield_many()
+        aq.put_nowait('ham')  # Wakes doomed, which has not yet resumed.
+        doomed.cancel()
+
+        with self.subTest('cancelled'):
+            with self.assertRaises(asyncio.CancelledError):
+                await doomed
+        with self.subTest('survivor'):
+            self.assertEqual(
+                await asyncio.wait_for(survivor, timeout=10), 'ham')
+
+    async def test_putter_cancelled_after_wakeup_passes_it_on(self):
+        aq = AsyncQueue.wrap(self.queue_type(), capacity=1)
+        aq.put_nowait('ham')
+        doomed = asyncio.create_task(aq.put('spam'))
+        survivor = asyncio.create_task(aq.put('eggs'))
+        await _yield_many()
+        aq.get_nowait()  # Wakes doomed, which has not yet resumed.
+        doomed.cancel()
+
+        with self.subTest('cancelled'):
+            with self.assertRaises(asyncio.CancelledError):
+                await doomed
+        with self.subTest('survivor'):
+            await asyncio.wait_for(survivor, timeout=10)
+            self.assertEqual(aq.get_nowait(), 'eggs')
+
+    async def test_close_wakes_waiting_get_with_error(self):
+        aq = AsyncQueue.wrap(self.queue_type())
+        getter = asyncio.create_task(aq.get())
+        await _yield_many()
+        aq.close()
+        with self.assertRaises(QueueClosedError):
+            await getter
+
+    async def test_close_wakes_waiting_put_with_error(self):
+        aq = AsyncQueue.wrap(self.queue_type(), capacity=1)
+        aq.put_nowait('ham')
+        putter = asyncio.create_task(aq.put('spam'))
+        await _yield_many()
+        aq.close()
+        with self.assertRaises(QueueClosedError):
+            await putter
+
+    async def test_cannot_put_after_close(self):
+        aq = AsyncQueue.wrap(self.queue_type())
+        aq.close()
+        with self.assertRaises(QueueClosedError):
+            await aq.put('ham')
+
+    async def test_remaining_items_get_after_close(self):
+        aq = AsyncQueue.wrap(self.queue_type())
+        aq.put_nowait(10)
+        aq.put_nowait(20)
+        aq.close()
+        actual = [await aq.get(), await aq.get()]
+        self.assertListEqual(actual, self._expected_order([10, 20]))
+
+        with self.assertRaises(QueueClosedError):
+            await aq.get()
+
+    async def test_producers_and_consumers_transfer_all_items(self):
+        """Items from several producers each reach exactly one consumer."""
+        aq = AsyncQueue.wrap(self.queue_type(), capacity=4)
+        producer_count = 4
+        per_producer = 100
+        received = []
+
+        async def produce(start):
+            for item in range(start, start + per_producer):
+                await aq.put(item)
+
+        async def consume():
+            while True:
+                try:
+                    received.append(await aq.get())
+                except QueueClosedError:
+                    return
+
+        consumers = [asyncio.create_task(consume()) for _ in range(3)]
+        await asyncio.gather(*(produce(index * per_producer)
+                               for index in range(producer_count)))
+        aq.close()
+        await asyncio.gather(*consumers)
+
+        expected = list(range(producer_count * per_producer))
+        self.assertListEqual(sorted(received), expected)
+
+
+class TestAsyncQueueConstruction(unittest.TestCase):
+    """Tests for constructing AsyncQueue instances."""
+
+    @parameterized.expand([('zero', 0), ('negative', -1)])
+    def test_nonpositive_capacity_raises_value_error(self, _name, capacity):
+        with self.assertRaises(ValueError):
+            AsyncQueue.wrap(queues.FifoQueue.create(), capacity=capacity)
+
+    def test_capacity_defaults_to_none(self):
+        aq = AsyncQueue.wrap(queues.PriorityQueue.create())
+        self.assertIsNone(aq.capacity)
+
+    def test_unbounded_queue_is_never_full(self):
+        aq = AsyncQueue.wrap(queues.LifoQueue.create())
+        for item in range(1000):
+            aq.put_nowait(item)
+        self.assertFalse(aq.full())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""Tests for bench.py."""
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from parameterized import parameterized
+
+from palgoviz import bench
+
+
+class TestBenchQueues(unittest.TestCase):
+    """Tests for the queues benchmark, run at tiny sizes."""
+
+    def test_reports_every_backend_at_every_size(self):
+        report = bench.bench_queues(min_size=10, max_size=100)
+        expected = {(name, size)
+                    for name in ('DequeFifoQueue',
+                                 'SinglyLinkedListLifoQueue',
+                                 'BinaryHeapMaxPriorityQueue')
+                    for size in (10, 100)}
+        actual = {(record['backend'], record['size'])
+                  for record in report['results']}
+        self.assertTrue(expected <= actual)
+
+    def test_sizes_are_powers_of_ten_in_range(self):
+        report = bench.bench_queues(min_size=5, max_size=2000,
+                                    backends=['DequeFifoQueue'])
+        sizes = [record['size'] for record in report['results']]
+        self.assertListEqual(sizes, [10, 100, 1000])
+
+    @parameterized.expand([(workload,) for workload in bench.QUEUE_WORKLOADS])
+    def test_records_time_and_memory_for_workload(self, workload):
+        report = bench.bench_queues(min_size=100, max_size=100,
+                                    backends=['ListLifoQueue'],
+                                    workloads=[workload])
+        [record] = report['results']
+
+        with self.subTest('time'):
+            self.assertGreater(record['ns_per_op'][workload], 0)
+        with self.subTest('memory'):
+            self.assertGreater(record['peak_bytes'], 0)
+
+    def test_quadratic_backend_above_cap_is_recorded_as_skipped(self):
+        report = bench.bench_queues(min_size=10, max_size=100,
+                                    backends=['SlowFifoQueue'],
+                                    quadratic_cap=10)
+        skips = ['skipped' in record for record in report['results']]
+        self.assertListEqual(skips, [False, True])
+
+    def test_report_is_json_serializable(self):
+        report = bench.bench_queues(min_size=10, max_size=10)
+        self.assertEqual(json.loads(json.dumps(report)), report)
+
+
+class TestBenchBinarySearchMany(unittest.TestCase):
+    """Tests for the binary-search-many benchmark, run at tiny sizes."""
+
+    def test_reports_each_search_at_each_count(self):
+        rows = bench.bench_binary_search_many(size=100, counts=(1, 10))
+        labels = [label for label, _ in rows]
+        expected = [f'{name}, {count} needles'
+                    for count in (1, 10)
+                    for name in ('binary_search',
+                                 'binary_search_iterative',
+                                 'binary_search_good',
+                                 'binary_search_many',
+                                 'binary_search_many, sorted',
+                                 'binary_search_many, array')]
+        self.assertListEqual(labels, expected)
+
+
+class TestBenchHashNodes(unittest.TestCase):
+    """Tests for the hash-nodes benchmark, run at tiny sizes."""
+
+    def test_reports_each_workload_at_each_thread_count(self):
+        rows = bench.bench_hash_nodes(threads=(1, 3), length=10, lists=2,
+                                      rounds=2)
+        labels = [label for label, _ in rows]
+        self.assertListEqual(labels, [
+            'hit, 1 thread(s)', 'hit, 1 thread(s) locked',
+            'miss, 1 thread(s)', 'miss, 1 thread(s) locked',
+            'hit, 3 thread(s)', 'hit, 3 thread(s) locked',
+            'miss, 3 thread(s)', 'miss, 3 thread(s) locked',
+        ])
+
+    def test_times_are_positive(self):
+        rows = bench.bench_hash_nodes(threads=(2,), length=10, lists=1,
+                                      rounds=1)
+        self.assertTrue(all(nanoseconds > 0 for _, nanoseconds in rows))
+
+
+class TestBenchHashNodeMemory(unittest.TestCase):
+    """Tests for the hash-node-memory benchmark, run at a tiny size."""
+
+    def test_compact_nodes_use_less_memory(self):
+        rows = bench.bench_hash_node_memory(size=1000)
+        sizes = {label: size for label, size, _ in rows}
+        self.assertLess(sizes['CompactHashNode'], sizes['HashNode'])
+
+
+class TestBenchMergeSorts(unittest.TestCase):
+    """Tests for the merge-sorts benchmark, run at tiny sizes."""
+
+    def test_reports_each_sort_at_each_size(self):
+        rows = bench.bench_merge_sorts(sizes=(10, 20))
+        labels = [label for label, _ in rows]
+        expected = [f'{name}, {size} items'
+                    for size in (10, 20)
+                    for name in ('merge_sort',
+                                 'merge_sort_bottom_up_unstable',
+                                 'merge_sort_bottom_up',
+                                 'merge_sort_buffered',
+                                 'merge_sort_adaptive',
+                                 'sorted')]
+        self.assertListEqual(labels, expected)
+
+    @parameterized.expand([(kind,) for kind in bench.MERGE_SORT_INPUTS])
+    def test_times_are_positive_for_input(self, kind):
+        rows = bench.bench_merge_sorts(sizes=(50,), kind=kind)
+        self.assertTrue(all(nanoseconds > 0 for _, nanoseconds in rows))
+
+
+class TestBenchParallelMergeSort(unittest.TestCase):
+    """Tests for the parallel-merge-sort benchmark, run at tiny sizes."""
+
+    @parameterized.expand([('array', True), ('list', False)])
+    def test_reports_doubling_worker_counts(self, _name, numeric):
+        rows = bench.bench_parallel_merge_sort(size=100, max_workers=3,
+                                               numeric=numeric)
+        labels = [label for label, _ in rows]
+        self.assertListEqual(labels, ['1 worker(s)', '2 worker(s)',
+                                      '3 worker(s)'])
+
+
+class TestBenchSllOps(unittest.TestCase):
+    """Tests for the sll-ops benchmark, run at tiny sizes."""
+
+    def test_reports_memoized_and_rebuilt_for_each_operation(self):
+        rows = bench.bench_sll_ops(lists=3, prefix_length=2, tail_length=20)
+        labels = [label for label, _ in rows]
+        expected = [f'{name} {kind}'
+                    for name in ('append', 'concat', 'map_values', 'take',
+                                 'reverse')
+                    for kind in ('memoized', 'rebuilt')]
+        self.assertListEqual(labels, expected)
+
+
+class TestMain(unittest.TestCase):
+    """Tests for running benchmarks as from the command line."""
+
+    def test_queues_json_to_stdout(self):
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            bench.main(['queues', '--max-size', '10', '--json', '-'])
+        report = json.loads(stdout.getvalue())
+        self.assertEqual(report['benchmark'], 'queues')
+
+    def test_queues_json_to_file_with_table(self):
+        stdout = io.StringIO()
+        with tempfile.TemporaryDirectory() as dirname:
+            path = os.path.join(dirname, 'results.json')
+            with contextlib.redirect_stdout(stdout):
+                bench.main(['queues', '--max-size', '10', '--json', path])
+            with open(path, encoding='utf-8') as file:
+                report = json.load(file)
+
+        with self.subTest('table'):
+            self.assertIn('DequeFifoQueue', stdout.getvalue())
+        with self.subTest('json'):
+            self.assertEqual(report['parameters']['max_size'], 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""Tests for blocking_queues.py."""
+
+import threading
+import time
+import unittest
+
+from parameterized import parameterized, parameterized_class
+
+from palgoviz import queues
+from palgoviz.blocking_queues import BlockingQueue, QueueClosedError
+
+_SHORT_WAIT = 0.05
+"""Timeout, in seconds, for operations that are expected to time out."""
+
+_LONG_WAIT = 10.0
+"""Timeout, in seconds, for operations that are expected to succeed."""
+
+
+def _start_thread(target, *args):
+    """Start and return a daemon thread running target(*args)."""
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+@parameterized_class(('name', 'queue_type'), [
+    (queue_type.__name__, queue_type) for queue_type in [
+        queues.DequeFifoQueue,
+        queues.SlowFifoQueue,
+        queues.BiStackFifoQueue,
+        queues.SinglyLinkedListFifoQueue,
+        queues.ListLifoQueue,
+        queues.SinglyLinkedListLifoQueue,
+        queues.FastEnqueueMaxPriorityQueue,
+        queues.BinaryHeapMaxPriorityQueue,
+        queues.IndexedMaxPriorityQueue,
+    ]
+])
+class TestBlockingQueue(unittest.TestCase):
+    """Tests for BlockingQueue, wrapping various queue types."""
+
+    def _drain(self, bq):
+        """Dequeue everything from bq without waiting. Return it as a list."""
+        items = []
+        while bq:
+            items.append(bq.dequeue(timeout=0))
+        return items
+
+    def _expected_order(self, items):
+        """Get the order the wrapped queue type would dequeue items in."""
+        queue = self.queue_type()
+        queue.enqueue_many(items)
+        return queue.dequeue_many(len(items))
+
+    def test_wrap_creates_empty_open_blocking_queue(self):
+        bq = BlockingQueue.wrap(self.queue_type())
+        with self.subTest('empty'):
+            self.assertEqual(len(bq), 0)
+        with self.subTest('open'):
+            self.assertFalse(bq.closed)
+
+    def test_dequeues_in_wrapped_queue_order(self):
+        items = [30, 10, 50, 20, 40]
+        bq = BlockingQueue.wrap(self.queue_type())
+        for item in items:
+            bq.enqueue(item)
+        self.assertListEqual(self._drain(bq), self._expected_order(items))
+
+    def test_peek_shows_next_item(self):
+        bq = BlockingQueue.wrap(self.queue_type())
+        for item in [30, 10, 50]:
+            bq.enqueue(item)
+        expected = self._expected_order([30, 10, 50])[0]
+        self.assertEqual(bq.peek(), expected)
+
+    def test_peek_on_empty_raises_lookup_error(self):
+        bq = BlockingQueue.wrap(self.queue_type())
+        with self.assertRaises(LookupError):
+            bq.peek()
+
+    def test_dequeue_on_empty_times_out(self):
+        bq = BlockingQueue.wrap(self.queue_type())
+        with self.assertRaises(TimeoutError):
+            bq.dequeue(timeout=_SHORT_WAIT)
+
+    def test_enqueue_on_full_times_out(self):
+        bq = BlockingQueue.wrap(self.queue_type(), capacity=2)
+        bq.enqueue('ham')
+        bq.enqueue('spam')
+        with self.assertRaises(TimeoutError):
+            bq.enqueue('eggs', timeout=_SHORT_WAIT)
+
+    def test_waiting_dequeue_gets_item_enqueued_later(self):
+        bq = BlockingQueue.wrap(self.queue_type())
+        results = []
+        thread = _start_thread(
+            lambda: results.append(bq.dequeue(timeout=_LONG_WAIT)))
+        time.sleep(_SHORT_WAIT)
+        bq.enqueue('ham')
+        thread.join(_LONG_WAIT)
+        self.assertListEqual(results, ['ham'])
+
+    def test_waiting_enqueue_proceeds_once_there_is_room(self):
+        bq = BlockingQueue.wrap(self.queue_type(), capacity=1)
+        bq.enqueue('ham')
+        thread = _start_thread(lambda: bq.enqueue('spam', timeout=_LONG_WAIT))
+        time.sleep(_SHORT_WAIT)
+
+        with self.subTest('blocked while full'):
+            self.assertEqual(len(bq), 1)
+
+        first = bq.dequeue(timeout=_LONG_WAIT)
+        thread.join(_LONG_WAIT)
+
+        with self.subTest('first item'):
+            self.assertEqual(first, 'ham')
+        with self.subTest('second item'):
+            self.assertEqual(bq.dequeue(timeout=0), 'spam')
+
+    def test_close_wakes_waiting_dequeue_with_error(self):
+        bq = BlockingQueue.wrap(self.queue_type())
+        errors = []
+
+        def consume():
+            try:
+                bq.dequeue(timeout=_LONG_WAIT)
+            except QueueClosedError as error:
+                errors.append(error)
+
+        thread = _start_thread(consume)
+        time.sleep(_SHORT_WAIT)
+        bq.close()
+        thread.join(_LONG_WAIT)
+        self.assertEqual(len(errors), 1)
+
+    def test_close_wakes_waiting_enqueue_with_error(self):
+        bq = BlockingQueue.wrap(self.queue_type(), capacity=1)
+        bq.enqueue('ham')
+        errors = []
+
+        def produce():
+            try:
+                bq.enqueue('spam', timeout=_LONG_WAIT)
+            except QueueClosedError as error:
+                errors.append(error)
+
+        thread = _start_thread(produce)
+        time.sleep(_SHORT_WAIT)
+        bq.close()
+        thread.join(_LONG_WAIT)
+        self.assertEqual(len(errors), 1)
+
+    def test_cannot_enqueue_after_close(self):
+        bq = BlockingQueue.wrap(self.queue_type())
+        bq.close()
+        with self.assertRaises(QueueClosedError):
+            bq.enqueue('ham')
+
+    def test_remaining_items_dequeue_after_close(self):
+        bq = BlockingQueue.wrap(self.queue_type())
+        bq.enqueue(10)
+        bq.enqueue(20)
+        bq.close()
+        self.assertListEqual(self._drain(bq), self._expected_order([10, 20]))
+
+    def test_dequeue_after_close_and_drain_raises_without_waiting(self):
+        bq = BlockingQueue.wrap(self.queue_type())
+        bq.close()
+        with self.assertRaises(QueueClosedError):
+            bq.dequeue()
+
+    def test_producers_and_consumers_transfer_all_items(self):
+        """Items from several producers each reach exactly one consumer."""
+        bq = BlockingQueue.wrap(self.queue_type(), capacity=8)
+        producer_count = 4
+        per_producer = 250
+        received = []
+        received_lock = threading.Lock()
+
+        def produce(start):
+            for item in range(start, start + per_producer):
+                bq.enqueue(item, timeout=_LONG_WAIT)
+
+        def consume():
+            while True:
+                try:
+                    item = bq.dequeue(timeout=_LONG_WAIT)
+                except QueueClosedError:
+                    return
+                with received_lock:
+                    received.append(item)
+
+        producers = [_start_thread(produce, index * per_producer)
+                     for index in range(producer_count)]
+        consumers = [_start_thread(consume) for _ in range(3)]
+
+        for thread in producers:
+            thread.join(_LONG_WAIT)
+        bq.close()
+        for thread in consumers:
+            thread.join(_LONG_WAIT)
+
+        expected = list(range(producer_count * per_producer))
+        self.assertListEqual(sorted(received), expected)
+
+
+class TestBlockingQueueConstruction(unittest.TestCase):
+    """Tests for constructing BlockingQueue instances."""
+
+    @parameterized.expand([('zero', 0), ('negative', -1)])
+    def test_nonpositive_capacity_raises_value_error(self, _name, capacity):
+        with self.assertRaises(ValueError):
+            BlockingQueue.wrap(queues.FifoQueue.create(), capacity=capacity)
+
+    def test_capacity_is_as_given(self):
+        bq = BlockingQueue.wrap(queues.LifoQueue.create(), capacity=5)
+        self.assertEqual(bq.capacity, 5)
+
+    def test_capacity_defaults_to_none(self):
+        bq = BlockingQueue.wrap(queues.PriorityQueue.create())
+        self.assertIsNone(bq.capacity)
+
+    def test_close_is_idempotent(self):
+        bq = BlockingQueue.wrap(queues.FifoQueue.create())
+        bq.close()
+        bq.close()
+        self.assertTrue(bq.closed)
+
+
+if __name__ == '__main__':
+    unittest.main()
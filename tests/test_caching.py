@@ -0,0 +1,967 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""Tests for caching.py."""
+
+import concurrent.futures
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import timeit
+import unittest
+
+from parameterized import parameterized
+
+from palgoviz import caching
+
+
+class _FakeTimer:
+    """Manually advanced clock, for testing expiration."""
+
+    __slots__ = ('now',)
+
+    def __init__(self):
+        """Create a timer that starts at time 0."""
+        self.now = 0.0
+
+    def __call__(self):
+        """Get the current time."""
+        return self.now
+
+
+def _memoize_recording(calls, **kwargs):
+    """Decorate an identity function with @memoize, recording its calls."""
+    @caching.memoize(**kwargs)
+    def identity(arg):
+        calls.append(arg)
+        return arg
+
+    return identity
+
+
+class TestMemoizeOptions(unittest.TestCase):
+    """Tests for @memoize with and without options."""
+
+    def test_bare_decorator_caches_without_bound(self):
+        calls = []
+        f = _memoize_recording(calls)
+        for arg in [*range(1000), *range(1000)]:
+            f(arg)
+        self.assertListEqual(calls, list(range(1000)))
+
+    def test_decorator_factory_without_options_caches_without_bound(self):
+        calls = []
+
+        @caching.memoize()
+        def f(arg):
+            calls.append(arg)
+            return arg
+
+        f(1)
+        f(1)
+        self.assertListEqual(calls, [1])
+
+    def test_wrapper_metadata_is_preserved(self):
+        @caching.memoize(maxsize=3)
+        def square(n):
+            """Square a number."""
+            return n**2
+
+        with self.subTest(attribute='__name__'):
+            self.assertEqual(square.__name__, 'square')
+        with self.subTest(attribute='__doc__'):
+            self.assertEqual(square.__doc__, 'Square a number.')
+
+    @parameterized.expand([
+        ('negative maxsize', {'maxsize': -1}),
+        ('unknown policy', {'maxsize': 2, 'policy': 'fifo'}),
+        ('zero ttl', {'ttl': 0}),
+        ('negative ttl', {'ttl': -5}),
+    ])
+    def test_bad_option_raises_value_error(self, _name, kwargs):
+        with self.assertRaises(ValueError):
+            caching.memoize(**kwargs)(abs)
+
+    def test_maxsize_zero_never_caches(self):
+        calls = []
+        f = _memoize_recording(calls, maxsize=0)
+        results = [f(1), f(1), f(1)]
+
+        with self.subTest('results'):
+            self.assertListEqual(results, [1, 1, 1])
+        with self.subTest('calls'):
+            self.assertListEqual(calls, [1, 1, 1])
+        with self.subTest('info'):
+            self.assertEqual(f.cache_info(), (0, 3, 0, 0))
+
+
+class TestArguments(unittest.TestCase):
+    """Tests for memoizing functions with various arguments."""
+
+    def _record(self, **kwargs):
+        """Make a memoized function that records and returns its arguments."""
+        self._calls = []
+
+        @caching.memoize(**kwargs)
+        def f(*args, **kwargs):
+            self._calls.append((args, kwargs))
+            return args, kwargs
+
+        return f
+
+    def test_multiple_positional_arguments(self):
+        f = self._record()
+        f(1, 2)
+        f(2, 1)
+        f(1, 2)
+        self.assertListEqual(self._calls, [((1, 2), {}), ((2, 1), {})])
+
+    def test_no_arguments(self):
+        f = self._record()
+        f()
+        f()
+        self.assertListEqual(self._calls, [((), {})])
+
+    def test_keyword_arguments(self):
+        f = self._record()
+        f(1, x=2)
+        f(1, x=3)
+        f(1, x=2)
+        self.assertListEqual(self._calls,
+                             [((1,), {'x': 2}), ((1,), {'x': 3})])
+
+    def test_keyword_and_positional_forms_are_cached_separately(self):
+        f = self._record()
+        f(1, 2)
+        f(1, x=2)
+        self.assertEqual(len(self._calls), 2)
+
+    def test_keyword_order_matters(self):
+        f = self._record()
+        f(x=1, y=2)
+        f(y=2, x=1)
+        f(x=1, y=2)
+        self.assertEqual(len(self._calls), 2)
+
+    @parameterized.expand([
+        ('int and 1-tuple', (1,), ((1,),)),
+        ('str and 1-tuple', ('ham',), (('ham',),)),
+        ('2 args and 2-tuple', (1, 2), ((1, 2),)),
+        ('empty str and no args', ('',), ()),
+    ])
+    def test_distinct_argument_lists_do_not_collide(self, _name, args1,
+                                                    args2):
+        f = self._record()
+        self.assertNotEqual(f(*args1), f(*args2))
+
+    def test_equal_arguments_of_different_types_share_entry(self):
+        f = self._record()
+        f(3, 4)
+        f(3.0, 4)
+        self.assertEqual(len(self._calls), 1)
+
+    @parameterized.expand([
+        ('int then float', (1, 1.0)),
+        ('float then bool', (1.0, True)),
+        ('bool then int', (True, 1)),
+        ('1-tuple of int then of float', ((1,), (1.0,))),
+    ])
+    def test_equal_lone_arguments_of_different_types_share_entry(
+            self, _name, lone_args):
+        f = self._record()
+        for arg in lone_args:
+            f(arg)
+        self.assertEqual(len(self._calls), 1)
+
+    def test_typed_caches_lone_arguments_of_different_types_separately(self):
+        f = self._record(typed=True)
+        f(1)
+        f(1.0)
+        f(True)
+        self.assertEqual(len(self._calls), 3)
+
+    def test_typed_caches_different_types_separately(self):
+        f = self._record(typed=True)
+        f(3, 4)
+        f(3.0, 4)
+        f(3, y=4)
+        f(3, y=4.0)
+        self.assertEqual(len(self._calls), 4)
+
+    def test_unhashable_argument_raises_type_error(self):
+        f = self._record()
+        with self.assertRaises(TypeError):
+            f([1, 2])
+
+    def test_memoize_by_passes_all_arguments_to_key(self):
+        key_calls = []
+
+        def key(*args, **kwargs):
+            key_calls.append((args, kwargs))
+            return tuple(args[0])
+
+        @caching.memoize_by(key)
+        def f(first, *rest, **named):
+            return first
+
+        f(['ham'], 2, x=3)
+        self.assertListEqual(key_calls, [((['ham'], 2), {'x': 3})])
+
+    def test_thread_safe_mode_supports_keyword_arguments(self):
+        calls = []
+
+        @caching.memoize(thread_safe=True)
+        def f(a, *, b):
+            calls.append((a, b))
+            return a + b
+
+        results = [f(1, b=2), f(1, b=2), f(1, b=3)]
+
+        with self.subTest('results'):
+            self.assertListEqual(results, [3, 3, 4])
+        with self.subTest('calls'):
+            self.assertListEqual(calls, [(1, 2), (1, 3)])
+
+
+class TestLru(unittest.TestCase):
+    """Tests for the LRU eviction policy."""
+
+    def test_evicts_least_recently_used(self):
+        calls = []
+        f = _memoize_recording(calls, maxsize=3, policy='lru')
+        for arg in [1, 2, 3, 1, 4, 2, 1, 3]:
+            f(arg)
+        # 4 evicts 2. 2 evicts 3. 1 hits. 3 evicts 4.
+        self.assertListEqual(calls, [1, 2, 3, 4, 2, 3])
+
+    def test_size_never_exceeds_maxsize(self):
+        f = caching.memoize(maxsize=10)(abs)
+        for arg in range(100):
+            f(arg)
+        self.assertEqual(f.cache_info().currsize, 10)
+
+    def test_is_default_policy_with_maxsize(self):
+        calls_default = []
+        calls_lru = []
+        f = _memoize_recording(calls_default, maxsize=2)
+        g = _memoize_recording(calls_lru, maxsize=2, policy='lru')
+        for arg in [1, 2, 1, 3, 2, 1, 1, 3]:
+            f(arg)
+            g(arg)
+        self.assertListEqual(calls_default, calls_lru)
+
+
+class TestLfu(unittest.TestCase):
+    """Tests for the LFU eviction policy."""
+
+    def test_evicts_least_frequently_used(self):
+        calls = []
+        f = _memoize_recording(calls, maxsize=2, policy='lfu')
+        for arg in [1, 1, 1, 2, 3, 1, 2]:
+            f(arg)
+        # 3 evicts 2 (used once), not 1 (used thrice). Then 2 evicts 3.
+        self.assertListEqual(calls, [1, 2, 3, 2])
+
+    def test_ties_are_broken_by_least_recent_use(self):
+        calls = []
+        f = _memoize_recording(calls, maxsize=3, policy='lfu')
+        for arg in [1, 2, 3, 2, 1, 4, 3]:
+            f(arg)
+        # 1 and 2 are used twice. 3 is used once and evicted by 4.
+        self.assertListEqual(calls, [1, 2, 3, 4, 3])
+
+    def test_evicted_key_starts_over_with_count_one(self):
+        calls = []
+        f = _memoize_recording(calls, maxsize=2, policy='lfu')
+        for arg in [1, 1, 1, 2, 2, 3, 2, 3, 3, 1]:
+            f(arg)
+        # 3 evicts 2 (used twice, not 1, used thrice). 2 evicts 3 (used once).
+        # 3 evicts 2 (used once, but longer ago). 1 hits.
+        self.assertListEqual(calls, [1, 2, 3, 2, 3])
+
+    def test_size_never_exceeds_maxsize(self):
+        f = caching.memoize(maxsize=10, policy='lfu')(abs)
+        for arg in range(100):
+            f(arg)
+            f(arg // 2)
+        self.assertEqual(f.cache_info().currsize, 10)
+
+    def test_hits_and_misses_match_naive_lfu(self):
+        """A long run agrees with a straightforward O(n) LFU simulation."""
+        maxsize = 5
+        args = [(index * 7919) % 13 % (index % 9 + 1) for index in range(500)]
+        f = caching.memoize(maxsize=maxsize, policy='lfu')(abs)
+
+        counts = {}
+        last_used = {}
+        expected_misses = 0
+        for time, arg in enumerate(args):
+            f(arg)
+            if arg not in counts:
+                expected_misses += 1
+                if len(counts) == maxsize:
+                    victim = min(counts,
+                                 key=lambda k: (counts[k], last_used[k]))
+                    del counts[victim]
+                counts[arg] = 0
+            counts[arg] += 1
+            last_used[arg] = time
+
+        self.assertEqual(f.cache_info().misses, expected_misses)
+
+
+class TestTtl(unittest.TestCase):
+    """Tests for expiration."""
+
+    def setUp(self):
+        """Use a fake timer, so tests control when expiration happens."""
+        self._timer = _FakeTimer()
+
+    @parameterized.expand([
+        ('unbounded', {}),
+        ('lru', {'maxsize': 4, 'policy': 'lru'}),
+        ('lfu', {'maxsize': 4, 'policy': 'lfu'}),
+    ])
+    def test_entry_expires_after_ttl(self, _name, kwargs):
+        calls = []
+        f = _memoize_recording(calls, ttl=10, timer=self._timer, **kwargs)
+        f('a')
+        self._timer.now = 9.5
+        f('a')
+        self._timer.now = 10
+        f('a')
+        self.assertListEqual(calls, ['a', 'a'])
+
+    @parameterized.expand([
+        ('unbounded', {}),
+        ('lru', {'maxsize': 4, 'policy': 'lru'}),
+        ('lfu', {'maxsize': 4, 'policy': 'lfu'}),
+    ])
+    def test_recomputed_entry_gets_new_deadline(self, _name, kwargs):
+        calls = []
+        f = _memoize_recording(calls, ttl=10, timer=self._timer, **kwargs)
+        f('a')
+        self._timer.now = 15
+        f('a')
+        self._timer.now = 24
+        f('a')
+        self.assertListEqual(calls, ['a', 'a'])
+
+    def test_expired_entries_are_purged_when_storing(self):
+        f = caching.memoize(ttl=10, timer=self._timer)(abs)
+        for arg in range(100):
+            f(arg)
+        self._timer.now = 20
+        f(-1)
+        self.assertEqual(f.cache_info().currsize, 1)
+
+    def test_eviction_and_expiration_together(self):
+        calls = []
+        f = _memoize_recording(calls, maxsize=2, ttl=10, timer=self._timer)
+        f(1)
+        self._timer.now = 5
+        f(2)
+        f(3)  # Evicts 1.
+        self._timer.now = 12
+        f(2)  # Still fresh.
+        f(3)
+        f(1)  # Evicts 2.
+        self._timer.now = 16
+        f(3)  # Expired.
+        self.assertListEqual(calls, [1, 2, 3, 1, 3])
+
+
+class TestCacheInfoAndClear(unittest.TestCase):
+    """Tests for the cache_info and cache_clear methods."""
+
+    @parameterized.expand([
+        ('unbounded', {}),
+        ('lru', {'maxsize': 2, 'policy': 'lru'}),
+        ('lfu', {'maxsize': 2, 'policy': 'lfu'}),
+    ])
+    def test_cache_info_counts_hits_misses_and_size(self, _name, kwargs):
+        f = caching.memoize(**kwargs)(abs)
+        for arg in [1, 2, 1, 1, 2]:
+            f(arg)
+        expected = caching.CacheInfo(hits=3, misses=2,
+                                     maxsize=kwargs.get('maxsize'),
+                                     currsize=2)
+        self.assertEqual(f.cache_info(), expected)
+
+    @parameterized.expand([
+        ('unbounded', {}),
+        ('lru', {'maxsize': 2, 'policy': 'lru'}),
+        ('lfu', {'maxsize': 2, 'policy': 'lfu'}),
+        ('ttl', {'ttl': 100}),
+    ])
+    def test_cache_clear_empties_cache_and_resets_stats(self, _name, kwargs):
+        calls = []
+        f = _memoize_recording(calls, **kwargs)
+        f(1)
+        f(1)
+        f.cache_clear()
+
+        with self.subTest('info'):
+            self.assertEqual(f.cache_info(),
+                             (0, 0, kwargs.get('maxsize'), 0))
+
+        f(1)
+
+        with self.subTest('calls'):
+            self.assertListEqual(calls, [1, 1])
+
+    def test_memoize_by_has_cache_info_and_clear(self):
+        calls = []
+
+        @caching.memoize_by(str.casefold, maxsize=1)
+        def length(text):
+            calls.append(text)
+            return len(text)
+
+        length('ham')
+        length('HAM')
+        length('spam')
+        length('Ham')
+
+        with self.subTest('calls'):
+            self.assertListEqual(calls, ['ham', 'spam', 'Ham'])
+        with self.subTest('info'):
+            self.assertEqual(length.cache_info(), (1, 3, 1, 1))
+
+        length.cache_clear()
+
+        with self.subTest('cleared'):
+            self.assertEqual(length.cache_info(), (0, 0, 1, 0))
+
+    def test_separate_functions_have_separate_caches(self):
+        f = caching.memoize(maxsize=5)(abs)
+        g = caching.memoize(maxsize=5)(abs)
+        f(1)
+        f(1)
+        g(2)
+        self.assertEqual((f.cache_info().hits, g.cache_info().hits), (1, 0))
+
+
+class _HashCounter:
+    """Hashable object that counts how many times it is hashed."""
+
+    __slots__ = ('_value', 'hash_count')
+
+    def __init__(self, value):
+        """Create a counter with a value determining equality and hashing."""
+        self._value = value
+        self.hash_count = 0
+
+    def __eq__(self, other):
+        if not isinstance(other, _HashCounter):
+            return NotImplemented
+        return self._value == other._value
+
+    def __hash__(self):
+        self.hash_count += 1
+        return hash(self._value)
+
+
+_HIT_PATH_OPTIONS = [
+    ('unbounded', {}),
+    ('lru', {'maxsize': 4, 'policy': 'lru'}),
+    ('lfu', {'maxsize': 4, 'policy': 'lfu'}),
+    ('ttl', {'ttl': 1000}),
+    ('lru ttl', {'maxsize': 4, 'ttl': 1000}),
+]
+"""Options for @memoize and @memoize_by that hit-path tests are run with."""
+
+
+class TestHitPath(unittest.TestCase):
+    """Micro-benchmarks guarding the cost of calls that hit the cache."""
+
+    @parameterized.expand(_HIT_PATH_OPTIONS)
+    def test_memoize_by_calls_key_once_per_call(self, _name, kwargs):
+        key_calls = []
+
+        def key(arg):
+            key_calls.append(arg)
+            return arg
+
+        f = caching.memoize_by(key, **kwargs)(abs)
+        f(-3)  # Miss.
+
+        with self.subTest(call='miss'):
+            self.assertListEqual(key_calls, [-3])
+
+        f(-3)  # Hit.
+
+        with self.subTest(call='hit'):
+            self.assertListEqual(key_calls, [-3, -3])
+
+    @parameterized.expand([
+        ('unbounded', {}),
+        ('ttl', {'ttl': 1000}),
+    ])
+    def test_memoize_hit_hashes_once(self, _name, kwargs):
+        f = caching.memoize(**kwargs)(lambda arg: 42)
+        arg = _HashCounter('ham')
+        f(arg)
+        arg.hash_count = 0
+        f(arg)
+        self.assertEqual(arg.hash_count, 1)
+
+    @parameterized.expand([
+        ('unbounded', {}),
+        ('ttl', {'ttl': 1000}),
+    ])
+    def test_memoize_by_hit_hashes_key_once(self, _name, kwargs):
+        key = _HashCounter('ham')
+        f = caching.memoize_by(lambda _: key, **kwargs)(lambda arg: 42)
+        f('spam')
+        key.hash_count = 0
+        f('spam')
+        self.assertEqual(key.hash_count, 1)
+
+    @parameterized.expand(_HIT_PATH_OPTIONS)
+    def test_expensive_key_hit_costs_about_one_probe(self, _name, kwargs):
+        """
+        A hit with an expensive key costs about one key computation and probe.
+
+        The baseline computes the key and looks it up in a dict, which hashes
+        and compares it. If the key were computed, hashed, or compared more
+        than once, a hit would take at least about twice as long. The bound is
+        generous, so that timing noise doesn't make this test fail.
+        """
+        text = 'Hello, World! ' * 50_000
+        length = caching.memoize_by(str.casefold, **kwargs)(len)
+        length(text)
+        table = {text.casefold(): len(text)}
+
+        baseline = min(timeit.repeat(lambda: table[text.casefold()],
+                                     number=5, repeat=7))
+        hit_time = min(timeit.repeat(lambda: length(text),
+                                     number=5, repeat=7))
+
+        self.assertLess(hit_time, baseline * 1.5)
+
+
+_WAIT = 10.0
+"""Timeout, in seconds, for waits that are expected to succeed."""
+
+
+class TestThreadSafe(unittest.TestCase):
+    """Tests for memoize and memoize_by with thread_safe=True."""
+
+    def _run_threads(self, target, count):
+        """Run target on count threads at once, and wait for them."""
+        threads = [threading.Thread(target=target, daemon=True)
+                   for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(_WAIT)
+
+    def test_concurrent_callers_for_same_key_compute_once(self):
+        calls = []
+        release = threading.Event()
+        results = []
+
+        @caching.memoize(thread_safe=True)
+        def slow_square(n):
+            calls.append(n)
+            release.wait(_WAIT)
+            return n**2
+
+        def call():
+            results.append(slow_square(7))
+
+        timer = threading.Timer(0.1, release.set)
+        timer.start()
+        self._run_threads(call, 32)
+        timer.join()
+
+        with self.subTest('calls'):
+            self.assertListEqual(calls, [7])
+        with self.subTest('results'):
+            self.assertListEqual(results, [49] * 32)
+
+    def test_distinct_keys_compute_in_parallel(self):
+        """Two keys being computed at once don't block each other."""
+        barrier = threading.Barrier(2, timeout=_WAIT)
+
+        @caching.memoize_by(str.casefold, thread_safe=True)
+        def rendezvous(text):
+            barrier.wait()  # Raises BrokenBarrierError if run serially.
+            return text.upper()
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda t=text: results.append(
+                rendezvous(t)), daemon=True)
+            for text in ('ham', 'spam')
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(_WAIT)
+
+        self.assertListEqual(sorted(results), ['HAM', 'SPAM'])
+
+    def test_exception_propagates_to_waiters_and_is_not_cached(self):
+        attempts = []
+        release = threading.Event()
+        errors = []
+
+        @caching.memoize(thread_safe=True)
+        def flaky(n):
+            attempts.append(n)
+            release.wait(_WAIT)
+            if len(attempts) == 1:
+                raise ValueError('first attempt fails')
+            return n
+
+        def call():
+            try:
+                flaky(3)
+            except ValueError as error:
+                errors.append(error)
+
+        timer = threading.Timer(0.1, release.set)
+        timer.start()
+        self._run_threads(call, 8)
+        timer.join()
+
+        with self.subTest('all callers got the error'):
+            self.assertEqual(len(errors), 8)
+        with self.subTest('computed once'):
+            self.assertListEqual(attempts, [3])
+        with self.subTest('retried after error'):
+            self.assertEqual(flaky(3), 3)
+        with self.subTest('then cached'):
+            flaky(3)
+            self.assertListEqual(attempts, [3, 3])
+
+    def test_same_key_reentry_raises_runtime_error(self):
+        @caching.memoize(thread_safe=True)
+        def f(n):
+            return f(n)
+
+        with self.assertRaises(RuntimeError):
+            f(1)
+
+    def test_recursion_with_other_keys_works(self):
+        @caching.memoize(thread_safe=True)
+        def fib(n):
+            return n if n < 2 else fib(n - 1) + fib(n - 2)
+
+        self.assertEqual(fib(90), 2880067194370816120)
+
+    def test_bounded_cache_stays_consistent_under_contention(self):
+        f = caching.memoize(maxsize=16, policy='lfu', thread_safe=True)(abs)
+
+        def call():
+            for arg in range(-200, 200):
+                f(arg % 37)
+
+        self._run_threads(call, 8)
+        info = f.cache_info()
+
+        with self.subTest('calls'):
+            self.assertEqual(info.hits + info.misses, 8 * 400)
+        with self.subTest('size'):
+            self.assertEqual(info.currsize, 16)
+
+    def test_cache_clear(self):
+        f = caching.memoize_by(str.casefold, thread_safe=True)(len)
+        f('ham')
+        f('HAM')
+        f.cache_clear()
+        self.assertEqual(f.cache_info(), (0, 0, None, 0))
+
+
+def _cube_with_store(path, n):
+    """
+    Memoize a cube function in a SqliteStore at path, and call it on n.
+
+    Return the result and whether it was a cache hit.
+    """
+    store = caching.SqliteStore(path)
+
+    @caching.memoize_by(lambda k: k, store=store, namespace='cube')
+    def cube(k):
+        return k**3
+
+    try:
+        return cube(n), cube.cache_info().hits == 1
+    finally:
+        store.close()
+
+
+class TestSqliteStore(unittest.TestCase):
+    """Tests for memoizing to disk with SqliteStore."""
+
+    def setUp(self):
+        """Make a temporary directory for database files."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._tmp.name, 'cache.sqlite3')
+        self._stores = []
+
+    def tearDown(self):
+        """Close this thread's connections and remove database files."""
+        for store in self._stores:
+            store.close()
+        self._tmp.cleanup()
+
+    def _store(self, **kwargs):
+        """Open a SqliteStore on the test database."""
+        store = caching.SqliteStore(self._path, **kwargs)
+        self._stores.append(store)
+        return store
+
+    def _recorder(self, store, calls, name='f'):
+        """Make a function with a given name, memoized in store."""
+        def f(arg):
+            calls.append(arg)
+            return [arg] * 3
+
+        return caching.memoize_by(str.casefold, store=store, namespace=name)(f)
+
+    def test_caches_values(self):
+        calls = []
+        f = self._recorder(self._store(), calls)
+        results = [f('ham'), f('HAM'), f('spam')]
+
+        with self.subTest('results'):
+            self.assertListEqual(results, [['ham'] * 3, ['ham'] * 3,
+                                           ['spam'] * 3])
+        with self.subTest('calls'):
+            self.assertListEqual(calls, ['ham', 'spam'])
+        with self.subTest('info'):
+            self.assertEqual(f.cache_info(), (1, 2, None, 2))
+
+    def test_values_persist_to_new_store(self):
+        first_calls = []
+        self._recorder(self._store(), first_calls)('ham')
+        second_calls = []
+        f = self._recorder(self._store(), second_calls)
+        result = f('Ham')
+
+        with self.subTest('result'):
+            self.assertListEqual(result, ['ham'] * 3)
+        with self.subTest('calls'):
+            self.assertListEqual(second_calls, [])
+
+    def test_functions_have_separate_entries(self):
+        store = self._store()
+        calls = []
+        f = self._recorder(store, calls, name='f')
+        g = self._recorder(store, calls, name='g')
+        f('ham')
+        g('ham')
+        self.assertListEqual(calls, ['ham', 'ham'])
+
+    def test_cache_clear_removes_only_own_entries(self):
+        store = self._store()
+        calls = []
+        f = self._recorder(store, calls, name='f')
+        g = self._recorder(store, calls, name='g')
+        f('ham')
+        g('spam')
+        f.cache_clear()
+
+        with self.subTest('cleared'):
+            self.assertEqual(f.cache_info().currsize, 0)
+        with self.subTest('kept'):
+            self.assertEqual(g.cache_info().currsize, 1)
+
+        f('ham')
+        g('spam')
+
+        with self.subTest('calls'):
+            self.assertListEqual(calls, ['ham', 'spam', 'ham'])
+
+    def test_serializer_is_configurable(self):
+        calls = []
+        f = self._recorder(self._store(serializer=json), calls)
+        f('ham')
+        self.assertListEqual(f('ham'), ['ham'] * 3)
+
+    def test_evicts_least_recently_used_beyond_max_bytes(self):
+        store = self._store(serializer=json, max_bytes=20)
+        calls = []
+        f = self._recorder(store, calls)
+        f('a')  # Each value is '["x", "x", "x"]', which is 15 bytes.
+        f('b')  # Evicts 'a'.
+        f('b')
+        f('a')  # Evicts 'b'.
+
+        with self.subTest('calls'):
+            self.assertListEqual(calls, ['a', 'b', 'a'])
+        with self.subTest('total'):
+            self.assertEqual(store.total_bytes(), 15)
+
+    def test_value_bigger_than_max_bytes_is_not_kept(self):
+        store = self._store(serializer=json, max_bytes=10)
+        calls = []
+        f = self._recorder(store, calls)
+        f('a')
+        f('a')
+
+        with self.subTest('calls'):
+            self.assertListEqual(calls, ['a', 'a'])
+        with self.subTest('total'):
+            self.assertEqual(store.total_bytes(), 0)
+
+    def test_value_bigger_than_max_bytes_evicts_nothing(self):
+        store = self._store(serializer=json, max_bytes=20)
+        calls = []
+        f = self._recorder(store, calls)
+        f('a')  # '["a", "a", "a"]' is 15 bytes, so it fits.
+        f('too long to fit')
+        f('a')
+
+        with self.subTest('calls'):
+            self.assertListEqual(calls, ['a', 'too long to fit'])
+        with self.subTest('total'):
+            self.assertEqual(store.total_bytes(), 15)
+
+    @parameterized.expand([
+        ('maxsize', {'maxsize': 10}),
+        ('ttl', {'ttl': 10}),
+    ])
+    def test_incompatible_option_raises_value_error(self, _name, kwargs):
+        with self.assertRaises(ValueError):
+            caching.memoize_by(str, store=self._store(), **kwargs)(len)
+
+    def test_closures_from_one_factory_with_own_namespaces_are_apart(self):
+        store = self._store()
+
+        def make(n):
+            @caching.memoize_by(int, store=store, namespace=f'add {n}')
+            def add(x):
+                return x + n
+            return add
+
+        self.assertListEqual([make(1)(5), make(100)(5)], [6, 105])
+
+    def test_local_function_without_namespace_raises_value_error(self):
+        def local(x):
+            return x
+
+        with self.assertRaises(ValueError):
+            caching.memoize_by(int, store=self._store())(local)
+
+    def test_lambda_without_namespace_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            caching.memoize_by(int, store=self._store())(lambda x: x)
+
+    def test_namespace_without_store_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            caching.memoize_by(str, namespace='f')
+
+    @parameterized.expand([
+        ('unbounded', None),
+        ('recently accessed', 1000),
+    ])
+    def test_hit_does_not_wait_for_writer(self, _name, max_bytes):
+        store = self._store(max_bytes=max_bytes, timeout=0.1)
+        calls = []
+        f = self._recorder(store, calls)
+        f('ham')
+
+        writer = sqlite3.connect(self._path, isolation_level=None)
+        writer.execute('BEGIN IMMEDIATE')
+        try:
+            result = f('ham')
+        finally:
+            writer.execute('ROLLBACK')
+            writer.close()
+
+        with self.subTest('result'):
+            self.assertListEqual(result, ['ham'] * 3)
+        with self.subTest('calls'):
+            self.assertListEqual(calls, ['ham'])
+
+    def test_set_keys_hit_across_hash_seeds(self):
+        """A key with frozensets is found by a process with another seed."""
+        script = (
+            'import sys\n'
+            'from palgoviz import caching\n'
+            'store = caching.SqliteStore(sys.argv[1])\n'
+            '@caching.memoize_by(lambda words: (frozenset(words), 1),\n'
+            '                    store=store, namespace="count")\n'
+            'def count(words):\n'
+            '    return len(words)\n'
+            'count(["alpha", "beta", "gamma", "delta"])\n'
+            'print(count.cache_info().hits)\n'
+        )
+        root = os.path.dirname(os.path.dirname(caching.__file__))
+
+        hits = []
+        for seed in '1', '2':
+            env = dict(os.environ, PYTHONHASHSEED=seed, PYTHONPATH=root)
+            result = subprocess.run([sys.executable, '-c', script, self._path],
+                                    env=env, capture_output=True, text=True,
+                                    check=True, timeout=_WAIT)
+            hits.append(int(result.stdout))
+
+        self.assertListEqual(hits, [0, 1])
+
+    def test_negative_max_bytes_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            caching.SqliteStore(self._path, max_bytes=-1)
+
+    def test_threads_share_store(self):
+        store = self._store()
+
+        @caching.memoize_by(lambda n: n, store=store, namespace='square',
+                            thread_safe=True)
+        def square(n):
+            return n**2
+
+        def call():
+            try:
+                for n in range(50):
+                    square(n)
+            finally:
+                store.close()
+
+        threads = [threading.Thread(target=call) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(_WAIT)
+
+        self.assertEqual(square.cache_info().currsize, 50)
+
+    def test_processes_share_store_and_write_concurrently(self):
+        self._store()  # Create the database before the processes start.
+        args = [n % 40 for n in range(200)]
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(_cube_with_store,
+                                    [self._path] * len(args), args))
+
+        with self.subTest('results'):
+            self.assertListEqual([value for value, _ in results],
+                                 [n**3 for n in args])
+
+        with self.subTest('all stored'):
+            hits = [_cube_with_store(self._path, n)[1] for n in range(40)]
+            self.assertListEqual(hits, [True] * 40)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1085,9 +1085,10 @@ class TestAsCloseableIterator(unittest.TestCase):
 @parameterized_class(('implementation_name',), [
     ('count_tree_nodes',),
     ('count_tree_nodes_alt',),
+    ('count_tree_nodes_iterative',),
 ])
 class TestCountTreeNodes(_NamedImplementationTestCase):
-    """Tests for the count_tree_nodes and count_tree_nodes_alt functions."""
+    """Tests for the count_tree_nodes* functions (not the instrumented one)."""
 
     def test_str_has_one_node(self):
         """Strings (like other non-tuple iterables) are taken as leaves."""
@@ -1139,6 +1140,20 @@ class TestCountTreeNodes(_NamedImplementationTestCase):
         self.assertEqual(result, expected)
 
 
+class TestCountTreeNodesIterative(unittest.TestCase):
+    """Tests specific to the count_tree_nodes_iterative function."""
+
+    def test_very_deep_tuple_is_counted_without_recursion_error(self):
+        root = recursion.make_deep_tuple(50_000)
+        result = functions.count_tree_nodes_iterative(root)
+        self.assertEqual(result, 50_001)
+
+    def test_shared_subtrees_are_counted_each_time_reached(self):
+        shared = (1, 2)
+        result = functions.count_tree_nodes_iterative((shared, shared))
+        self.assertEqual(result, 7)
+
+
 class _StdoutCapturingTestCase(unittest.TestCase):
     """Test fixture mixin that redirects standard output."""
 
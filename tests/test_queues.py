@@ -16,7 +16,12 @@
 """Tests for queues.py."""
 
 from abc import ABC, abstractmethod
+import collections
+import copy
+import functools
 import inspect
+import operator
+import random
 import unittest
 
 from parameterized import parameterized
@@ -29,6 +34,40 @@ def _unannotated_argspec(func):
     return inspect.getfullargspec(func)[:6]
 
 
+def _check_random_operations(test, queue, *, pop, peek):
+    """
+    Check a FIFO or LIFO queue against a deque, on random mixed operations.
+
+    The deque is popped with pop and peeked with peek. This is for checking
+    queues whose internal structure makes some sizes or sequences of
+    operations special, such as queues that store items in chunks.
+    """
+    rng = random.Random(9142)
+    expected = collections.deque()
+
+    for step in range(2000):
+        action = rng.randrange(5)
+        with test.subTest(step=step, action=action, size=len(expected)):
+            if action == 0:
+                queue.enqueue(step)
+                expected.append(step)
+            elif action == 1:
+                items = range(step, step + rng.randrange(12))
+                queue.enqueue_many(items)
+                expected.extend(items)
+            elif action == 2 and expected:
+                test.assertEqual(queue.dequeue(), pop(expected))
+            elif action == 3:
+                count = rng.randrange(len(expected) + 1)
+                actual = queue.dequeue_many(count)
+                test.assertListEqual(actual,
+                                     [pop(expected) for _ in range(count)])
+            elif expected:
+                test.assertEqual(queue.peek(), peek(expected))
+
+            test.assertEqual(len(queue), len(expected))
+
+
 class _Bases:
     """Base classes for tests for queues module."""
 
@@ -84,6 +123,18 @@ class _Bases:
             actual = _unannotated_argspec(self.queue_type.peek)
             self.assertTupleEqual(actual, expected)
 
+        def test_enqueue_many_method_has_items_parameter_and_no_extras(self):
+            """The enqueue_many method accepts only an items argument."""
+            expected = (['self', 'items'], None, None, None, [], None)
+            actual = _unannotated_argspec(self.queue_type.enqueue_many)
+            self.assertTupleEqual(actual, expected)
+
+        def test_dequeue_many_method_has_count_parameter_and_no_extras(self):
+            """The dequeue_many method accepts only a count argument."""
+            expected = (['self', 'count'], None, None, None, [], None)
+            actual = _unannotated_argspec(self.queue_type.dequeue_many)
+            self.assertTupleEqual(actual, expected)
+
     class TestSubclasses(_QueueTestCase):
         """Tests for leaf and non-leaf subclasses of Queue."""
 
@@ -267,6 +318,59 @@ class _Bases:
 
             self.assertListEqual(sorted(out_items), sorted(in_items))
 
+        def test_length_after_enqueue_many(self):
+            """Enqueuing several items at once adds them all."""
+            queue = self.queue_type()
+            queue.enqueue('ham')
+            queue.enqueue_many(iter(['spam', 'eggs', 'foo']))
+            self.assertEqual(len(queue), 4)
+
+        def test_enqueue_many_of_nothing_leaves_queue_empty(self):
+            queue = self.queue_type()
+            queue.enqueue_many([])
+            self.assertFalse(queue)
+
+        def test_length_after_dequeue_many(self):
+            """Dequeuing several items at once removes exactly that many."""
+            queue = self.queue_type()
+            queue.enqueue_many(['ham', 'spam', 'eggs', 'foo'])
+            queue.dequeue_many(3)
+            self.assertEqual(len(queue), 1)
+
+        def test_dequeue_many_of_all_items_makes_queue_falsy(self):
+            queue = self.queue_type()
+            queue.enqueue_many(['ham', 'spam', 'eggs'])
+            queue.dequeue_many(3)
+            self.assertFalse(queue)
+
+        def test_dequeue_many_of_zero_items_gives_empty_list(self):
+            queue = self.queue_type()
+            queue.enqueue('ham')
+            result = queue.dequeue_many(0)
+            self.assertListEqual(result, [])
+
+        def test_cannot_dequeue_many_more_than_length(self):
+            """
+            Trying to dequeue_many more items than present raises LookupError.
+
+            No items are dequeued.
+            """
+            queue = self.queue_type()
+            queue.enqueue_many(['ham', 'spam'])
+
+            with self.subTest('raises'):
+                with self.assertRaises(LookupError):
+                    queue.dequeue_many(3)
+
+            with self.subTest('unchanged'):
+                self.assertEqual(len(queue), 2)
+
+        def test_cannot_dequeue_many_negative_count(self):
+            queue = self.queue_type()
+            queue.enqueue('ham')
+            with self.assertRaises(ValueError):
+                queue.dequeue_many(-1)
+
         def test_cannot_create_new_attributes(self):
             """Assigning to a nonexistent attribute raises AttributeError."""
             queue = self.queue_type()
@@ -420,6 +524,37 @@ class _Bases:
 
             self.assertListEqual(out_items, expected_out_items)
 
+        def test_bulk_operations_interleave_in_fifo_order(self):
+            """enqueue_many and dequeue_many mix with single operations."""
+            fifo = self.queue_type()
+            fifo.enqueue(10)
+            fifo.enqueue_many([20, 30, 40])
+
+            with self.subTest(size=len(fifo), dequeue_many=1):
+                items = fifo.dequeue_many(2)
+                self.assertListEqual(items, [10, 20])
+
+            fifo.enqueue_many(iter([50, 60]))
+            fifo.enqueue(70)
+
+            with self.subTest(size=len(fifo), dequeue=1):
+                item = fifo.dequeue()
+                self.assertEqual(item, 30)
+
+            with self.subTest(size=len(fifo), dequeue_many=2):
+                items = fifo.dequeue_many(3)
+                self.assertListEqual(items, [40, 50, 60])
+
+            with self.subTest(size=len(fifo), peek=1):
+                item = fifo.peek()
+                self.assertEqual(item, 70)
+
+            fifo.enqueue_many(range(80, 110, 10))
+
+            with self.subTest(size=len(fifo), dequeue_many=3):
+                items = fifo.dequeue_many(4)
+                self.assertListEqual(items, [70, 80, 90, 100])
+
     class TestLifos(_QueueTestCase):
         """Tests for concrete LIFO queue (stack) behavior."""
 
@@ -567,6 +702,37 @@ class _Bases:
 
             self.assertListEqual(out_items, expected_out_items)
 
+        def test_bulk_operations_interleave_in_lifo_order(self):
+            """enqueue_many and dequeue_many mix with single operations."""
+            lifo = self.queue_type()
+            lifo.enqueue(10)
+            lifo.enqueue_many([20, 30, 40])
+
+            with self.subTest(size=len(lifo), dequeue_many=1):
+                items = lifo.dequeue_many(2)
+                self.assertListEqual(items, [40, 30])
+
+            lifo.enqueue_many(iter([50, 60]))
+            lifo.enqueue(70)
+
+            with self.subTest(size=len(lifo), dequeue=1):
+                item = lifo.dequeue()
+                self.assertEqual(item, 70)
+
+            with self.subTest(size=len(lifo), dequeue_many=2):
+                items = lifo.dequeue_many(3)
+                self.assertListEqual(items, [60, 50, 20])
+
+            with self.subTest(size=len(lifo), peek=1):
+                item = lifo.peek()
+                self.assertEqual(item, 10)
+
+            lifo.enqueue_many(range(80, 110, 10))
+
+            with self.subTest(size=len(lifo), dequeue_many=3):
+                items = lifo.dequeue_many(4)
+                self.assertListEqual(items, [100, 90, 80, 10])
+
     class TestPriorityQueues(_QueueTestCase):
         """
         Tests for concrete priority queues.
@@ -781,6 +947,77 @@ class _Bases:
 
             self.assertListEqual(out_items, expected_out_items)
 
+        @parameterized.expand([
+            ('distinct 12',
+             [5, 6, 1, 10, 2, 9, 3, 8, 4, 7, 12, 11],
+             [12, 11, 10, 9, 8, 7, 6, 5, 4, 3, 2, 1]),
+            ('some dupes',
+             ['foo', 'bar', 'bar', 'baz', 'foo', 'bar'],
+             ['foo', 'foo', 'baz', 'bar', 'bar', 'bar']),
+            ('many',
+             [n * 37 % 101 for n in range(101)],
+             list(range(100, -1, -1))),
+        ])
+        def test_enqueue_many_then_dequeue_many_descending_order(
+                self, _label, in_items, expected_out_items):
+            """Items enqueued in bulk dequeue in bulk in descending order."""
+            # Ensure error (not mere failure) if the test is itself wrong.
+            if expected_out_items != sorted(in_items, reverse=True):
+                raise Exception('bad test: expected should reverse input')
+
+            pq = self.queue_type()
+            pq.enqueue_many(iter(in_items))
+            out_items = pq.dequeue_many(len(in_items))
+            self.assertListEqual(out_items, expected_out_items)
+
+        def test_bulk_operations_interleave_in_priority_order(self):
+            """enqueue_many and dequeue_many mix with single operations."""
+            pq = self.queue_type()
+            pq.enqueue(30)
+            pq.enqueue_many([10, 40, 20])
+
+            with self.subTest(size=len(pq), dequeue_many=1):
+                items = pq.dequeue_many(2)
+                self.assertListEqual(items, [40, 30])
+
+            pq.enqueue_many(iter([50, 5]))
+            pq.enqueue(15)
+
+            with self.subTest(size=len(pq), dequeue=1):
+                item = pq.dequeue()
+                self.assertEqual(item, 50)
+
+            with self.subTest(size=len(pq), dequeue_many=2):
+                items = pq.dequeue_many(3)
+                self.assertListEqual(items, [20, 15, 10])
+
+            with self.subTest(size=len(pq), peek=1):
+                item = pq.peek()
+                self.assertEqual(item, 5)
+
+        def test_enqueue_many_raising_partway_keeps_priority_order(self):
+            """An error while iterating items doesn't corrupt the queue."""
+            def generate():
+                yield 100
+                yield 200
+                raise ValueError('stop')
+
+            pq = self.queue_type()
+            pq.enqueue_many([5, 3, 1])
+
+            with self.assertRaises(ValueError):
+                pq.enqueue_many(generate())
+
+            out_items = []
+            while pq:
+                out_items.append(pq.dequeue())
+
+            with self.subTest(check='order'):
+                self.assertListEqual(out_items,
+                                     sorted(out_items, reverse=True))
+            with self.subTest(check='old items kept'):
+                self.assertListEqual(out_items[-3:], [5, 3, 1])
+
         def test_ordering_can_be_weak_Patient(self):
             """
             Priority queue elements do not have to be totally ordered.
@@ -956,6 +1193,43 @@ class TestSinglyLinkedListFifoQueue(_Bases.TestSignatures,
         return queues.SinglyLinkedListFifoQueue
 
 
+class TestUnrolledLinkedListFifoQueue(_Bases.TestSignatures,
+                                      _Bases.TestSubclasses,
+                                      _Bases.TestConcrete,
+                                      _Bases.TestFifos):
+    """Tests for UnrolledLinkedListFifoQueue class."""
+
+    @property
+    def queue_type(self):
+        return queues.UnrolledLinkedListFifoQueue
+
+    @parameterized.expand([('zero', 0), ('negative', -1)])
+    def test_nonpositive_chunk_size_raises_value_error(self, _name, size):
+        with self.assertRaises(ValueError):
+            self.queue_type(chunk_size=size)
+
+
+class TestTinyChunkUnrolledLinkedListFifoQueue(_Bases.TestConcrete,
+                                               _Bases.TestFifos):
+    """Tests for UnrolledLinkedListFifoQueue, crossing chunks often."""
+
+    @property
+    def queue_type(self):
+        return functools.partial(queues.UnrolledLinkedListFifoQueue,
+                                 chunk_size=2)
+
+    def test_is_fifo_queue(self):
+        """This overrides the test, since queue_type is not a class here."""
+        self.assertIsInstance(self.queue_type(), queues.FifoQueue)
+
+    @parameterized.expand([(size,) for size in (1, 2, 3, 7)])
+    def test_random_operations_match_deque(self, chunk_size):
+        """Mixed operations give the same results as a collections.deque."""
+        fifo = queues.UnrolledLinkedListFifoQueue(chunk_size=chunk_size)
+        _check_random_operations(self, fifo, pop=collections.deque.popleft,
+                                 peek=operator.itemgetter(0))
+
+
 class TestListLifoQueue(_Bases.TestSignatures,
                         _Bases.TestSubclasses,
                         _Bases.TestConcrete,
@@ -1000,6 +1274,43 @@ class TestSinglyLinkedListLifoQueue(_Bases.TestSignatures,
         return queues.SinglyLinkedListLifoQueue
 
 
+class TestUnrolledLinkedListLifoQueue(_Bases.TestSignatures,
+                                      _Bases.TestSubclasses,
+                                      _Bases.TestConcrete,
+                                      _Bases.TestLifos):
+    """Tests for UnrolledLinkedListLifoQueue class."""
+
+    @property
+    def queue_type(self):
+        return queues.UnrolledLinkedListLifoQueue
+
+    @parameterized.expand([('zero', 0), ('negative', -1)])
+    def test_nonpositive_chunk_size_raises_value_error(self, _name, size):
+        with self.assertRaises(ValueError):
+            self.queue_type(chunk_size=size)
+
+
+class TestTinyChunkUnrolledLinkedListLifoQueue(_Bases.TestConcrete,
+                                               _Bases.TestLifos):
+    """Tests for UnrolledLinkedListLifoQueue, crossing chunks often."""
+
+    @property
+    def queue_type(self):
+        return functools.partial(queues.UnrolledLinkedListLifoQueue,
+                                 chunk_size=2)
+
+    def test_is_lifo_queue(self):
+        """This overrides the test, since queue_type is not a class here."""
+        self.assertIsInstance(self.queue_type(), queues.LifoQueue)
+
+    @parameterized.expand([(size,) for size in (1, 2, 3, 7)])
+    def test_random_operations_match_deque(self, chunk_size):
+        """Mixed operations give the same results as a collections.deque."""
+        lifo = queues.UnrolledLinkedListLifoQueue(chunk_size=chunk_size)
+        _check_random_operations(self, lifo, pop=collections.deque.pop,
+                                 peek=operator.itemgetter(-1))
+
+
 class TestFastEnqueueMaxPriorityQueue(_Bases.TestSignatures,
                                       _Bases.TestSubclasses,
                                       _Bases.TestConcrete,
@@ -1022,5 +1333,207 @@ class TestFastDequeueMaxPriorityQueue(_Bases.TestSignatures,
         return queues.FastDequeueMaxPriorityQueue
 
 
+class TestBinaryHeapMaxPriorityQueue(_Bases.TestSignatures,
+                                     _Bases.TestSubclasses,
+                                     _Bases.TestConcrete,
+                                     _Bases.TestPriorityQueues):
+    """Tests for BinaryHeapMaxPriorityQueue class."""
+
+    @property
+    def queue_type(self):
+        return queues.BinaryHeapMaxPriorityQueue
+
+    @parameterized.expand([
+        ('distinct 12', [5, 6, 1, 10, 2, 9, 3, 8, 4, 7, 12, 11]),
+        ('some dupes', ['foo', 'bar', 'bar', 'baz', 'foo', 'bar']),
+        ('ascending', range(100)),
+        ('descending', range(100, 0, -1)),
+    ])
+    def test_construction_from_iterable_dequeues_descending(self, _label,
+                                                            in_items):
+        """A queue heapified from an iterable dequeues in descending order."""
+        pq = self.queue_type(iter(in_items))
+
+        out_items = []
+        while pq:
+            out_items.append(pq.dequeue())
+
+        self.assertListEqual(out_items, sorted(in_items, reverse=True))
+
+    def test_construction_from_iterable_has_its_length(self):
+        pq = self.queue_type([30, 10, 20])
+        self.assertEqual(len(pq), 3)
+
+    def test_construction_from_iterable_peeks_max(self):
+        pq = self.queue_type([30, 10, 50, 20, 40])
+        self.assertEqual(pq.peek(), 50)
+
+    def test_construction_from_iterable_can_then_enqueue(self):
+        pq = self.queue_type([30, 10, 20])
+        pq.enqueue(25)
+        pq.enqueue(5)
+        out_items = [pq.dequeue() for _ in range(5)]
+        self.assertListEqual(out_items, [30, 25, 20, 10, 5])
+
+
+class _IdKeyedMaxPriorityQueue(queues.IndexedMaxPriorityQueue):
+    """
+    IndexedMaxPriorityQueue tracking items by identity. For testing.
+
+    This lets the TestConcrete tests, some of which enqueue unhashable items,
+    run on IndexedMaxPriorityQueue.
+    """
+
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__(key=id)
+
+
+class TestIndexedMaxPriorityQueue(_Bases.TestSignatures,
+                                  _Bases.TestSubclasses,
+                                  _Bases.TestPriorityQueues):
+    """Tests for IndexedMaxPriorityQueue class, with its default key."""
+
+    @property
+    def queue_type(self):
+        return queues.IndexedMaxPriorityQueue
+
+
+class TestIndexedMaxPriorityQueueRelocation(unittest.TestCase):
+    """Tests for reprioritizing and removing IndexedMaxPriorityQueue items."""
+
+    def setUp(self):
+        """Create patients with distinct priorities, and a queue of them."""
+        self._patients = [compare.Patient(initials, priority)
+                          for initials, priority in [('AB', 10), ('CD', 50),
+                                                     ('EF', 30), ('GH', 20),
+                                                     ('IJ', 40)]]
+        self._pq = queues.IndexedMaxPriorityQueue()
+        for patient in self._patients:
+            self._pq.enqueue(patient)
+
+    def _drain_initials(self):
+        """Dequeue all patients from the queue. Return their initials."""
+        initials = []
+        while self._pq:
+            initials.append(self._pq.dequeue().initials)
+        return initials
+
+    def test_contains_enqueued_item(self):
+        self.assertIn(self._patients[2], self._pq)
+
+    def test_does_not_contain_dequeued_item(self):
+        patient = self._pq.dequeue()
+        self.assertNotIn(patient, self._pq)
+
+    def test_raising_priority_dequeues_item_earlier(self):
+        self._pq.update_priority(self._patients[0], 45)
+        self.assertListEqual(self._drain_initials(),
+                             ['CD', 'AB', 'IJ', 'EF', 'GH'])
+
+    def test_lowering_priority_dequeues_item_later(self):
+        self._pq.update_priority(self._patients[1], 15)
+        self.assertListEqual(self._drain_initials(),
+                             ['IJ', 'EF', 'GH', 'CD', 'AB'])
+
+    def test_update_priority_sets_priority_attribute(self):
+        self._pq.update_priority(self._patients[3], 99)
+        self.assertEqual(self._patients[3].priority, 99)
+
+    def test_update_priority_after_in_place_change_restores_order(self):
+        self._patients[4].priority = 5
+        self._pq.update_priority(self._patients[4], 5)
+        self.assertListEqual(self._drain_initials(),
+                             ['CD', 'EF', 'GH', 'AB', 'IJ'])
+
+    def test_update_priority_of_absent_item_raises_key_error(self):
+        with self.assertRaises(KeyError):
+            self._pq.update_priority(compare.Patient('KL', 60), 70)
+
+    def test_remove_takes_item_out(self):
+        self._pq.remove(self._patients[2])
+        self.assertListEqual(self._drain_initials(), ['CD', 'IJ', 'GH', 'AB'])
+
+    def test_remove_decreases_length(self):
+        self._pq.remove(self._patients[2])
+        self.assertEqual(len(self._pq), 4)
+
+    def test_remove_max_changes_peek(self):
+        self._pq.remove(self._patients[1])
+        self.assertIs(self._pq.peek(), self._patients[4])
+
+    def test_remove_finds_item_by_key_not_identity(self):
+        self._pq.remove(copy.copy(self._patients[2]))
+        self.assertNotIn(self._patients[2], self._pq)
+
+    def test_remove_of_absent_item_raises_key_error(self):
+        with self.assertRaises(KeyError):
+            self._pq.remove(compare.Patient('KL', 60))
+
+    def test_remove_of_duplicated_item_removes_one(self):
+        pq = queues.IndexedMaxPriorityQueue()
+        for item in [3, 1, 3, 2]:
+            pq.enqueue(item)
+        pq.remove(3)
+        out_items = [pq.dequeue() for _ in range(len(pq))]
+        self.assertListEqual(out_items, [3, 2, 1])
+
+    def test_set_priority_updates_items_without_priority_attribute(self):
+        def set_priority(task, priority):
+            task[0] = priority
+
+        pq = queues.IndexedMaxPriorityQueue(key=operator.itemgetter(1),
+                                            set_priority=set_priority)
+        tasks = [[10, 'a'], [50, 'b'], [30, 'c']]
+        for task in tasks:
+            pq.enqueue(task)
+        pq.update_priority([None, 'a'], 99)
+
+        with self.subTest('set'):
+            self.assertListEqual(tasks[0], [99, 'a'])
+        with self.subTest('order'):
+            out_items = [pq.dequeue()[1] for _ in range(len(pq))]
+            self.assertListEqual(out_items, ['a', 'b', 'c'])
+
+    def test_failed_update_leaves_queue_in_order(self):
+        pq = queues.IndexedMaxPriorityQueue()
+        for item in [10, 50, 30]:
+            pq.enqueue(item)
+
+        with self.assertRaises(AttributeError):
+            pq.update_priority(30, 99)
+
+        out_items = [pq.dequeue() for _ in range(len(pq))]
+        self.assertListEqual(out_items, [50, 30, 10])
+
+    def test_many_updates_and_removals_keep_heap_order(self):
+        pq = queues.IndexedMaxPriorityQueue(key=operator.attrgetter('mrn'))
+        patients = [compare.Patient(f'P{n}', n * 7919 % 1000)
+                    for n in range(200)]
+        for patient in patients:
+            pq.enqueue(patient)
+        for patient in patients[::3]:
+            pq.update_priority(patient, patient.priority * 37 % 1000)
+        for patient in patients[1::5]:
+            pq.remove(patient)
+
+        expected = sorted((p.priority for i, p in enumerate(patients)
+                           if i % 5 != 1), reverse=True)
+        actual = [pq.dequeue().priority for _ in range(len(pq))]
+        self.assertListEqual(actual, expected)
+
+
+class TestIdKeyedIndexedMaxPriorityQueue(_Bases.TestSignatures,
+                                         _Bases.TestSubclasses,
+                                         _Bases.TestConcrete,
+                                         _Bases.TestPriorityQueues):
+    """Tests for IndexedMaxPriorityQueue class, with key=id."""
+
+    @property
+    def queue_type(self):
+        return _IdKeyedMaxPriorityQueue
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -16,21 +16,43 @@
 """Tests for some of the functions in recursion.py."""
 
 from abc import ABC, abstractmethod
+import array
 import bisect
+import os
+import random
+import tempfile
 import unittest
 
+import numpy
 from parameterized import parameterized, parameterized_class
 
 from palgoviz.compare import OrderIndistinct, Patient, WeakDiamond
 from palgoviz.recursion import (
+    binary_insertion_sort,
+    binary_search,
+    binary_search_good,
+    binary_search_many,
+    external_merge_sort,
+    flatten,
+    flatten_observed,
+    fold,
+    insertion_sort,
     insort_left_linear,
     insort_right_linear,
+    leaf_sum,
+    make_deep_tuple,
     merge_sort,
+    merge_sort_adaptive,
     merge_sort_bottom_up,
     merge_sort_bottom_up_unstable,
+    merge_sort_buffered,
+    merge_sort_parallel,
+    merge_k,
     merge_two,
     merge_two_alt,
+    merge_two_galloping,
     merge_two_slow,
+    walk,
 )
 
 _NORTH = WeakDiamond.NORTH
@@ -263,6 +285,7 @@ del TestInsortAbstract, TestInsortLeftAbstract, TestInsortRightAbstract
     (merge_two_slow.__name__, staticmethod(merge_two_slow)),
     (merge_two.__name__, staticmethod(merge_two)),
     (merge_two_alt.__name__, staticmethod(merge_two_alt)),
+    (merge_two_galloping.__name__, staticmethod(merge_two_galloping)),
 ])
 class TestTwoWayMergers(unittest.TestCase):
     """Tests for the two way merge functions."""
@@ -338,6 +361,18 @@ class TestTwoWayMergers(unittest.TestCase):
         result = self.function(lhs, rhs)
         self.assertListEqual(result, expected)
 
+    def test_long_blocks_that_do_not_interleave_merge(self):
+        lhs = list(range(0, 100)) + list(range(200, 300))
+        rhs = list(range(100, 200)) + list(range(300, 400))
+        result = self.function(lhs, rhs)
+        self.assertListEqual(result, list(range(400)))
+
+    def test_is_a_stable_merge_with_long_runs_of_equal_items(self):
+        lhs = [OrderIndistinct(x) for x in range(50)]
+        rhs = [OrderIndistinct(x) for x in range(50, 100)]
+        result = self.function(lhs, rhs)
+        self.assertListEqual(result, lhs + rhs)
+
 
 _SORT_PARAMS = [
     (merge_sort.__name__,
@@ -346,6 +381,8 @@ _SORT_PARAMS = [
         staticmethod(merge_sort_bottom_up_unstable)),
     (merge_sort_bottom_up.__name__,
         staticmethod(merge_sort_bottom_up)),
+    (merge_sort_adaptive.__name__,
+        staticmethod(merge_sort_adaptive)),
 ]
 
 _MERGE_PARAMS = [
@@ -353,6 +390,7 @@ _MERGE_PARAMS = [
     (merge_two_slow.__name__, dict(merge=merge_two_slow)),
     (merge_two.__name__, dict(merge=merge_two)),
     (merge_two_alt.__name__, dict(merge=merge_two_alt)),
+    (merge_two_galloping.__name__, dict(merge=merge_two_galloping)),
 ]
 
 _COMBINED_PARAMS = [(f'{sort_name}_{merge_name}', sort, kwargs)
@@ -408,6 +446,8 @@ _STABLE_SORT_PARAMS = [
         staticmethod(merge_sort)),
     (merge_sort_bottom_up.__name__,
         staticmethod(merge_sort_bottom_up)),
+    (merge_sort_adaptive.__name__,
+        staticmethod(merge_sort_adaptive)),
 ]
 
 _STABLE_COMBINED_PARAMS = [(f'{sort_name}_{merge_name}', sort, kwargs)
@@ -432,5 +472,639 @@ class TestMergeSortStability(unittest.TestCase):
         self.assertListEqual(result, vals)
 
 
+class TestMergeSortBuffered(unittest.TestCase):
+    """Tests for merge_sort_buffered, beyond those shared with other sorts."""
+
+    @parameterized.expand([
+        ('empty', []),
+        ('singleton', [2]),
+        ('odd', [5, 3, 9, 1, 7]),
+        ('power of two', [8, 6, 7, 5, 3, 0, 9, 1]),
+        ('duplicates', [3, 1, 3, 2, 1, 3]),
+    ])
+    def test_sorts_like_sorted(self, _name, values):
+        self.assertListEqual(merge_sort_buffered(values), sorted(values))
+
+    def test_sorts_many_random_values(self):
+        rng = random.Random(0)
+        values = [rng.randrange(1000) for _ in range(10_000)]
+        self.assertListEqual(merge_sort_buffered(values), sorted(values))
+
+    def test_sorts_an_iterator(self):
+        self.assertListEqual(merge_sort_buffered(iter([3, 1, 2])), [1, 2, 3])
+
+    def test_does_not_modify_input(self):
+        values = [3, 1, 2]
+        merge_sort_buffered(values)
+        self.assertListEqual(values, [3, 1, 2])
+
+    def test_reverse_sorts_descending(self):
+        values = [5660, -6307, 5315, 389, 3446, 2673, 1555, -7225]
+        result = merge_sort_buffered(values, reverse=True)
+        self.assertListEqual(result, sorted(values, reverse=True))
+
+    def test_key_is_used_for_comparisons(self):
+        values = ['foo', 'bar', 'baz', 'quux', 'foobar', 'ham', 'spam', 'eggs']
+        result = merge_sort_buffered(values, key=len)
+        self.assertListEqual(result, sorted(values, key=len))
+
+    def test_key_is_called_once_per_item(self):
+        calls = []
+
+        def key(value):
+            calls.append(value)
+            return -value
+
+        merge_sort_buffered(range(100), key=key)
+        self.assertListEqual(calls, list(range(100)))
+
+    def test_sort_is_stable(self):
+        vals = [OrderIndistinct(x) for x in range(100)]
+        result = merge_sort_buffered(vals)
+        self.assertListEqual(result, vals)
+
+    @parameterized.expand([('forward', False), ('reverse', True)])
+    def test_sort_with_key_is_stable(self, _name, reverse):
+        pairs = [(index % 7, index) for index in range(100)]
+        result = merge_sort_buffered(pairs, key=lambda pair: pair[0],
+                                     reverse=reverse)
+        expected = sorted(pairs, key=lambda pair: pair[0], reverse=reverse)
+        self.assertListEqual(result, expected)
+
+
+class _Counted:
+    """An item that counts all < comparisons made between such items."""
+
+    __slots__ = ('value',)
+
+    comparisons = 0
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __lt__(self, other):
+        _Counted.comparisons += 1
+        return self.value < other.value
+
+
+class TestMergeSortAdaptive(unittest.TestCase):
+    """Tests for merge_sort_adaptive, beyond those shared with other sorts."""
+
+    def setUp(self):
+        """Reset the comparison count."""
+        super().setUp()
+        _Counted.comparisons = 0
+
+    def _merges(self, values, **kwargs):
+        """Sort values with merge_sort_adaptive. Return how many merges ran."""
+        count = 0
+
+        def merge(values1, values2):
+            nonlocal count
+            count += 1
+            return merge_two_galloping(values1, values2)
+
+        merge_sort_adaptive(values, merge=merge, **kwargs)
+        return count
+
+    @parameterized.expand([
+        ('ascending', list(range(1000))),
+        ('descending', list(range(1000, 0, -1))),
+        ('constant', [7] * 1000),
+    ])
+    def test_single_run_needs_no_merges(self, _name, values):
+        self.assertEqual(self._merges(values), 0)
+
+    @parameterized.expand([
+        ('ascending', range(1000)),
+        ('descending', range(1000, 0, -1)),
+    ])
+    def test_single_run_sorts_with_linear_comparisons(self, _name, values):
+        result = merge_sort_adaptive(map(_Counted, values))
+        with self.subTest('sorted'):
+            self.assertListEqual([item.value for item in result],
+                                 sorted(values))
+        with self.subTest('comparisons'):
+            self.assertLessEqual(_Counted.comparisons, 1000)
+
+    def test_sorted_batches_need_one_merge_fewer_than_batches(self):
+        rng = random.Random(0)
+        values = []
+        for _ in range(8):
+            values.extend(sorted(rng.random() for _ in range(100)))
+        self.assertEqual(self._merges(values), 7)
+
+    def test_galloping_merge_of_sorted_halves_compares_little(self):
+        values = list(range(500, 1000)) + list(range(500))
+        result = merge_sort_adaptive(map(_Counted, values))
+        with self.subTest('sorted'):
+            self.assertListEqual([item.value for item in result],
+                                 list(range(1000)))
+        with self.subTest('comparisons'):
+            self.assertLess(_Counted.comparisons, 1100)
+
+    def test_short_runs_are_extended_to_min_run(self):
+        values = [2, 1] * 50
+        self.assertEqual(self._merges(values, min_run=10), 9)
+
+    @parameterized.expand([(1,), (2,), (5,), (32,), (1000,)])
+    def test_sorts_many_random_values(self, min_run):
+        rng = random.Random(min_run)
+        values = [rng.randrange(100) for _ in range(2000)]
+        result = merge_sort_adaptive(values, min_run=min_run)
+        self.assertListEqual(result, sorted(values))
+
+    def test_descending_runs_with_ties_stay_stable(self):
+        vals = [3.0, 2, 2.0, 1, True, 0.0, 0, False]
+        result = merge_sort_adaptive(vals, min_run=1)
+        expected = sorted(vals)
+        for index, (actual, wanted) in enumerate(zip(result, expected)):
+            with self.subTest(index=index):
+                self.assertIs(actual, wanted)
+
+    def test_nonpositive_min_run_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            merge_sort_adaptive([3, 1, 2], min_run=0)
+
+
+class _Recorded:
+    """Iterator over values that records how many values it has yielded."""
+
+    __slots__ = ('_iterator', 'count')
+
+    def __init__(self, values):
+        self._iterator = iter(values)
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        value = next(self._iterator)
+        self.count += 1
+        return value
+
+
+class TestMergeK(unittest.TestCase):
+    """Tests for the merge_k k-way heap merge."""
+
+    @parameterized.expand([
+        ('no iterables', [], []),
+        ('empty iterables', [[], (), iter([])], []),
+        ('one', [[1, 2, 3]], [1, 2, 3]),
+        ('two', [[1, 3, 5], [2, 4, 6]], [1, 2, 3, 4, 5, 6]),
+        ('uneven', [[5], [1, 2, 3, 4], [], [0, 6]], [0, 1, 2, 3, 4, 5, 6]),
+    ])
+    def test_merges_sorted_iterables(self, _name, iterables, expected):
+        self.assertListEqual(list(merge_k(iterables)), expected)
+
+    def test_merges_many_random_runs(self):
+        rng = random.Random(0)
+        runs = [sorted(rng.randrange(100) for _ in range(rng.randrange(50)))
+                for _ in range(30)]
+        expected = sorted(value for run in runs for value in run)
+        self.assertListEqual(list(merge_k(runs)), expected)
+
+    def test_key_is_used_for_comparisons(self):
+        runs = [['a', 'ccc'], ['bb', 'dddd']]
+        self.assertListEqual(list(merge_k(runs, key=len)),
+                             ['a', 'bb', 'ccc', 'dddd'])
+
+    def test_is_a_stable_merge(self):
+        runs = [[OrderIndistinct(index * 10 + offset) for offset in range(3)]
+                for index in range(4)]
+        expected = [item for run in runs for item in run]
+        self.assertListEqual(list(merge_k(runs)), expected)
+
+    def test_pulls_items_lazily(self):
+        iterators = [_Recorded(range(0, 100, 2)), _Recorded(range(1, 100, 2))]
+        merged = merge_k(iterators)
+        first = [next(merged) for _ in range(5)]
+        with self.subTest('items'):
+            self.assertListEqual(first, [0, 1, 2, 3, 4])
+        with self.subTest('pulled'):
+            self.assertListEqual([it.count for it in iterators], [3, 3])
+
+
+class TestExternalMergeSort(unittest.TestCase):
+    """Tests for external_merge_sort."""
+
+    def setUp(self):
+        """Make a temporary directory to hold the runs."""
+        super().setUp()
+        self._directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self._directory.cleanup)
+
+    def _sort(self, values, **kwargs):
+        """Sort values with external_merge_sort using the test directory."""
+        return external_merge_sort(values, directory=self._directory.name,
+                                   **kwargs)
+
+    @parameterized.expand([
+        ('one run', 1000, 16),
+        ('one pass', 100, 16),
+        ('several passes', 10, 2),
+        ('uneven passes', 7, 3),
+    ])
+    def test_sorts_random_values(self, _name, run_size, fan_in):
+        rng = random.Random(run_size)
+        values = [rng.randrange(500) for _ in range(1000)]
+        result = self._sort(iter(values), run_size=run_size, fan_in=fan_in)
+        self.assertListEqual(list(result), sorted(values))
+
+    def test_key_is_used_for_comparisons(self):
+        values = ['foo', 'bar', 'baz', 'quux', 'foobar', 'ham', 'spam', 'eggs']
+        result = self._sort(values, key=len, run_size=2, fan_in=2)
+        self.assertListEqual(list(result), sorted(values, key=len))
+
+    @parameterized.expand([('one pass', 10), ('several passes', 2)])
+    def test_sort_is_stable(self, _name, fan_in):
+        values = [(index % 5, index) for index in range(200)]
+        result = self._sort(values, key=lambda pair: pair[0], run_size=7,
+                            fan_in=fan_in)
+        self.assertListEqual(list(result),
+                             sorted(values, key=lambda pair: pair[0]))
+
+    def test_temporary_files_are_removed_when_exhausted(self):
+        result = self._sort(range(100, 0, -1), run_size=10, fan_in=3)
+        list(result)
+        self.assertListEqual(os.listdir(self._directory.name), [])
+
+    def test_temporary_files_are_removed_when_closed_early(self):
+        result = self._sort(range(100, 0, -1), run_size=10, fan_in=3)
+        next(result)
+        result.close()
+        self.assertListEqual(os.listdir(self._directory.name), [])
+
+    def test_reads_input_only_when_iterated(self):
+        values = _Recorded(range(10))
+        result = self._sort(values, run_size=3)
+        with self.subTest('before'):
+            self.assertEqual(values.count, 0)
+        list(result)
+        with self.subTest('after'):
+            self.assertEqual(values.count, 10)
+
+    @parameterized.expand([
+        ('run_size', dict(run_size=0)),
+        ('fan_in', dict(fan_in=1)),
+    ])
+    def test_bad_argument_raises_value_error(self, _name, kwargs):
+        with self.assertRaises(ValueError):
+            self._sort([3, 1, 2], **kwargs)
+
+
+def _pair_group(pair):
+    """Key function for stability tests: the first item of a pair."""
+    return pair[0]
+
+
+class TestMergeSortParallel(unittest.TestCase):
+    """Tests for merge_sort_parallel, with a threshold low enough to fork."""
+
+    @parameterized.expand([(1,), (2,), (3,)])
+    def test_sorts_list_of_random_values(self, workers):
+        rng = random.Random(workers)
+        values = [rng.randrange(1000) for _ in range(3000)]
+        result = merge_sort_parallel(values, workers=workers, threshold=0)
+        self.assertListEqual(result, sorted(values))
+
+    @parameterized.expand([('int', 'q'), ('float', 'd'), ('byte', 'B')])
+    def test_sorts_numeric_array_in_shared_memory(self, _name, typecode):
+        rng = random.Random(0)
+        values = array.array(typecode,
+                             (rng.randrange(256) for _ in range(3000)))
+        original = values.tolist()
+        result = merge_sort_parallel(values, workers=2, threshold=0)
+        with self.subTest('sorted'):
+            self.assertListEqual(result, sorted(original))
+        with self.subTest('input unchanged'):
+            self.assertListEqual(values.tolist(), original)
+
+    def test_sorts_an_iterator(self):
+        result = merge_sort_parallel(iter([3, 1, 2]), workers=2, threshold=0)
+        self.assertListEqual(result, [1, 2, 3])
+
+    def test_more_workers_than_values_sorts(self):
+        result = merge_sort_parallel([2, 1], workers=8, threshold=0)
+        self.assertListEqual(result, [1, 2])
+
+    def test_sort_is_stable_with_key(self):
+        values = [(index % 5, index) for index in range(500)]
+        result = merge_sort_parallel(values, key=_pair_group, workers=3,
+                                     threshold=0)
+        self.assertListEqual(result, sorted(values, key=_pair_group))
+
+    def test_below_threshold_sorts_in_this_process(self):
+        # A lambda can't be pickled, so this only works without workers.
+        result = merge_sort_parallel([3, 1, 2], key=lambda x: -x, workers=2)
+        self.assertListEqual(result, [3, 2, 1])
+
+    def test_nonpositive_workers_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            merge_sort_parallel([3, 1, 2], workers=0)
+
+
+class TestBinarySearchMany(unittest.TestCase):
+    """Tests for binary_search_many, with sequences and NumPy arrays."""
+
+    @parameterized.expand([
+        ('list', list),
+        ('tuple', tuple),
+        ('array', numpy.array),
+    ])
+    def test_finds_each_needle_or_none(self, _name, make_values):
+        values = make_values(range(0, 100, 3))
+        needles = [0, 1, 3, 50, 51, 99, 100, -3]
+        expected = [binary_search_good(list(range(0, 100, 3)), needle)
+                    for needle in needles]
+        self.assertListEqual(binary_search_many(values, needles), expected)
+
+    @parameterized.expand([
+        ('list', list),
+        ('iterator', iter),
+        ('array', numpy.array),
+    ])
+    def test_accepts_needles_as(self, _name, make_needles):
+        values = numpy.array([2, 4, 6])
+        result = binary_search_many(values, make_needles([6, 5, 2]))
+        self.assertListEqual(result, [2, None, 0])
+
+    def test_array_indices_are_ints(self):
+        [index] = binary_search_many(numpy.array([2, 4, 6]), [4])
+        self.assertIs(type(index), int)
+
+    @parameterized.expand([('list', []), ('array', numpy.array([]))])
+    def test_empty_values_find_nothing(self, _name, values):
+        self.assertListEqual(binary_search_many(values, [1, 2]),
+                             [None, None])
+
+    def test_finds_an_occurrence_among_duplicates(self):
+        values = numpy.array([1, 2, 2, 2, 3])
+        [index] = binary_search_many(values, [2])
+        self.assertEqual(values[index], 2)
+
+    @parameterized.expand([('sorted', True), ('unsorted', False)])
+    def test_matches_binary_search_on_random_needles(self, _name, ordered):
+        rng = random.Random(0)
+        values = sorted(rng.randrange(10_000) for _ in range(1000))
+        needles = [rng.randrange(10_000) for _ in range(300)]
+        if ordered:
+            needles.sort()
+        expected = [binary_search_good(values, x) for x in needles]
+        self.assertListEqual(binary_search_many(values, needles), expected)
+
+    def test_repeated_needles_are_all_found(self):
+        result = binary_search_many([1, 3, 5], [3, 3, 1, 3])
+        self.assertListEqual(result, [1, 1, 0, 1])
+
+    def test_sorted_needles_need_fewer_comparisons(self):
+        values = [_Counted(value) for value in range(0, 200_000, 2)]
+        needles = [_Counted(value) for value in range(0, 200_000, 200)]
+        _Counted.comparisons = 0
+        result = binary_search_many(values, needles)
+        with self.subTest('found'):
+            self.assertListEqual(result, list(range(0, 100_000, 100)))
+        with self.subTest('comparisons'):
+            # Searching separately would take about 17 per needle.
+            self.assertLess(_Counted.comparisons, 10 * len(needles))
+
+
+_VECTOR_SORTS = [
+    (sort.__name__, sort) for sort in (
+        binary_insertion_sort,
+        insertion_sort,
+        merge_sort,
+        merge_sort_bottom_up_unstable,
+        merge_sort_bottom_up,
+        merge_sort_buffered,
+        merge_sort_adaptive,
+        merge_sort_parallel,
+    )
+]
+
+
+class TestNumPyFastPaths(unittest.TestCase):
+    """Tests for searching and sorting one-dimensional NumPy arrays."""
+
+    def test_binary_search_finds_in_array(self):
+        values = numpy.arange(0, 100, 5)
+        with self.subTest('found'):
+            self.assertEqual(binary_search(values, 35), 7)
+        with self.subTest('not found'):
+            self.assertIsNone(binary_search(values, 36))
+
+    @parameterized.expand(_VECTOR_SORTS)
+    def test_sort_returns_sorted_array(self, _name, sort):
+        values = numpy.array([5, -3, 8, 0, 8, -3])
+        result = sort(values)
+        with self.subTest('type'):
+            self.assertIsInstance(result, numpy.ndarray)
+        with self.subTest('sorted'):
+            self.assertListEqual(result.tolist(), [-3, -3, 0, 5, 8, 8])
+        with self.subTest('input unchanged'):
+            self.assertListEqual(values.tolist(), [5, -3, 8, 0, 8, -3])
+
+    @parameterized.expand(_VECTOR_SORTS)
+    def test_sort_of_array_is_stable(self, _name, sort):
+        values = numpy.array([0.0, -0.0, 0.0, -0.0])
+        result = sort(values)
+        self.assertListEqual(numpy.signbit(result).tolist(),
+                             [False, True, False, True])
+
+    def test_reverse_sort_of_array_is_stable(self):
+        values = numpy.array([0.0, 1.0, -0.0])
+        result = merge_sort_buffered(values, reverse=True)
+        self.assertListEqual(numpy.signbit(result).tolist(),
+                             [False, False, True])
+
+    @parameterized.expand([
+        ('merge_sort', merge_sort),
+        ('merge_sort_bottom_up_unstable', merge_sort_bottom_up_unstable),
+        ('merge_sort_bottom_up', merge_sort_bottom_up),
+        ('merge_sort_adaptive', merge_sort_adaptive),
+    ])
+    def test_sort_with_merge_uses_it(self, _name, sort):
+        calls = []
+
+        def merge(values1, values2):
+            calls.append((len(values1), len(values2)))
+            return merge_two(values1, values2)
+
+        values = numpy.array([n * 37 % 101 for n in range(101)])
+        result = sort(values, merge=merge)
+        with self.subTest('called'):
+            self.assertTrue(calls)
+        with self.subTest('sorted'):
+            self.assertListEqual(list(result), list(range(101)))
+
+    def test_adaptive_sort_with_min_run_uses_pure_python(self):
+        result = merge_sort_adaptive(numpy.array([3, 1, 2, 0]), min_run=2)
+        with self.subTest('type'):
+            self.assertIsInstance(result, list)
+        with self.subTest('sorted'):
+            self.assertListEqual(result, [0, 1, 2, 3])
+
+    def test_sort_with_key_uses_pure_python(self):
+        result = merge_sort_buffered(numpy.array([1, -3, 2]), key=abs)
+        with self.subTest('type'):
+            self.assertIsInstance(result, list)
+        with self.subTest('sorted'):
+            self.assertListEqual(result, [1, 2, -3])
+
+
+def _deep_chain(leaf, depth):
+    """Nest leaf in depth singleton tuples, without recursion."""
+    for _ in range(depth):
+        leaf = (leaf,)
+    return leaf
+
+
+_ROOT3 = ((1, (2,), 3), (4, (5,), (), 6))
+
+_SHARED = (1, 2)
+
+_DIAMOND = ((_SHARED, 3), (_SHARED, 4))
+
+
+class TestWalk(unittest.TestCase):
+    """Tests for the walk traversal engine."""
+
+    @parameterized.expand([
+        ('preorder', [_ROOT3, _ROOT3[0], 1, (2,), 2, 3,
+                      _ROOT3[1], 4, (5,), 5, (), 6]),
+        ('postorder', [1, 2, (2,), 3, _ROOT3[0],
+                       4, 5, (5,), (), 6, _ROOT3[1], _ROOT3]),
+        ('levelorder', [_ROOT3, _ROOT3[0], _ROOT3[1], 1, (2,), 3,
+                        4, (5,), (), 6, 2, 5]),
+    ])
+    def test_yields_nodes_in_order(self, order, expected):
+        self.assertListEqual(list(walk(_ROOT3, order)), expected)
+
+    @parameterized.expand([(order,) for order in ('preorder', 'postorder')])
+    def test_depth_first_observer_sees_edges_like_flatten(self, order):
+        edges = []
+        list(walk(_ROOT3, order, observer=lambda *edge: edges.append(edge)))
+        expected = [
+            (_ROOT3, _ROOT3[0]), (_ROOT3[0], 1), (_ROOT3[0], (2,)),
+            ((2,), 2), (_ROOT3[0], 3), (_ROOT3, _ROOT3[1]), (_ROOT3[1], 4),
+            (_ROOT3[1], (5,)), ((5,), 5), (_ROOT3[1], ()), (_ROOT3[1], 6),
+        ]
+        self.assertListEqual(edges, expected)
+
+    def test_levelorder_observer_sees_edges_level_by_level(self):
+        edges = []
+        list(walk(_ROOT3, 'levelorder',
+                  observer=lambda *edge: edges.append(edge)))
+        parents = [parent for parent, _ in edges]
+        expected = ([_ROOT3] * 2 + [_ROOT3[0]] * 3 + [_ROOT3[1]] * 4
+                    + [(2,), (5,)])
+        self.assertListEqual(parents, expected)
+
+    @parameterized.expand([
+        (order,) for order in ('preorder', 'postorder', 'levelorder')
+    ])
+    def test_without_memoize_shared_nodes_repeat(self, order):
+        nodes = list(walk(_DIAMOND, order))
+        self.assertEqual(sum(node is _SHARED for node in nodes), 2)
+
+    @parameterized.expand([
+        (order,) for order in ('preorder', 'postorder', 'levelorder')
+    ])
+    def test_with_memoize_each_node_is_yielded_once(self, order):
+        nodes = list(walk(_DIAMOND, order, memoize=True))
+        ids = [id(node) for node in nodes]
+        with self.subTest('once'):
+            self.assertEqual(len(ids), len(set(ids)))
+        with self.subTest('all'):
+            self.assertEqual(len(nodes), 8)
+
+    @parameterized.expand([
+        (order,) for order in ('preorder', 'postorder', 'levelorder')
+    ])
+    def test_memoize_still_observes_every_edge(self, order):
+        edges = []
+        list(walk(_DIAMOND, order, memoize=True,
+                  observer=lambda *edge: edges.append(edge)))
+        self.assertEqual(len(edges), 8)
+
+    def test_memoize_makes_heavily_shared_structure_fast(self):
+        root = 'leaf'
+        for _ in range(1000):
+            root = (root, root)
+        self.assertEqual(sum(1 for _ in walk(root, memoize=True)), 1001)
+
+    @parameterized.expand([
+        (order,) for order in ('preorder', 'postorder', 'levelorder')
+    ])
+    def test_very_deep_nesting_does_not_recurse(self, order):
+        nodes = list(walk(_deep_chain('leaf', 50_000), order))
+        self.assertEqual(len(nodes), 50_001)
+
+    @parameterized.expand([
+        (order,) for order in ('preorder', 'postorder', 'levelorder')
+    ])
+    def test_leaf_root_is_the_only_node(self, order):
+        self.assertListEqual(list(walk('leaf', order)), ['leaf'])
+
+    def test_unknown_order_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            walk(_ROOT3, 'inorder')
+
+
+class TestFold(unittest.TestCase):
+    """Tests for fold, built on walk."""
+
+    def test_combines_child_values_in_order(self):
+        result = fold(_ROOT3, lambda node, values: values or [node])
+        self.assertListEqual(result, [[[1], [[2]], [3]],
+                                      [[4], [[5]], [()], [6]]])
+
+    def test_shared_nodes_are_combined_once(self):
+        calls = []
+
+        def combine(node, values):
+            calls.append(node)
+            return 1 + sum(values)
+
+        result = fold(_DIAMOND, combine)
+        with self.subTest('tree semantics'):
+            self.assertEqual(result, 11)
+        with self.subTest('calls'):
+            self.assertEqual(sum(node is _SHARED for node in calls), 1)
+
+    def test_very_deep_nesting_does_not_recurse(self):
+        result = fold(make_deep_tuple(50_000),
+                      lambda _, depths: max(depths, default=-1) + 1)
+        self.assertEqual(result, 50_000)
+
+
+class TestFlattenAndLeafSumDepth(unittest.TestCase):
+    """Tests that functions built on walk and fold handle very deep nesting."""
+
+    def test_flatten_deep_tuple(self):
+        self.assertListEqual(list(flatten(_deep_chain('leaf', 50_000))),
+                             ['leaf'])
+
+    def test_flatten_observed_deep_tuple(self):
+        edges = []
+        result = list(flatten_observed(_deep_chain('leaf', 50_000),
+                                       lambda *edge: edges.append(edge)))
+        with self.subTest('leaves'):
+            self.assertListEqual(result, ['leaf'])
+        with self.subTest('edges'):
+            self.assertEqual(len(edges), 50_000)
+
+    def test_leaf_sum_deep_shared_tuple(self):
+        root = 1
+        for _ in range(50_000):
+            root = (root, root)
+        self.assertEqual(leaf_sum(root) % 1_000_007,
+                         pow(2, 50_000, 1_000_007))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -41,8 +41,10 @@ One reasonable general approach for implementing sll.HashNode is to:
 
 import functools
 import gc
+import io
 import itertools
 import math
+import threading
 import types
 import unittest
 import weakref
@@ -422,6 +424,34 @@ class TestHashNodeBasic(unittest.TestCase):
 
         self.assertIs(node, shorter)
 
+    def test_from_iterable_long_iterator_gives_same_chain_as_sequence(self):
+        from_sequence = sll.HashNode.from_iterable(range(9000))
+        from_iterator = sll.HashNode.from_iterable(iter(range(9000)))
+        self.assertIs(from_iterator, from_sequence)
+
+    def test_from_iterable_can_overlap_long_chain_across_batches(self):
+        shorter = sll.HashNode.from_iterable(range(5000))
+        longer = sll.HashNode.from_iterable(iter(range(-3000, 5000)))
+
+        node = longer
+        for _ in range(3000):
+            node = node.next_node
+
+        self.assertIs(node, shorter)
+
+    def test_from_iterable_makes_only_new_nodes(self):
+        testing.collect_if_not_ref_counting()
+        shorter = sll.HashNode.from_iterable(range(5000))
+        before = sll.HashNode.count_instances()
+        longer = sll.HashNode.from_iterable(range(-3000, 5000))
+        after = sll.HashNode.count_instances()
+
+        with self.subTest('count'):
+            self.assertEqual(after - before, 3000)
+        with self.subTest('still used'):
+            self.assertIsNotNone(shorter)
+            self.assertIsNotNone(longer)
+
     @parameterized.expand(['__eq__', '__ne__', '__hash__'])
     def test_type_uses_reference_equality_comparison(self, name):
         expected = getattr(object, name)
@@ -1214,5 +1244,842 @@ class TestHashNodeReentrantDevious(unittest.TestCase):
             sll.HashNode(self._strike)
 
 
+_LONG_WAIT = 10.0
+"""Timeout, in seconds, for operations that are expected to succeed."""
+
+
+class _SlowEq:
+    """Element whose __eq__ waits on an event, to pause a thread in __new__."""
+
+    __slots__ = ('entered', 'release')
+
+    def __init__(self):
+        """Create an element whose comparisons wait until release is set."""
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def __eq__(self, other):
+        """Signal that a comparison began, and wait until released."""
+        self.entered.set()
+        self.release.wait(_LONG_WAIT * 2)
+        return isinstance(other, _SlowEq)
+
+    def __hash__(self):
+        """All instances hash alike, so they are compared to each other."""
+        return 7
+
+
+class TestHashNodeThreads(unittest.TestCase):
+    """Tests for constructing sll.HashNode instances from several threads."""
+
+    @parameterized.expand([('short', 500), ('multiple_batches', 5000)])
+    def test_concurrent_construction_makes_identical_chains(
+            self, _name, length):
+        values = [f'thread-test-{index}' for index in range(length)]
+        heads = [None] * 8
+        barrier = threading.Barrier(len(heads))
+
+        def build(index):
+            barrier.wait()
+            heads[index] = sll.HashNode.from_iterable(values)
+
+        threads = [threading.Thread(target=build, args=(index,))
+                   for index in range(len(heads))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(_LONG_WAIT)
+
+        with self.subTest('identical'):
+            self.assertTrue(all(head is heads[0] for head in heads))
+        with self.subTest('values'):
+            self.assertListEqual(list(sll.traverse(heads[0])), values)
+
+    def test_node_made_in_another_thread_is_found(self):
+        nodes = []
+        thread = threading.Thread(
+            target=lambda: nodes.append(sll.HashNode('made elsewhere')))
+        thread.start()
+        thread.join(_LONG_WAIT)
+        self.assertIs(sll.HashNode('made elsewhere'), nodes[0])
+
+    def test_finding_node_in_one_thread_does_not_block_another(self):
+        element = _SlowEq()
+        node = sll.HashNode(element)
+        finders = []
+        finder = threading.Thread(
+            target=lambda: finders.append(sll.HashNode(_SlowEq())))
+
+        try:
+            finder.start()
+            if not element.entered.wait(_LONG_WAIT):
+                raise Exception('unexpected failure to compare elements')
+            others = []
+            other_maker = threading.Thread(
+                target=lambda: others.append(sll.HashNode('not blocked')))
+            other_maker.start()
+            other_maker.join(_LONG_WAIT)
+            self.assertEqual(len(others), 1, 'other thread should not block')
+        finally:
+            element.release.set()
+            finder.join(_LONG_WAIT)
+
+        self.assertIs(finders[0], node)
+
+
+class _ReentrantHash:
+    """Element whose __hash__ makes a tree node, to test reentrance."""
+
+    __slots__ = ('_node_type',)
+
+    def __init__(self, node_type):
+        """Create an element that makes a node_type node when hashed."""
+        self._node_type = node_type
+
+    def __hash__(self):
+        """Make a node, then hash by identity."""
+        self._node_type('inner')
+        return id(self)
+
+
+_parameterize_by_tree_node_type = parameterized.expand([
+    (sll.HashTreeNode.__name__, sll.HashTreeNode),
+    (sll.HashBinaryTreeNode.__name__, sll.HashBinaryTreeNode),
+])
+"""Parameterize a test method by hash-consed tree node type."""
+
+
+def _make_pair(node_type, value, child):
+    """Make a node of node_type with two children that are both child."""
+    if issubclass(node_type, sll.HashTreeNode):
+        return node_type(value, [child, child])
+    return node_type(value, child, child)
+
+
+class TestHashTreeNodeTypes(unittest.TestCase):
+    """Tests for behavior shared by sll.HashTreeNode and HashBinaryTreeNode."""
+
+    @_parameterize_by_tree_node_type
+    def test_leaf_has_value_and_no_children(self, _name, node_type):
+        leaf = node_type('foo')
+        with self.subTest('value'):
+            self.assertEqual(leaf.value, 'foo')
+        with self.subTest('children'):
+            self.assertEqual(leaf.children, ())
+
+    @_parameterize_by_tree_node_type
+    def test_structurally_equal_trees_are_identical(self, _name, node_type):
+        tree1 = _make_pair(node_type, 'a', _make_pair(node_type, 'b',
+                                                      node_type('c')))
+        tree2 = _make_pair(node_type, 'a', _make_pair(node_type, 'b',
+                                                      node_type('c')))
+        self.assertIs(tree1, tree2)
+
+    @_parameterize_by_tree_node_type
+    def test_structurally_unequal_trees_are_not_equal(self, _name, node_type):
+        tree1 = _make_pair(node_type, 'a', node_type('b'))
+        tree2 = _make_pair(node_type, 'a', node_type('c'))
+        self.assertNotEqual(tree1, tree2)
+
+    @_parameterize_by_tree_node_type
+    def test_equal_values_across_types_are_interchangeable(self, _name,
+                                                           node_type):
+        self.assertIs(node_type(1.0), node_type(True))
+
+    @_parameterize_by_tree_node_type
+    def test_nan_leaves_are_identical(self, _name, node_type):
+        self.assertIs(node_type(math.nan), node_type(math.nan))
+
+    @_parameterize_by_tree_node_type
+    def test_repeated_subtree_is_shared(self, _name, node_type):
+        tree = _make_pair(node_type, 'root', _make_pair(node_type, 'x',
+                                                        node_type('y')))
+        left, right = tree.children
+        self.assertIs(left, right)
+
+    @_parameterize_by_tree_node_type
+    def test_wrong_child_type_raises_type_error(self, _name, node_type):
+        with self.assertRaises(TypeError):
+            _make_pair(node_type, 'root', sll.HashNode('child'))
+
+    @_parameterize_by_tree_node_type
+    def test_subclass_node_as_child_raises_type_error(self, _name, node_type):
+        subclass = type('Own' + node_type.__name__, (node_type,),
+                        {'__slots__': ()})
+
+        with self.subTest('subclass node under base node'):
+            with self.assertRaises(TypeError):
+                _make_pair(node_type, 'root', subclass('child'))
+        with self.subTest('base node under subclass node'):
+            with self.assertRaises(TypeError):
+                _make_pair(subclass, 'root', node_type('child'))
+
+    @_parameterize_by_tree_node_type
+    def test_unhashable_value_raises_type_error(self, _name, node_type):
+        with self.assertRaises(TypeError):
+            node_type([])
+
+    @_parameterize_by_tree_node_type
+    def test_no_instance_dictionary(self, _name, node_type):
+        with self.assertRaises(AttributeError):
+            node_type('foo').__dict__
+
+    @_parameterize_by_tree_node_type
+    def test_value_attribute_is_read_only(self, _name, node_type):
+        leaf = node_type('foo')
+        with self.assertRaises(AttributeError):
+            leaf.value = 'bar'
+
+    @_parameterize_by_tree_node_type
+    def test_unreachable_nodes_are_collected(self, _name, node_type):
+        tree = _make_pair(node_type, 'collected', node_type('leaf too'))
+        ref = weakref.ref(tree)
+        del tree
+        testing.collect_if_not_ref_counting()
+        self.assertIsNone(ref())
+
+    @_parameterize_by_tree_node_type
+    def test_count_instances_counts_only_own_type(self, _name, node_type):
+        testing.collect_if_not_ref_counting()
+        before = node_type.count_instances()
+        others = [sll.HashNode('counted'), sll.HashTreeNode('counted'),
+                  sll.HashBinaryTreeNode('counted')]
+        after = node_type.count_instances()
+        with self.subTest('count'):
+            self.assertEqual(after - before, 1)
+        with self.subTest('still used'):
+            self.assertEqual(len(others), 3)
+
+    @_parameterize_by_tree_node_type
+    def test_reentrance_through_hash_raises_runtime_error(self, _name,
+                                                          node_type):
+        expected_message = (rf'\A{node_type.__name__}.__new__ reentered '
+                            r'through __hash__ or __eq__\Z')
+        with self.assertRaisesRegex(RuntimeError, expected_message):
+            node_type(_ReentrantHash(node_type))
+
+    @_parameterize_by_tree_node_type
+    def test_draw_returns_graphviz_digraph(self, _name, node_type):
+        tree = _make_pair(node_type, 'drawn', node_type('leaf'))
+        graph = node_type.draw()
+        with self.subTest('type'):
+            self.assertIsInstance(graph, graphviz.Digraph)
+        with self.subTest('node'):
+            self.assertIn(str(id(tree)), graph.source)
+
+    @_parameterize_by_tree_node_type
+    def test_concurrent_construction_makes_identical_trees(self, _name,
+                                                           node_type):
+        roots = [None] * 8
+        barrier = threading.Barrier(len(roots))
+
+        def build(index):
+            barrier.wait()
+            node = node_type('thread leaf')
+            for level in range(200):
+                node = _make_pair(node_type, level, node)
+            roots[index] = node
+
+        threads = [threading.Thread(target=build, args=(index,))
+                   for index in range(len(roots))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(_LONG_WAIT)
+
+        self.assertTrue(all(root is roots[0] for root in roots))
+
+
+class TestHashTreeNode(unittest.TestCase):
+    """Tests specific to sll.HashTreeNode, the n-ary tree node."""
+
+    def test_children_are_a_tuple_in_order(self):
+        a, b, c = (sll.HashTreeNode(value) for value in 'abc')
+        root = sll.HashTreeNode('root', [a, b, c])
+        self.assertEqual(root.children, (a, b, c))
+
+    def test_children_can_be_an_iterator(self):
+        leaves = [sll.HashTreeNode(value) for value in 'ab']
+        self.assertIs(sll.HashTreeNode('root', iter(leaves)),
+                      sll.HashTreeNode('root', leaves))
+
+    def test_different_child_counts_are_not_identical(self):
+        leaf = sll.HashTreeNode('leaf')
+        self.assertIsNot(sll.HashTreeNode('root', [leaf]),
+                         sll.HashTreeNode('root', [leaf, leaf]))
+
+    def test_repr_shows_whole_tree(self):
+        root = sll.HashTreeNode('+', [sll.HashTreeNode(1),
+                                      sll.HashTreeNode(2)])
+        expected = "HashTreeNode('+', (HashTreeNode(1), HashTreeNode(2)))"
+        self.assertEqual(repr(root), expected)
+
+    def test_matches_positional_class_pattern(self):
+        leaf = sll.HashTreeNode('leaf')
+        match sll.HashTreeNode('root', [leaf]):
+            case sll.HashTreeNode('root', (child,)):
+                self.assertIs(child, leaf)
+            case _:
+                self.fail('root did not match the positional pattern')
+
+
+class TestHashBinaryTreeNode(unittest.TestCase):
+    """Tests specific to sll.HashBinaryTreeNode."""
+
+    def test_left_and_right_are_as_given(self):
+        left = sll.HashBinaryTreeNode('left')
+        right = sll.HashBinaryTreeNode('right')
+        root = sll.HashBinaryTreeNode('root', left, right)
+        with self.subTest('left'):
+            self.assertIs(root.left, left)
+        with self.subTest('right'):
+            self.assertIs(root.right, right)
+
+    def test_left_only_and_right_only_are_not_identical(self):
+        child = sll.HashBinaryTreeNode('child')
+        left_only = sll.HashBinaryTreeNode('root', child)
+        right_only = sll.HashBinaryTreeNode('root', right=child)
+        self.assertIsNot(left_only, right_only)
+
+    def test_children_skip_missing_children(self):
+        child = sll.HashBinaryTreeNode('child')
+        root = sll.HashBinaryTreeNode('root', right=child)
+        self.assertEqual(root.children, (child,))
+
+    @parameterized.expand([
+        ('leaf', lambda leaf: leaf, "HashBinaryTreeNode('x')"),
+        ('left_only', lambda leaf: sll.HashBinaryTreeNode(0, leaf),
+         "HashBinaryTreeNode(0, HashBinaryTreeNode('x'))"),
+        ('right_only', lambda leaf: sll.HashBinaryTreeNode(0, None, leaf),
+         "HashBinaryTreeNode(0, None, HashBinaryTreeNode('x'))"),
+    ])
+    def test_repr_shows_whole_tree(self, _name, make, expected):
+        node = make(sll.HashBinaryTreeNode('x'))
+        self.assertEqual(repr(node), expected)
+
+    def test_matches_positional_class_pattern(self):
+        leaf = sll.HashBinaryTreeNode('leaf')
+        match sll.HashBinaryTreeNode('root', None, leaf):
+            case sll.HashBinaryTreeNode('root', None, right):
+                self.assertIs(right, leaf)
+            case _:
+                self.fail('root did not match the positional pattern')
+
+
+def _doubling_tree(node_type, height):
+    """Make a tree of the given height, each node having two equal children."""
+    node = node_type(0)
+    for level in range(1, height + 1):
+        node = _make_pair(node_type, level, node)
+    return node
+
+
+class TestTreeFold(unittest.TestCase):
+    """Tests for sll.tree_fold and the memoized operations made with it."""
+
+    def test_combine_is_called_once_per_distinct_node(self):
+        calls = []
+
+        @sll.tree_fold
+        def size(node, child_sizes):
+            calls.append(node)
+            return 1 + sum(child_sizes)
+
+        root = _doubling_tree(sll.HashTreeNode, 60)
+
+        with self.subTest('result'):
+            self.assertEqual(size(root), 2**61 - 1)
+        with self.subTest('calls'):
+            self.assertEqual(len(calls), 61)
+
+    def test_repeated_call_is_not_recomputed(self):
+        calls = []
+
+        @sll.tree_fold
+        def size(node, child_sizes):
+            calls.append(node)
+            return 1 + sum(child_sizes)
+
+        root = _doubling_tree(sll.HashBinaryTreeNode, 10)
+        size(root)
+        calls.clear()
+        size(root)
+        size(root.left)
+        self.assertListEqual(calls, [])
+
+    def test_child_results_are_in_child_order(self):
+        @sll.tree_fold
+        def preorder(node, child_preorders):
+            return node.value + ''.join(child_preorders)
+
+        root = sll.HashTreeNode('a', [sll.HashTreeNode('b'),
+                                      sll.HashTreeNode('c')])
+        self.assertEqual(preorder(root), 'abc')
+
+    def test_very_deep_tree_does_not_overflow_stack(self):
+        node = sll.HashBinaryTreeNode(0)
+        for level in range(1, 100_000):
+            node = sll.HashBinaryTreeNode(level, right=node)
+        self.assertEqual(sll.tree_size(node), 100_000)
+
+    def test_results_do_not_keep_nodes_alive(self):
+        root = _doubling_tree(sll.HashTreeNode, 5)
+        sll.tree_height(root)
+        ref = weakref.ref(root)
+        del root
+        testing.collect_if_not_ref_counting()
+        self.assertIsNone(ref())
+
+    def test_results_referring_to_their_nodes_do_not_keep_them_alive(self):
+        @sll.tree_fold
+        def own_node(node, _child_results):
+            return [node]
+
+        root = _doubling_tree(sll.HashTreeNode, 5)
+        own_node(root)
+        ref = weakref.ref(root)
+        del root
+        gc.collect()
+        self.assertIsNone(ref())
+
+    @_parameterize_by_tree_node_type
+    def test_tree_size_counts_shared_subtrees_each_time(self, _name,
+                                                        node_type):
+        self.assertEqual(sll.tree_size(_doubling_tree(node_type, 3)), 15)
+
+    @_parameterize_by_tree_node_type
+    def test_tree_height_is_longest_path(self, _name, node_type):
+        self.assertEqual(sll.tree_height(_doubling_tree(node_type, 7)), 7)
+
+    @_parameterize_by_tree_node_type
+    def test_count_distinct_nodes_counts_shared_subtrees_once(self, _name,
+                                                              node_type):
+        root = _doubling_tree(node_type, 30)
+        self.assertEqual(sll.count_distinct_nodes(root), 31)
+
+
+def _lists_sharing_tail(prefix_count, prefix_length, tail_length):
+    """Make lists that have different short prefixes but one long tail."""
+    tail = list(range(tail_length))
+    return [
+        sll.HashNode.from_iterable(
+            [(index, position) for position in range(prefix_length)] + tail)
+        for index in range(prefix_count)
+    ]
+
+
+def _drop(head, count):
+    """Get the node count nodes after head."""
+    for _ in range(count):
+        head = head.next_node
+    return head
+
+
+class TestListOperations(unittest.TestCase):
+    """Tests for the memoized operations on sll.HashNode lists."""
+
+    _parameterize_by_values = parameterized.expand([
+        ('empty', []),
+        ('one', ['a']),
+        ('several', ['a', 'b', 'c', 'b']),
+        ('long', list(range(9000))),
+    ])
+    """Parameterize a test method by values to make a list of."""
+
+    @_parameterize_by_values
+    def test_append_adds_value_at_end(self, _name, values):
+        head = sll.append(sll.HashNode.from_iterable(values), 'end')
+        self.assertListEqual(list(sll.traverse(head)), [*values, 'end'])
+
+    @_parameterize_by_values
+    def test_concat_joins_lists(self, _name, values):
+        first = sll.HashNode.from_iterable(values)
+        second = sll.HashNode.from_iterable('xyz')
+        head = sll.concat(first, second)
+        self.assertListEqual(list(sll.traverse(head)), [*values, *'xyz'])
+
+    @_parameterize_by_values
+    def test_concat_with_empty_second_is_first(self, _name, values):
+        first = sll.HashNode.from_iterable(values)
+        self.assertIs(sll.concat(first, None), first)
+
+    @_parameterize_by_values
+    def test_map_values_applies_function(self, _name, values):
+        head = sll.map_values(repr, sll.HashNode.from_iterable(values))
+        self.assertListEqual(list(sll.traverse(head)), list(map(repr, values)))
+
+    @_parameterize_by_values
+    def test_take_gives_prefix(self, _name, values):
+        head = sll.take(sll.HashNode.from_iterable(values), 3)
+        self.assertListEqual(list(sll.traverse(head)), values[:3])
+
+    @_parameterize_by_values
+    def test_reverse_reverses(self, _name, values):
+        head = sll.reverse(sll.HashNode.from_iterable(values))
+        self.assertListEqual(list(sll.traverse(head)), values[::-1])
+
+    @_parameterize_by_values
+    def test_reverse_of_reverse_is_original(self, _name, values):
+        head = sll.HashNode.from_iterable(values)
+        self.assertIs(sll.reverse(sll.reverse(head)), head)
+
+    def test_take_zero_is_empty(self):
+        self.assertIsNone(sll.take(sll.HashNode.from_iterable('abc'), 0))
+
+    def test_take_more_than_length_is_same_list(self):
+        head = sll.HashNode.from_iterable('abc')
+        self.assertIs(sll.take(head, 10), head)
+
+    def test_take_negative_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            sll.take(sll.HashNode('a'), -1)
+
+    def test_repeated_append_is_identical(self):
+        head = sll.HashNode.from_iterable(range(100))
+        self.assertIs(sll.append(head, 'end'), sll.append(head, 'end'))
+
+    def test_map_values_reuses_results_for_shared_tail(self):
+        calls = []
+
+        def record(value):
+            calls.append(value)
+            return value
+
+        heads = _lists_sharing_tail(3, 2, 1000)
+        results = [sll.map_values(record, head) for head in heads]
+
+        with self.subTest('calls'):
+            self.assertEqual(len(calls), 1000 + 3 * 2)
+        with self.subTest('results'):
+            self.assertTrue(all(result is head
+                                for result, head in zip(results, heads)))
+
+    def test_append_reuses_results_for_shared_tail(self):
+        heads = _lists_sharing_tail(2, 5, 1000)
+        first = sll.append(heads[0], 'end')
+        testing.collect_if_not_ref_counting()
+        before = sll.HashNode.count_instances()
+        second = sll.append(heads[1], 'end')
+        after = sll.HashNode.count_instances()
+
+        with self.subTest('new nodes'):
+            self.assertEqual(after - before, 5)
+        with self.subTest('shared'):
+            self.assertIs(_drop(first, 5), _drop(second, 5))
+
+    @parameterized.expand([
+        ('append', lambda head: sll.append(head, 'end')),
+        ('concat', lambda head: sll.concat(head, sll.HashNode('end'))),
+        ('map_values', lambda head: sll.map_values(abs, head)),
+        ('take', lambda head: sll.take(head, 2)),
+        ('reverse', sll.reverse),
+    ])
+    def test_remembered_results_do_not_keep_input_alive(self, _name, operate):
+        head = sll.HashNode.from_iterable(range(-5, 0))
+        result = operate(head)
+        ref = weakref.ref(head)
+        del head
+        testing.collect_if_not_ref_counting()
+        with self.subTest('input collected'):
+            self.assertIsNone(ref())
+        with self.subTest('result kept'):
+            self.assertIsNotNone(result)
+
+    @parameterized.expand([
+        ('append', lambda head: sll.append(head, 'end')),
+        ('concat', lambda head: sll.concat(head, sll.CompactHashNode('end'))),
+        ('map_values', lambda head: sll.map_values(str.upper, head)),
+        ('take', lambda head: sll.take(head, 2)),
+        ('reverse', sll.reverse),
+    ])
+    def test_result_has_same_node_type(self, _name, operate):
+        result = operate(sll.CompactHashNode.from_iterable('abc'))
+        node_types = set()
+        while result is not None:
+            node_types.add(type(result))
+            result = result.next_node
+        self.assertSetEqual(node_types, {sll.CompactHashNode})
+
+    @parameterized.expand([
+        ('compact onto hash', sll.CompactHashNode, sll.HashNode),
+        ('hash onto compact', sll.HashNode, sll.CompactHashNode),
+    ])
+    def test_concat_of_different_node_types_raises_type_error(
+            self, _name, first_type, second_type):
+        first = first_type.from_iterable('ab')
+        second = second_type.from_iterable('cd')
+        with self.assertRaises(TypeError):
+            sll.concat(first, second)
+
+
+class TestCompactHashNode(unittest.TestCase):
+    """Tests for sll.CompactHashNode and choosing a HashNode table kind."""
+
+    def test_structurally_equal_lists_are_identical(self):
+        head = sll.CompactHashNode.from_iterable('abcd')
+        self.assertIs(sll.CompactHashNode.from_iterable(iter('abcd')), head)
+
+    def test_has_value_and_next_node(self):
+        head = sll.CompactHashNode('a', sll.CompactHashNode('b'))
+        with self.subTest('value'):
+            self.assertEqual(head.value, 'a')
+        with self.subTest('next_node'):
+            self.assertIs(head.next_node, sll.CompactHashNode('b'))
+
+    def test_equal_values_across_types_are_interchangeable(self):
+        self.assertIs(sll.CompactHashNode(1.0), sll.CompactHashNode(True))
+
+    @_subtest_by_nanlike
+    def test_nodes_holding_same_nanlike_are_identical(self, obj):
+        self.assertIs(sll.CompactHashNode(obj), sll.CompactHashNode(obj))
+
+    def test_is_not_a_hash_node_of_same_values(self):
+        self.assertIsNot(sll.CompactHashNode('a'), sll.HashNode('a'))
+
+    def test_wrong_next_node_type_raises_type_error(self):
+        with self.assertRaises(TypeError):
+            sll.CompactHashNode('a', sll.HashNode('b'))
+
+    def test_compact_next_node_of_hash_node_raises_type_error(self):
+        with self.assertRaises(TypeError):
+            sll.HashNode('a', sll.CompactHashNode('b'))
+
+    def test_unhashable_value_raises_type_error(self):
+        with self.assertRaises(TypeError):
+            sll.CompactHashNode([])
+
+    def test_no_instance_dictionary(self):
+        with self.assertRaises(AttributeError):
+            sll.CompactHashNode('foo').__dict__
+
+    def test_value_attribute_is_read_only(self):
+        head = sll.CompactHashNode('foo')
+        with self.assertRaises(AttributeError):
+            head.value = 'bar'
+
+    def test_count_instances_counts_only_own_nodes(self):
+        testing.collect_if_not_ref_counting()
+        before = sll.CompactHashNode.count_instances()
+        nodes = [sll.CompactHashNode('counted'), sll.HashNode('counted')]
+        after = sll.CompactHashNode.count_instances()
+        with self.subTest('count'):
+            self.assertEqual(after - before, 1)
+        with self.subTest('still used'):
+            self.assertEqual(len(nodes), 2)
+
+    def test_unreachable_nodes_are_collected_and_forgotten(self):
+        testing.collect_if_not_ref_counting()
+        before = sll.CompactHashNode.count_instances()
+        head = sll.CompactHashNode.from_iterable(range(10_000, 20_000))
+        ref = weakref.ref(head)
+        del head
+        testing.collect_if_not_ref_counting()
+
+        with self.subTest('collected'):
+            self.assertIsNone(ref())
+        with self.subTest('forgotten'):
+            self.assertEqual(sll.CompactHashNode.count_instances(), before)
+
+    def test_nodes_are_found_after_others_die_and_table_resizes(self):
+        kept = sll.CompactHashNode.from_iterable(range(-1000, 0))
+        for start in range(0, 50_000, 5_000):
+            sll.CompactHashNode.from_iterable(range(start, start + 5_000))
+        self.assertIs(sll.CompactHashNode.from_iterable(range(-1000, 0)),
+                      kept)
+
+    def test_heterogeneous_cycle_does_not_leak(self):
+        class Element:
+            pass
+
+        element = Element()
+        element.node = sll.CompactHashNode(element)
+        ref = weakref.ref(element.node)
+        del element
+        gc.collect()
+        self.assertIsNone(ref())
+
+    def test_reentrance_through_hash_raises_runtime_error(self):
+        expected_message = (r'\ACompactHashNode.__new__ reentered '
+                            r'through __hash__ or __eq__\Z')
+        with self.assertRaisesRegex(RuntimeError, expected_message):
+            sll.CompactHashNode(_ReentrantHash(sll.CompactHashNode))
+
+    def test_draw_returns_graphviz_digraph(self):
+        head = sll.CompactHashNode.from_iterable('drawn')
+        graph = sll.CompactHashNode.draw()
+        with self.subTest('type'):
+            self.assertIsInstance(graph, graphviz.Digraph)
+        with self.subTest('node'):
+            self.assertIn(str(id(head)), graph.source)
+
+    def test_concurrent_construction_makes_identical_chains(self):
+        values = [f'compact-thread-test-{index}' for index in range(3000)]
+        heads = [None] * 8
+        barrier = threading.Barrier(len(heads))
+
+        def build(index):
+            barrier.wait()
+            heads[index] = sll.CompactHashNode.from_iterable(values)
+
+        threads = [threading.Thread(target=build, args=(index,))
+                   for index in range(len(heads))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(_LONG_WAIT)
+
+        self.assertTrue(all(head is heads[0] for head in heads))
+
+    def test_subclass_given_weak_table_has_its_own_nodes(self):
+        class OwnNode(sll.HashNode, table='weak'):
+            __slots__ = ()
+
+        node = OwnNode('own')
+        with self.subTest('separate'):
+            self.assertIsNot(node, sll.HashNode('own'))
+        with self.subTest('interned'):
+            self.assertIs(OwnNode('own'), node)
+        with self.subTest('value'):
+            self.assertEqual(node.value, 'own')
+
+    def test_subclass_given_table_rejects_hash_node_next_node(self):
+        class OwnNode(sll.HashNode, table='weak'):
+            __slots__ = ()
+
+        with self.subTest('own node onto hash node'):
+            with self.assertRaises(TypeError):
+                OwnNode('a', sll.HashNode('b'))
+        with self.subTest('hash node onto own node'):
+            with self.assertRaises(TypeError):
+                sll.HashNode('a', OwnNode('b'))
+
+    def test_unknown_table_kind_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            class BadNode(sll.HashNode, table='bad'):
+                __slots__ = ()
+
+
+class _WeakDotNode(sll.HashNode, table='weak'):
+    """HashNode with its own weak table, so tests know all its instances."""
+
+    __slots__ = ()
+
+
+class _CompactDotNode(sll.HashNode, table='compact'):
+    """HashNode with its own compact table, so tests know all its instances."""
+
+    __slots__ = ()
+
+
+_parameterize_by_dot_node_type = parameterized.expand([
+    (_WeakDotNode.__name__, _WeakDotNode),
+    (_CompactDotNode.__name__, _CompactDotNode),
+])
+
+
+def _write_dot(node_type, **kwargs):
+    """Call write_dot on node_type. Return the count and the DOT code."""
+    file = io.StringIO()
+    count = node_type.write_dot(file, **kwargs)
+    return count, file.getvalue()
+
+
+class TestHashNodeWriteDot(unittest.TestCase):
+    """Tests for streaming HashNode DOT output with write_dot."""
+
+    def setUp(self):
+        """Make sure nodes from earlier tests are collected."""
+        super().setUp()
+        testing.collect_if_not_ref_counting()
+
+    @_parameterize_by_dot_node_type
+    def test_writes_whole_digraph(self, _name, node_type):
+        head = node_type.from_iterable(range(10))
+        count, source = _write_dot(node_type, chunk_size=3)
+        with self.subTest('count'):
+            self.assertEqual(count, 10)
+        with self.subTest('header'):
+            self.assertTrue(source.startswith('digraph {\n'))
+        with self.subTest('footer'):
+            self.assertTrue(source.endswith('}\n'))
+        with self.subTest('head'):
+            self.assertIn(f'{id(head)} -> {id(head.next_node)}', source)
+        with self.subTest('root'):
+            self.assertIn(f'{id(None)} [shape=point]', source)
+
+    @_parameterize_by_dot_node_type
+    def test_matches_draw(self, _name, node_type):
+        head = node_type.from_iterable('ab"<c')
+        _, source = _write_dot(node_type, chunk_size=2)
+        self.assertCountEqual(source.splitlines(),
+                              node_type.draw().source.splitlines())
+        self.assertIsNotNone(head)
+
+    @_parameterize_by_dot_node_type
+    def test_max_nodes_limits_nodes(self, _name, node_type):
+        head = node_type.from_iterable(range(10))
+        count, source = _write_dot(node_type, max_nodes=4, chunk_size=3)
+        with self.subTest('count'):
+            self.assertEqual(count, 4)
+        with self.subTest('lines'):
+            self.assertEqual(source.count(' -> '), 4)
+        self.assertIsNotNone(head)
+
+    @_parameterize_by_dot_node_type
+    def test_max_depth_writes_only_nodes_near_root(self, _name, node_type):
+        head = node_type.from_iterable(range(10))
+        count, source = _write_dot(node_type, max_depth=3)
+        with self.subTest('count'):
+            self.assertEqual(count, 3)
+        with self.subTest('nearest root'):
+            self.assertIn('label=7', source)
+        with self.subTest('farther'):
+            self.assertNotIn('label=6', source)
+        self.assertIsNotNone(head)
+
+    @_parameterize_by_dot_node_type
+    def test_sample_with_seed_is_reproducible(self, _name, node_type):
+        head = node_type.from_iterable(range(200))
+        first = _write_dot(node_type, sample=0.5, seed=42)
+        second = _write_dot(node_type, sample=0.5, seed=42)
+        with self.subTest('reproducible'):
+            self.assertEqual(first, second)
+        with self.subTest('sampled'):
+            self.assertLess(0, first[0])
+            self.assertLess(first[0], 200)
+        self.assertIsNotNone(head)
+
+    @_parameterize_by_dot_node_type
+    def test_omitted_link_targets_are_placeholders(self, _name, node_type):
+        head = node_type.from_iterable(range(10))
+        _, source = _write_dot(node_type, sample=0.5, seed=7)
+        omitted = source.count('[label="..." shape=plaintext]')
+        lines = [line for line in source.splitlines() if ' -> ' in line]
+        targets = {line.split(' -> ')[1] for line in lines}
+        sources = {line.split(' -> ')[0].strip() for line in lines}
+        self.assertEqual(omitted, len(targets - sources - {str(id(None))}))
+        self.assertIsNotNone(head)
+
+    @_parameterize_by_dot_node_type
+    def test_skips_collected_nodes(self, _name, node_type):
+        kept = node_type.from_iterable(range(5))
+        node_type.from_iterable(range(100, 105))
+        testing.collect_if_not_ref_counting()
+        count, _ = _write_dot(node_type)
+        self.assertEqual(count, 5)
+        self.assertIsNotNone(kept)
+
+    @parameterized.expand([
+        ('max_nodes', dict(max_nodes=-1)),
+        ('max_depth', dict(max_depth=-1)),
+        ('sample zero', dict(sample=0.0)),
+        ('sample big', dict(sample=1.5)),
+        ('chunk_size', dict(chunk_size=0)),
+    ])
+    def test_bad_argument_raises_value_error(self, _name, kwargs):
+        with self.assertRaises(ValueError):
+            _write_dot(_WeakDotNode, **kwargs)
+
+
 if __name__ == '__main__':
     unittest.main()